@@ -3,6 +3,7 @@ Django settings for Chemical Equipment Visualizer project.
 """
 
 import os
+import tempfile
 import dj_database_url
 from pathlib import Path
 
@@ -39,6 +40,7 @@ INSTALLED_APPS = [
 # =======================
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'equipment_api.middleware.CompressedTextMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -144,6 +146,112 @@ CORS_ALLOW_CREDENTIALS = True
 UPLOAD_DIR = BASE_DIR / 'equipment_api' / 'uploads'
 REPORTS_DIR = BASE_DIR / 'equipment_api' / 'reports'
 
+# Generated PDF reports are cached in REPORTS_DIR; once the directory grows
+# past this many bytes the least recently used reports are removed
+REPORT_CACHE_MAX_BYTES = int(os.getenv('REPORT_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+# The Equipment Details table is laid out in tables of this many rows, and
+# ?details=capped reports list at most REPORT_DETAIL_ROW_CAP rows
+REPORT_DETAIL_CHUNK_ROWS = int(os.getenv('REPORT_DETAIL_CHUNK_ROWS', 200))
+REPORT_DETAIL_ROW_CAP = int(os.getenv('REPORT_DETAIL_ROW_CAP', 5000))
+
+# Worker processes used to render batches of reports
+REPORT_BATCH_WORKERS = int(os.getenv('REPORT_BATCH_WORKERS', os.cpu_count() or 2))
+
+# Uploads are fingerprinted with SHA-256 as they are received so identical
+# re-uploads can be recognised without parsing them again
+FILE_UPLOAD_HANDLERS = [
+    'equipment_api.upload_handlers.HashingMemoryFileUploadHandler',
+    'equipment_api.upload_handlers.HashingTemporaryFileUploadHandler',
+]
+
+# Resumable uploads: part files of open upload sessions, the chunk size
+# clients are offered and the largest accepted, the largest file, and how
+# long an idle session is kept before its part file is removed
+UPLOAD_SESSION_DIR = UPLOAD_DIR / 'sessions'
+UPLOAD_CHUNK_BYTES = int(os.getenv('UPLOAD_CHUNK_BYTES', 8 * 1024 * 1024))
+UPLOAD_CHUNK_MAX_BYTES = 32 * 1024 * 1024
+UPLOAD_MAX_BYTES = int(os.getenv('UPLOAD_MAX_BYTES', 2 * 1024 * 1024 * 1024))
+UPLOAD_SESSION_TTL = int(os.getenv('UPLOAD_SESSION_TTL', 24 * 60 * 60))
+# Part files are allocated at their full size when a session opens, so each
+# user may only hold this many open sessions, declaring at most this many bytes
+UPLOAD_SESSION_MAX_OPEN = int(os.getenv('UPLOAD_SESSION_MAX_OPEN', 4))
+UPLOAD_SESSION_MAX_OPEN_BYTES = int(os.getenv('UPLOAD_SESSION_MAX_OPEN_BYTES', 4 * 1024 * 1024 * 1024))
+
+# Uploaded CSVs are parsed in chunks of this many rows so memory stays flat
+CSV_CHUNK_ROWS = int(os.getenv('CSV_CHUNK_ROWS', 50000))
+CSV_READ_BUFFER_BYTES = 1024 * 1024
+# Rows of a queued upload checked within the request, so malformed files still get a 400
+CSV_VALIDATE_ROWS = int(os.getenv('CSV_VALIDATE_ROWS', 1000))
+EQUIPMENT_BULK_BATCH_SIZE = int(os.getenv('EQUIPMENT_BULK_BATCH_SIZE', 2000))
+
+# Dotted path to an equipment_api.loaders.BulkLoader subclass; by default the
+# loader is picked from the database vendor (COPY on PostgreSQL, executemany on SQLite)
+EQUIPMENT_BULK_LOADER = os.getenv('EQUIPMENT_BULK_LOADER') or None
+
+# Where new uploads keep their equipment readings: 'database' (Equipment rows)
+# or 'parquet' (one compressed column file per dataset in COLUMNAR_DIR, read
+# through memory maps; requires pyarrow). Existing datasets keep the storage
+# they were uploaded with.
+EQUIPMENT_STORAGE = os.getenv('EQUIPMENT_STORAGE', 'database')
+COLUMNAR_DIR = BASE_DIR / 'equipment_api' / 'columns'
+COLUMNAR_COMPRESSION = 'zstd'
+
+# Rows fetched per database round trip by the streaming export endpoint
+EXPORT_CHUNK_SIZE = 2000
+
+# =======================
+# Background jobs
+# =======================
+# Uploads are queued and parsed by a local thread pool; set INGESTION_ASYNC=0
+# to process them inside the request instead
+INGESTION_ASYNC = os.getenv('INGESTION_ASYNC', '1') == '1'
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+# Web processes start a dispatcher the first time they queue a job. Set to 0
+# when `manage.py run_jobs` processes run the jobs instead; they also pick up
+# jobs left behind by processes that stopped.
+JOB_WEB_DISPATCHER = os.getenv('JOB_WEB_DISPATCHER', '1') == '1'
+JOB_PROGRESS_TTL = 60 * 60
+# Dispatchers claim queued jobs from the database, so jobs outlive the process
+# that queued them. Seconds between looks for queued jobs:
+JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', 2))
+# A running job whose process has not renewed its lease (Job.lease_expires) for
+# this many seconds is requeued, or failed once it has been claimed
+# JOB_MAX_ATTEMPTS times
+JOB_LEASE_TTL = int(os.getenv('JOB_LEASE_TTL', 60))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+
+# =======================
+# Caches
+# =======================
+# Rendered chart images and chart data are kept in the default cache for this many seconds
+CHART_CACHE_TIMEOUT = int(os.getenv('CHART_CACHE_TIMEOUT', 24 * 60 * 60))
+# Upper bound for ?points= of the chart-data endpoint
+CHART_MAX_POINTS = 5000
+
+# Cached list, summary and statistics responses are kept this many seconds
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', 60 * 60))
+
+# Job progress and response cache generations must be visible to every
+# worker process, so they use file caches
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'jobs': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(tempfile.gettempdir(), 'equipment_api_jobs'),
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(tempfile.gettempdir(), 'equipment_api_responses'),
+    },
+}
+
+# Covering indexes only carry their INCLUDE columns on PostgreSQL; SQLite
+# builds them as plain indexes
+SILENCED_SYSTEM_CHECKS = ['models.W040']
+
 # Create directories if they don't exist
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 os.makedirs(REPORTS_DIR, exist_ok=True)
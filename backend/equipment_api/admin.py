@@ -2,12 +2,13 @@
 Admin configuration for Equipment API
 """
 from django.contrib import admin
-from .models import EquipmentDataset, Equipment
+from .models import EquipmentDataset, Equipment, EquipmentTypeStatistics, Job, UploadSession, UserStatistics
 
 
 @admin.register(EquipmentDataset)
 class EquipmentDatasetAdmin(admin.ModelAdmin):
     list_display = ['filename', 'user', 'upload_date', 'total_equipment']
+    list_select_related = ['user']
     list_filter = ['upload_date', 'user']
     search_fields = ['filename', 'user__username']
     readonly_fields = ['upload_date']
@@ -16,5 +17,38 @@ class EquipmentDatasetAdmin(admin.ModelAdmin):
 @admin.register(Equipment)
 class EquipmentAdmin(admin.ModelAdmin):
     list_display = ['equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature', 'dataset']
+    list_select_related = ['dataset']
     list_filter = ['equipment_type', 'dataset']
     search_fields = ['equipment_name', 'equipment_type']
+
+
+@admin.register(EquipmentTypeStatistics)
+class EquipmentTypeStatisticsAdmin(admin.ModelAdmin):
+    list_display = ['equipment_type', 'parameter', 'count', 'mean', 'p50', 'p95', 'p99', 'dataset']
+    list_select_related = ['dataset']
+    list_filter = ['parameter', 'dataset']
+    search_fields = ['equipment_type']
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'status', 'phase', 'rows_processed', 'attempts', 'worker', 'user', 'created_at']
+    list_select_related = ['user']
+    list_filter = ['kind', 'status']
+    search_fields = ['filename', 'user__username']
+    readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(UserStatistics)
+class UserStatisticsAdmin(admin.ModelAdmin):
+    list_display = ['user', 'total_datasets', 'total_equipment', 'updated_at']
+    list_select_related = ['user']
+    search_fields = ['user__username']
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ['id', 'filename', 'size', 'chunk_size', 'user', 'created_at', 'updated_at']
+    list_select_related = ['user']
+    search_fields = ['filename', 'user__username']
+    readonly_fields = ['created_at', 'updated_at']
@@ -0,0 +1,152 @@
+"""
+Per-dataset, per-type statistics computed once at ingestion
+"""
+import math
+
+import numpy as np
+
+
+# CSV column -> EquipmentTypeStatistics.parameter
+PARAMETERS = {
+    'Flowrate': 'flowrate',
+    'Pressure': 'pressure',
+    'Temperature': 'temperature',
+}
+
+# Values a quantile sketch holds before it is compressed into centroids;
+# percentiles are exact for types with fewer readings than this
+QUANTILE_BUFFER_SIZE = 10_000
+# Upper bound on the centroids a compressed sketch keeps
+QUANTILE_COMPRESSION = 500
+
+
+class QuantileSketch:
+    """
+    Mergeable t-digest of a stream of values. Values are buffered and
+    merged into at most QUANTILE_COMPRESSION weighted centroids, which are
+    smallest near the tails so p95 and p99 stay accurate.
+    """
+
+    def __init__(self):
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.buffer = []
+        self.buffered = 0
+
+    def update(self, values):
+        self.buffer.append(np.asarray(values, dtype=np.float64))
+        self.buffered += len(values)
+        if self.buffered > QUANTILE_BUFFER_SIZE:
+            self._compress()
+
+    def _compress(self):
+        means = np.concatenate([self.means, *self.buffer])
+        weights = np.concatenate([self.weights, np.ones(self.buffered)])
+        self.buffer, self.buffered = [], 0
+
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        # Scale function k(q) = c/2pi * asin(2q - 1); a centroid spans at most one unit of k
+        left = (np.cumsum(weights) - weights) / total
+        k = QUANTILE_COMPRESSION / (2 * math.pi) * np.arcsin(2 * left - 1)
+        groups = np.floor(k - k[0]).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantiles(self, qs, minimum, maximum):
+        if not len(self.means):
+            # Never compressed: every value is still here
+            return np.percentile(np.concatenate(self.buffer), [q * 100 for q in qs])
+        self._compress()
+        # Each centroid stands at the middle of the weight it holds
+        positions = (np.cumsum(self.weights) - self.weights / 2) / self.weights.sum()
+        return np.interp(qs, np.r_[0.0, positions, 1.0], np.r_[minimum, self.means, maximum])
+
+
+class ParameterAccumulator:
+    """Count, mean, variance, extremes and percentiles of one parameter, merged chunk by chunk"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        # Sum of squared deviations from the mean
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = QuantileSketch()
+
+    def update(self, values):
+        count = len(values)
+        mean = float(values.mean())
+        total = self.count + count
+        # Chan et al.'s pairwise update keeps the variance stable across chunks
+        delta = mean - self.mean
+        self.m2 += float(((values - mean) ** 2).sum()) + delta * delta * self.count * count / total
+        self.mean += delta * count / total
+        self.count = total
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.sketch.update(values)
+
+    def statistics(self):
+        p50, p95, p99 = self.sketch.quantiles([0.5, 0.95, 0.99], self.min, self.max)
+        return {
+            'count': self.count,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.mean,
+            # std is undefined for a single reading
+            'std': math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else None,
+            'p50': float(p50),
+            'p95': float(p95),
+            'p99': float(p99),
+        }
+
+
+class TypeStatisticsCollector:
+    """
+    Per-type statistics accumulated one cleaned chunk at a time. Memory
+    grows with the number of equipment types, not with the number of rows.
+    """
+
+    def __init__(self):
+        self.accumulators = {}
+
+    def update(self, chunk):
+        if chunk.empty:
+            return
+        types = chunk['Type'].astype(str)
+        columns = {column: chunk[column].to_numpy(dtype=np.float64) for column in PARAMETERS}
+        for equipment_type, positions in types.groupby(types, sort=False).indices.items():
+            accumulators = self.accumulators.get(equipment_type)
+            if accumulators is None:
+                accumulators = self.accumulators[equipment_type] = {
+                    parameter: ParameterAccumulator() for parameter in PARAMETERS.values()}
+            for column, parameter in PARAMETERS.items():
+                accumulators[parameter].update(columns[column][positions])
+
+    def statistics(self):
+        """One dict per (equipment type, parameter), ordered by type"""
+        return [
+            {'equipment_type': equipment_type, 'parameter': parameter, **accumulator.statistics()}
+            for equipment_type, accumulators in sorted(self.accumulators.items())
+            for parameter, accumulator in accumulators.items()
+        ]
+
+
+def compute_type_statistics(frame):
+    """
+    Return one dict per (equipment type, parameter) with count, min, max,
+    mean, std and p50/p95/p99 for a frame already in memory.
+    """
+    collector = TypeStatisticsCollector()
+    collector.update(frame)
+    return collector.statistics()
+
+
+def type_distribution(type_statistics):
+    """(equipment type, count) pairs from stored statistics, most common first"""
+    counts = {stat.equipment_type: stat.count for stat in type_statistics}
+    return sorted(counts.items(), key=lambda item: -item[1])
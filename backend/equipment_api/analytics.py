@@ -0,0 +1,126 @@
+"""
+Chart-ready aggregates for Chemical Equipment Visualizer
+
+Everything here returns payloads whose size depends on the requested
+number of points or bins, not on the number of equipment rows, so clients
+can draw any dataset without downloading it.
+"""
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from . import columnar
+from .aggregates import PARAMETERS, type_distribution
+from .models import Equipment, EquipmentDataset
+
+
+DOWNSAMPLE_METHODS = ['lttb', 'minmax']
+
+
+def parameter_arrays(dataset):
+    """One float64 array per parameter, in row (id) order"""
+    if dataset.storage == EquipmentDataset.STORAGE_PARQUET:
+        return columnar.parameter_arrays(dataset.id)
+    rows = (Equipment.objects.filter(dataset=dataset).order_by('id')
+            .values_list(*PARAMETERS.values()).iterator(chunk_size=10000))
+    values = np.fromiter(rows, dtype=[(parameter, 'f8') for parameter in PARAMETERS.values()])
+    return {parameter: values[parameter] for parameter in PARAMETERS.values()}
+
+
+def histogram(values, bins):
+    counts, edges = np.histogram(values, bins=bins)
+    return {'edges': edges.tolist(), 'counts': counts.tolist()}
+
+
+def lttb(y, points):
+    """
+    Largest-Triangle-Three-Buckets downsampling of ``y`` over its index.
+    Returns the indices of the kept points, first and last included.
+    """
+    n = len(y)
+    if points >= n:
+        return np.arange(n)
+    if points < 3:
+        return np.linspace(0, n - 1, points, dtype=np.int64)
+
+    x = np.arange(n, dtype=np.float64)
+    # Bucket boundaries for everything between the fixed first and last points
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    kept = np.empty(points, dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = n - 1
+
+    previous = 0
+    for i in range(points - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point) is the third vertex
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        kept[i + 1] = previous
+    return kept
+
+
+def minmax(y, points):
+    """
+    Keep the minimum and maximum of each of ``points // 2`` equal buckets,
+    which preserves spikes. Returns sorted indices.
+    """
+    n = len(y)
+    if points >= n:
+        return np.arange(n)
+    buckets = max(points // 2, 1)
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    kept = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end > start:
+            segment = y[start:end]
+            kept.extend((start + int(np.argmin(segment)), start + int(np.argmax(segment))))
+    return np.unique(kept)
+
+
+def downsample(y, points, method):
+    indices = lttb(y, points) if method == 'lttb' else minmax(y, points)
+    return {'x': indices.tolist(), 'y': y[indices].tolist()}
+
+
+def chart_data(dataset, points, bins, method):
+    """
+    Histograms, per-type means and downsampled series for one dataset,
+    computed at most once per dataset version and parameters
+    """
+    cache_key = f'chart-data:{dataset.id}:{dataset.updated_at.isoformat()}:{points}:{bins}:{method}'
+    data = cache.get(cache_key)
+    if data is None:
+        data = _chart_data(dataset, points, bins, method)
+        cache.set(cache_key, data, timeout=settings.CHART_CACHE_TIMEOUT)
+    return data
+
+
+def _chart_data(dataset, points, bins, method):
+    type_statistics = list(dataset.type_statistics.all())
+    type_means = {}
+    for stat in type_statistics:
+        type_means.setdefault(stat.equipment_type, {})[stat.parameter] = stat.mean
+
+    arrays = parameter_arrays(dataset)
+    return {
+        'dataset_id': dataset.id,
+        'total_equipment': dataset.total_equipment,
+        'points': points,
+        'bins': bins,
+        'method': method,
+        'type_distribution': dict(type_distribution(type_statistics)),
+        'type_means': type_means,
+        'histograms': {parameter: histogram(values, bins) for parameter, values in arrays.items()},
+        'series': {parameter: downsample(values, points, method) for parameter, values in arrays.items()},
+    }
@@ -9,6 +9,8 @@ class EquipmentApiConfig(AppConfig):
     verbose_name = 'Equipment API'
 
     def ready(self):
+        from . import checks, signals  # noqa: F401
+
         # Auto-create superuser on deploy
         from django.contrib.auth.models import User
         if not User.objects.filter(username="admin").exists():
@@ -0,0 +1,122 @@
+"""
+Batch PDF report rendering across a process pool
+
+ReportLab layout is pure Python and CPU bound, so a batch of reports is
+spread over worker processes rather than threads. Workers are started
+with the ``spawn`` method, which is safe to use from the threaded web
+process; see ``report_worker`` for the code that runs inside them.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import connections
+from django.utils.text import get_valid_filename
+
+from .models import EquipmentDataset, Job
+from .report_worker import init_worker, render_one
+from .reports import DETAILS_FULL
+
+
+@dataclass
+class BatchResult:
+    rendered: int = 0
+    failed: dict = field(default_factory=dict)
+    seconds: float = 0.0
+
+    @property
+    def reports_per_second(self):
+        return self.rendered / self.seconds if self.seconds else 0.0
+
+
+def archive_name(dataset):
+    """Path of a dataset's report inside a batch output"""
+    stem = os.path.splitext(dataset.filename)[0]
+    return f'{get_valid_filename(dataset.user.username)}/{dataset.id}_{get_valid_filename(stem)}.pdf'
+
+
+def render_batch(datasets, output, details=DETAILS_FULL, workers=None, use_cache=True, progress=None):
+    """
+    Render the report of every dataset in ``datasets`` into ``output``, a
+    directory or a path ending in ``.zip``. ``progress(done)`` is called as
+    reports finish. Returns a BatchResult; failures are keyed by dataset id.
+    """
+    datasets = list(datasets.select_related('user'))
+    workers = workers or settings.REPORT_BATCH_WORKERS
+    as_zip = str(output).endswith('.zip')
+    if not as_zip:
+        os.makedirs(output, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(output)) if as_zip else output)
+    result = BatchResult()
+
+    start = time.perf_counter()
+    # Connections must not be shared with the worker processes
+    connections.close_all()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=init_worker) as pool, \
+                (zipfile.ZipFile(output, 'w') if as_zip else nullcontext()) as archive:
+            futures = {}
+            for dataset in datasets:
+                staged = os.path.join(staging, f'{dataset.id}.pdf')
+                future = pool.submit(render_one, dataset.id, details, staged, use_cache)
+                futures[future] = (dataset, staged)
+
+            for future in as_completed(futures):
+                dataset, staged = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    result.failed[dataset.id] = str(e)
+                    continue
+                if as_zip:
+                    # PDF streams are already compressed
+                    archive.write(staged, archive_name(dataset), compress_type=zipfile.ZIP_STORED)
+                    os.remove(staged)
+                else:
+                    dest = os.path.join(output, archive_name(dataset))
+                    os.makedirs(os.path.dirname(dest), exist_ok=True)
+                    os.replace(staged, dest)
+                result.rendered += 1
+                if progress is not None:
+                    progress(result.rendered)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def run_report_batch_job(job, progress):
+    """Job handler: render reports into a zip archive served by the job download"""
+    datasets = EquipmentDataset.objects.order_by('id')
+    if not (job.params.get('all_users') and job.user.is_staff):
+        datasets = datasets.filter(user=job.user)
+
+    batch_dir = os.path.join(settings.REPORTS_DIR, 'batches')
+    os.makedirs(batch_dir, exist_ok=True)
+    archive_path = os.path.join(batch_dir, f'batch_{job.id}.zip')
+
+    result = render_batch(datasets, archive_path, job.params.get('details', DETAILS_FULL),
+                          progress=lambda done: progress('rendering', done))
+    if result.failed:
+        job.error = f'{len(result.failed)} report(s) failed: ' + '; '.join(
+            f'dataset {dataset_id}: {error}' for dataset_id, error in result.failed.items())
+        if not result.rendered:
+            os.remove(archive_path)
+            raise RuntimeError(job.error)
+    job.artifact_path = archive_path
+
+    # Only the latest archive of each user is kept
+    previous = Job.objects.filter(user=job.user, kind=job.kind).exclude(id=job.id).exclude(artifact_path='')
+    for old_path in previous.values_list('artifact_path', flat=True):
+        if os.path.exists(old_path):
+            os.remove(old_path)
+    previous.update(artifact_path='')
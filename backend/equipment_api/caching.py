@@ -0,0 +1,134 @@
+"""
+Per-user response caching for Chemical Equipment Visualizer
+
+Cached responses are keyed by a per-user generation that is moved forward
+whenever one of the user's datasets is saved or deleted, so stale entries
+are never read again and simply expire. The generation is a timestamp and
+doubles as the responses' Last-Modified; the cache key hashes into their
+ETag. Entries live in the ``responses`` cache, which is file based so that
+every worker process sees the same generations.
+"""
+import hashlib
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+COUNTERS = ['hits', 'misses', 'not_modified']
+
+# Names of the views wrapped with cached_response, for the stats endpoint
+CACHED_VIEWS = []
+
+
+def _cache():
+    return caches['responses']
+
+
+def _generation_key(user_id):
+    return f'response-generation:{user_id}'
+
+
+def _counter_key(view_name, counter):
+    return f'response-stats:{view_name}:{counter}'
+
+
+def get_generation(user_id):
+    """Current generation of ``user_id``'s cached responses"""
+    cache = _cache()
+    generation = cache.get(_generation_key(user_id))
+    if generation is None:
+        cache.add(_generation_key(user_id), time.time(), timeout=None)
+        generation = cache.get(_generation_key(user_id))
+    return generation
+
+
+def invalidate_user(user_id):
+    """Stop serving every response cached for ``user_id``"""
+    cache = _cache()
+    previous = cache.get(_generation_key(user_id)) or 0
+    # Whole seconds apart, so Last-Modified always moves forward too
+    cache.set(_generation_key(user_id), max(time.time(), math.floor(previous) + 1), timeout=None)
+
+
+def _count(view_name, counter):
+    cache = _cache()
+    key = _counter_key(view_name, counter)
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Evicted between add() and incr()
+            cache.set(key, 1, timeout=None)
+
+
+def get_stats():
+    """Hit, miss and 304 counts per cached view"""
+    cache = _cache()
+    stats = {}
+    for view_name in CACHED_VIEWS:
+        counts = cache.get_many([_counter_key(view_name, counter) for counter in COUNTERS])
+        stats[view_name] = {counter: counts.get(_counter_key(view_name, counter), 0) for counter in COUNTERS}
+    return stats
+
+
+def reset_stats():
+    _cache().delete_many([_counter_key(view_name, counter)
+                          for view_name in CACHED_VIEWS for counter in COUNTERS])
+
+
+def _not_modified(request, etag, generation):
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        # gzip responses carry the weak form of the ETag; If-None-Match compares weakly
+        return etag in [tag.removeprefix('W/') for tag in parse_etags(if_none_match)]
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return if_modified_since is not None and math.floor(generation) <= if_modified_since
+
+
+def cached_response(view_name, store=None):
+    """
+    Cache a GET view's 200 responses per user, generation and full path.
+    Goes below ``@api_view`` so it sees the DRF request after authentication.
+    Requests for which ``store(request)`` is false are not kept in the cache,
+    but still carry validators and can be answered with 304.
+    """
+    CACHED_VIEWS.append(view_name)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            generation = get_generation(request.user.id)
+            cache_key = f'response:{view_name}:{request.user.id}:{generation}:{request.get_full_path()}'
+            etag = quote_etag(hashlib.sha256(cache_key.encode()).hexdigest())
+
+            if _not_modified(request, etag, generation):
+                _count(view_name, 'not_modified')
+                response = HttpResponseNotModified()
+            else:
+                storable = store is None or store(request)
+                data = _cache().get(cache_key) if storable else None
+                if data is not None:
+                    _count(view_name, 'hits')
+                    response = Response(data, status=status.HTTP_200_OK)
+                else:
+                    _count(view_name, 'misses')
+                    response = view(request, *args, **kwargs)
+                    if response.status_code != status.HTTP_200_OK:
+                        return response
+                    if storable:
+                        _cache().set(cache_key, response.data, timeout=settings.RESPONSE_CACHE_TIMEOUT)
+
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(generation)
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
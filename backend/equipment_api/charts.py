@@ -0,0 +1,123 @@
+"""
+Server-side chart rendering for Chemical Equipment Visualizer
+
+Charts are drawn from the dataset's summary fields and precomputed
+per-type statistics, never from equipment rows, with matplotlib's
+object-oriented Figure API on the Agg canvas. pyplot is not used, so no
+GUI backend or global figure state is involved and rendering is safe
+from worker threads. Rendered images are kept in the default cache.
+"""
+import hashlib
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from .aggregates import PARAMETERS, type_distribution
+
+
+# Bump whenever a chart's look changes so cached images are redrawn
+CHART_VERSION = 1
+
+# Same palette as the desktop client
+CHART_COLORS = ['#667eea', '#764ba2', '#f093fb', '#4facfe', '#43e97b',
+                '#fa709a', '#feca57', '#ff6348', '#48dbfb', '#ee5a6f']
+
+CONTENT_TYPES = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+
+
+def _new_figure(width, height):
+    figure = Figure(figsize=(width, height), dpi=100, facecolor='white')
+    FigureCanvasAgg(figure)
+    return figure
+
+
+def _style_axes(ax, title, xlabel, ylabel):
+    ax.set_title(title, fontsize=12, weight='bold', pad=15)
+    ax.set_xlabel(xlabel, fontsize=10, weight='bold')
+    ax.set_ylabel(ylabel, fontsize=10, weight='bold')
+    ax.grid(True, alpha=0.3, linestyle='--', axis='y')
+    ax.set_axisbelow(True)
+
+
+def type_distribution_chart(dataset, type_statistics):
+    """Pie chart of equipment counts per type"""
+    figure = _new_figure(5, 3.5)
+    ax = figure.add_subplot(111)
+    distribution = type_distribution(type_statistics)
+    if distribution:
+        labels, sizes = zip(*distribution)
+        colors = [CHART_COLORS[i % len(CHART_COLORS)] for i in range(len(labels))]
+        _, texts, autotexts = ax.pie(
+            sizes, labels=labels, colors=colors, autopct='%1.1f%%',
+            startangle=90, pctdistance=0.85, explode=[0.05] * len(labels),
+            textprops={'fontsize': 9, 'weight': 'bold'})
+        for autotext in autotexts:
+            autotext.set_color('white')
+    ax.set_title('Equipment Type Distribution', fontsize=12, weight='bold', pad=15)
+    ax.axis('equal')
+    return figure
+
+
+def averages_chart(dataset, type_statistics):
+    """Bar chart of the dataset-wide parameter averages"""
+    figure = _new_figure(5, 3.5)
+    ax = figure.add_subplot(111)
+    labels = list(PARAMETERS)
+    values = [dataset.avg_flowrate, dataset.avg_pressure, dataset.avg_temperature]
+    bars = ax.bar(labels, values, color=CHART_COLORS[:3], alpha=0.8, edgecolor='white', linewidth=2)
+    ax.bar_label(bars, fmt='%.1f', fontsize=9, weight='bold')
+    _style_axes(ax, 'Average Parameters Comparison', 'Parameters', 'Average Value')
+    return figure
+
+
+def parameters_by_type_chart(dataset, type_statistics):
+    """Grouped bar chart of each parameter's mean per equipment type"""
+    figure = _new_figure(10, 3.5)
+    ax = figure.add_subplot(111)
+    means = {}
+    for stat in type_statistics:
+        means.setdefault(stat.equipment_type, {})[stat.parameter] = stat.mean
+    types = sorted(means)
+    width = 0.25
+    for offset, (column, parameter) in enumerate(PARAMETERS.items()):
+        ax.bar([i + (offset - 1) * width for i in range(len(types))],
+               [means[t].get(parameter, 0) for t in types], width, label=column,
+               color=CHART_COLORS[offset], alpha=0.8, edgecolor='white', linewidth=1.5)
+    ax.set_xticks(range(len(types)))
+    ax.set_xticklabels(types, rotation=45, ha='right', fontsize=8)
+    ax.legend(loc='upper right', fontsize=9, framealpha=0.9)
+    _style_axes(ax, 'Mean Parameters by Equipment Type', 'Equipment Type', 'Mean Value')
+    return figure
+
+
+CHARTS = {
+    'type-distribution': type_distribution_chart,
+    'averages': averages_chart,
+    'parameters-by-type': parameters_by_type_chart,
+}
+
+
+def chart_key(dataset, chart, extension):
+    """Cache key, and ETag, of a chart for the current version of ``dataset``"""
+    source = f'{dataset.id}:{dataset.updated_at.isoformat()}:{chart}:{extension}:{CHART_VERSION}'
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+def render_chart(dataset, chart, extension, key=None):
+    """Image bytes of ``chart`` for ``dataset``, drawn at most once per dataset version"""
+    cache_key = f'chart:{key or chart_key(dataset, chart, extension)}'
+    content = cache.get(cache_key)
+    if content is None:
+        figure = CHARTS[chart](dataset, list(dataset.type_statistics.all()))
+        figure.tight_layout()
+        buffer = BytesIO()
+        figure.savefig(buffer, format=extension)
+        content = buffer.getvalue()
+        cache.set(cache_key, content, timeout=settings.CHART_CACHE_TIMEOUT)
+    return content
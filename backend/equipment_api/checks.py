@@ -0,0 +1,19 @@
+"""
+System checks for Chemical Equipment Visualizer settings
+"""
+from django.conf import settings
+from django.core.checks import Error, register
+
+from . import columnar
+
+
+@register()
+def check_equipment_storage(app_configs, **kwargs):
+    """Parquet storage cannot write or read a dataset without pyarrow"""
+    if settings.EQUIPMENT_STORAGE == 'parquet' and columnar.pa is None:
+        return [Error(
+            "EQUIPMENT_STORAGE = 'parquet' requires pyarrow, which cannot be imported.",
+            hint='Install it with pip install -r requirements.txt, or set EQUIPMENT_STORAGE to database.',
+            id='equipment_api.E001',
+        )]
+    return []
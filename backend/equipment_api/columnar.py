@@ -0,0 +1,208 @@
+"""
+Columnar Parquet storage for equipment readings
+
+With ``EQUIPMENT_STORAGE = 'parquet'`` the parsed columns of an upload are
+written to one compressed Parquet file per dataset, one row group per
+upload chunk, instead of Equipment rows. Reads memory-map the file and only
+decode the columns, and where possible the row groups, they need. Rows have
+no database ids; their 1-based position in the upload stands in for ``id``.
+
+pyarrow is only required in this mode.
+"""
+import os
+
+import numpy as np
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pc = pq = None
+
+
+# Stored columns, named after the Equipment fields they replace
+COLUMNS = ['equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature']
+PARAMETER_COLUMNS = ['flowrate', 'pressure', 'temperature']
+
+# Upload column for each stored column
+SOURCE_COLUMNS = {
+    'equipment_name': 'Equipment Name',
+    'equipment_type': 'Type',
+    'flowrate': 'Flowrate',
+    'pressure': 'Pressure',
+    'temperature': 'Temperature',
+}
+
+
+def require_pyarrow():
+    if pa is None:
+        raise ImproperlyConfigured("EQUIPMENT_STORAGE = 'parquet' requires pyarrow (pip install pyarrow)")
+
+
+def schema():
+    require_pyarrow()
+    return pa.schema([
+        ('equipment_name', pa.string()),
+        ('equipment_type', pa.string()),
+        ('flowrate', pa.float64()),
+        ('pressure', pa.float64()),
+        ('temperature', pa.float64()),
+    ])
+
+
+def columns_path(dataset_id):
+    return os.path.join(settings.COLUMNAR_DIR, f'dataset_{dataset_id}.parquet')
+
+
+def discard_columns(dataset_id):
+    """Remove a deleted dataset's column file, if it has one"""
+    path = columns_path(dataset_id)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+class ColumnWriter:
+    """Appends upload chunks to a dataset's column file as row groups"""
+
+    def __init__(self, dataset_id):
+        require_pyarrow()
+        self.path = columns_path(dataset_id)
+        # Readers never see a file that is still being written
+        self.partial_path = f'{self.path}.partial'
+        self.writer = None
+
+    def write(self, frame):
+        if self.writer is None:
+            os.makedirs(settings.COLUMNAR_DIR, exist_ok=True)
+            self.writer = pq.ParquetWriter(self.partial_path, schema(),
+                                           compression=settings.COLUMNAR_COMPRESSION)
+        arrays = [frame[SOURCE_COLUMNS[column]] for column in COLUMNS]
+        # Names and types may be parsed as numbers; they are stored as text like in the database
+        arrays[0] = arrays[0].astype(str)
+        arrays[1] = arrays[1].astype(str)
+        self.writer.write_table(pa.Table.from_arrays(
+            [pa.array(array, type=field.type) for array, field in zip(arrays, schema())], schema=schema()))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+            os.replace(self.partial_path, self.path)
+
+    def discard(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        for path in (self.partial_path, self.path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _open(dataset_id):
+    """ParquetFile of a dataset, or None if no rows were written"""
+    require_pyarrow()
+    path = columns_path(dataset_id)
+    if not os.path.exists(path):
+        return None
+    return pq.ParquetFile(path, memory_map=True)
+
+
+def _stored(columns):
+    return [column for column in columns if column != 'id']
+
+
+def _rows(table, columns, ids):
+    values = [ids.tolist() if column == 'id' else table.column(column).to_pylist() for column in columns]
+    return zip(*values)
+
+
+def parameter_arrays(dataset_id):
+    """One float64 array per parameter, in row order"""
+    parquet = _open(dataset_id)
+    if parquet is None:
+        return {column: np.empty(0) for column in PARAMETER_COLUMNS}
+    table = parquet.read(columns=PARAMETER_COLUMNS)
+    return {column: table.column(column).to_numpy() for column in PARAMETER_COLUMNS}
+
+
+def row_chunks(dataset_id, columns, equipment_type=None, limit=None, chunk_rows=None):
+    """
+    Lists of row tuples in row order, one per ``chunk_rows`` batch read.
+    ``columns`` may include ``id``; only rows of ``equipment_type`` are
+    kept if it is given, and at most ``limit`` rows in total.
+    """
+    parquet = _open(dataset_id)
+    if parquet is None:
+        return
+    chunk_rows = chunk_rows or settings.EXPORT_CHUNK_SIZE
+    read_columns = _stored(columns)
+    if equipment_type is not None and 'equipment_type' not in read_columns:
+        read_columns.append('equipment_type')
+
+    offset = 0
+    remaining = limit
+    for batch in parquet.iter_batches(batch_size=chunk_rows, columns=read_columns):
+        ids = np.arange(offset + 1, offset + 1 + batch.num_rows)
+        offset += batch.num_rows
+        if equipment_type is not None:
+            mask = pc.equal(batch.column('equipment_type'), equipment_type).to_numpy(zero_copy_only=False)
+            batch = batch.filter(pa.array(mask))
+            ids = ids[mask]
+        if remaining is not None:
+            batch, ids = batch.slice(0, remaining), ids[:remaining]
+            remaining -= len(ids)
+        if len(ids):
+            yield list(_rows(batch, columns, ids))
+        if remaining == 0:
+            return
+
+
+def rows(dataset_id, columns, equipment_type=None, limit=None):
+    """Row tuples in row order; see row_chunks()"""
+    for chunk in row_chunks(dataset_id, columns, equipment_type, limit):
+        yield from chunk
+
+
+def page(dataset_id, columns, limit, after=None, before=None, equipment_type=None):
+    """
+    Up to ``limit`` rows with ids after ``after``, or the last ``limit``
+    rows before ``before``, as dicts. Returns ``(rows, has_more)`` where
+    ``has_more`` tells whether rows exist beyond the page in the direction
+    read. Only the row groups holding the page are decoded, apart from the
+    type column when filtering.
+    """
+    parquet = _open(dataset_id)
+    if parquet is None:
+        return [], False
+
+    if equipment_type is not None:
+        types = parquet.read(columns=['equipment_type']).column('equipment_type')
+        ids = np.flatnonzero(pc.equal(types, equipment_type).to_numpy(zero_copy_only=False)) + 1
+    else:
+        ids = np.arange(1, parquet.metadata.num_rows + 1)
+
+    if before is not None:
+        end = np.searchsorted(ids, before, side='left')
+        selected = ids[max(end - limit - 1, 0):end]
+        has_more = len(selected) > limit
+        selected = selected[1:] if has_more else selected
+    else:
+        start = np.searchsorted(ids, after, side='right') if after is not None else 0
+        selected = ids[start:start + limit + 1]
+        has_more = len(selected) > limit
+        selected = selected[:limit]
+    if not len(selected):
+        return [], has_more
+
+    # Row group boundaries, as 0-based row positions
+    starts = np.cumsum([0] + [parquet.metadata.row_group(i).num_rows
+                              for i in range(parquet.metadata.num_row_groups)])
+    positions = selected - 1
+    first = int(np.searchsorted(starts, positions[0], side='right')) - 1
+    last = int(np.searchsorted(starts, positions[-1], side='right')) - 1
+    table = parquet.read_row_groups(range(first, last + 1), columns=_stored(columns))
+    table = table.take(pa.array(positions - starts[first]))
+    return [dict(zip(columns, row)) for row in _rows(table, columns, selected)], has_more
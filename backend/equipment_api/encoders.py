@@ -0,0 +1,103 @@
+"""
+Fast read-path serialization for Chemical Equipment Visualizer API
+
+DRF serializers resolve and convert every field of every object in Python,
+which dominates the cost of large list and summary responses. The encoders
+here are compiled once from the existing serializers: they fetch exactly
+the serializer's columns with ``values_list()`` and only run a field's
+``to_representation`` where the database value is not already in its
+output form. The resulting dicts are identical to the serializer output.
+"""
+from rest_framework import serializers
+
+from . import columnar
+from .models import Equipment, EquipmentDataset
+from .serializers import DatasetSummarySerializer, EquipmentDatasetSerializer, EquipmentSerializer
+
+
+# Fields whose database value is already its JSON representation
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.FloatField,
+    serializers.IntegerField,
+)
+
+
+class ValuesEncoder:
+    """Encodes querysets with the field layout of a DRF serializer"""
+
+    def __init__(self, serializer_class):
+        self.names = []
+        self.columns = []
+        self.lookups = []
+        self.converters = []
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            self.names.append(name)
+            # Nested serializers are supplied by the caller, see encode_one()
+            if isinstance(field, serializers.BaseSerializer):
+                continue
+            if field.source == '*' or isinstance(field, serializers.SerializerMethodField):
+                raise ValueError(f'{serializer_class.__name__}.{name} cannot be read from a column')
+            self.columns.append(name)
+            self.lookups.append(field.source.replace('.', '__'))
+            if not isinstance(field, PASSTHROUGH_FIELDS):
+                self.converters.append((name, field.to_representation))
+
+    def _encode(self, row):
+        data = dict(zip(self.columns, row))
+        for name, to_representation in self.converters:
+            if data[name] is not None:
+                data[name] = to_representation(data[name])
+        return data
+
+    def encode(self, queryset):
+        """List of dicts, one per row of ``queryset``"""
+        return [self._encode(row) for row in queryset.values_list(*self.lookups)]
+
+    def encode_one(self, queryset, **nested):
+        """
+        Dict for the single row of ``queryset``, with nested fields taken
+        from ``nested``. Raises the model's DoesNotExist if there is no row.
+        """
+        row = queryset.values_list(*self.lookups).first()
+        if row is None:
+            raise queryset.model.DoesNotExist
+        data = self._encode(row)
+        if not nested:
+            return data
+        data.update(nested)
+        return {name: data[name] for name in self.names}
+
+
+equipment_encoder = ValuesEncoder(EquipmentSerializer)
+dataset_encoder = ValuesEncoder(EquipmentDatasetSerializer)
+dataset_summary_encoder = ValuesEncoder(DatasetSummarySerializer)
+
+
+def encode_equipment(queryset):
+    """Same output as ``EquipmentSerializer(queryset, many=True).data``"""
+    return equipment_encoder.encode(queryset.order_by('id'))
+
+
+def encode_dataset_summaries(queryset):
+    """Same output as ``DatasetSummarySerializer(queryset, many=True).data``"""
+    return dataset_summary_encoder.encode(queryset)
+
+
+def encode_dataset_summary(queryset):
+    """Same output as ``DatasetSummarySerializer(queryset.get()).data``"""
+    return dataset_summary_encoder.encode_one(queryset)
+
+
+def encode_dataset(queryset):
+    """Same output as ``EquipmentDatasetSerializer(queryset.get()).data``"""
+    data = dataset_encoder.encode_one(queryset, equipment=[])
+    if data['storage'] == EquipmentDataset.STORAGE_PARQUET:
+        fields = EquipmentSerializer.Meta.fields
+        data['equipment'] = [dict(zip(fields, row)) for row in columnar.rows(data['id'], fields)]
+    else:
+        data['equipment'] = encode_equipment(Equipment.objects.filter(dataset_id=data['id']))
+    return data
@@ -0,0 +1,66 @@
+"""
+Streaming exporters for full dataset downloads
+
+Each exporter is a generator over chunks of row tuples, from
+``queryset_chunks`` or ``columnar.row_chunks``, that yields one encoded
+block per chunk, so memory stays constant and the first bytes go out as
+soon as the first chunk is fetched.
+"""
+import csv
+import json
+from itertools import islice
+
+from django.conf import settings
+
+
+EXPORT_FIELDS = ['id', 'equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature']
+
+
+def queryset_chunks(queryset):
+    """Lists of EXPORT_FIELDS tuples, one per database round trip"""
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    rows = queryset.order_by('id').values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def export_ndjson(chunks):
+    """One JSON object per line"""
+    for chunk in chunks:
+        yield ''.join(json.dumps(dict(zip(EXPORT_FIELDS, row))) + '\n' for row in chunk)
+
+
+def export_json(chunks):
+    """A single JSON array, emitted incrementally"""
+    yield '['
+    separator = ''
+    for chunk in chunks:
+        yield separator + ','.join(json.dumps(dict(zip(EXPORT_FIELDS, row))) for row in chunk)
+        separator = ','
+    yield ']'
+
+
+class _Echo:
+    """File-like object whose write() returns the value instead of storing it"""
+
+    def write(self, value):
+        return value
+
+
+def export_csv(chunks):
+    """CSV with a header row"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for chunk in chunks:
+        yield ''.join(writer.writerow(row) for row in chunk)
+
+
+# ?output= value -> (generator, content type, file extension)
+EXPORTERS = {
+    'ndjson': (export_ndjson, 'application/x-ndjson', 'ndjson'),
+    'json': (export_json, 'application/json', 'json'),
+    'csv': (export_csv, 'text/csv', 'csv'),
+}
@@ -0,0 +1,248 @@
+"""
+Streaming CSV ingestion for Chemical Equipment Visualizer
+"""
+import io
+import os
+
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+
+from .aggregates import TypeStatisticsCollector
+from .columnar import discard_columns
+from .jobs import JobTakenOver, confirm_claim
+from .loaders import get_loader
+from .models import EquipmentDataset, EquipmentTypeStatistics, Job, UserStatistics
+from .reports import discard_reports
+
+
+REQUIRED_COLUMNS = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+NUMERIC_COLUMNS = ['Flowrate', 'Pressure', 'Temperature']
+
+
+class MissingColumnsError(ValueError):
+    """Raised when an uploaded CSV lacks one of the required columns"""
+
+    def __init__(self, missing_columns):
+        self.missing_columns = missing_columns
+        super().__init__(f'Missing required columns: {", ".join(missing_columns)}')
+
+
+class InvalidCSVError(ValueError):
+    """Raised when an upload cannot be parsed or has non-numeric readings"""
+
+
+def validate_csv(source):
+    """
+    Check the header and the first CSV_VALIDATE_ROWS rows of ``source``
+    before an upload is queued, so a file that cannot be ingested is
+    rejected within the request. Rows further down are only checked by
+    the ingestion job.
+    """
+    try:
+        sample = pd.read_csv(source, nrows=settings.CSV_VALIDATE_ROWS)
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+        raise InvalidCSVError(f'Could not parse CSV: {e}')
+
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in sample.columns]
+    if missing_columns:
+        raise MissingColumnsError(missing_columns)
+
+    sample = sample[REQUIRED_COLUMNS].dropna()
+    for column in NUMERIC_COLUMNS:
+        invalid = pd.to_numeric(sample[column], errors='coerce').isna()
+        if invalid.any():
+            # +2 for the header and 1-based line numbers
+            row = invalid.idxmax()
+            raise InvalidCSVError(f'{column} must be numeric; line {row + 2} has {sample[column][row]!r}')
+
+
+class TeeReader(io.RawIOBase):
+    """Raw stream that copies every byte read from ``source`` into ``sink``"""
+
+    def __init__(self, source, sink):
+        super().__init__()
+        self.source = source
+        self.sink = sink
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.source.read(len(buffer))
+        size = len(data)
+        buffer[:size] = data
+        self.sink.write(data)
+        return size
+
+    def drain(self):
+        """Copy any bytes the parser left unread so the stored file is complete"""
+        while True:
+            data = self.source.read(settings.CSV_READ_BUFFER_BYTES)
+            if not data:
+                break
+            self.sink.write(data)
+
+
+class RunningStats:
+    """Row count and column sums accumulated one chunk at a time"""
+
+    COLUMNS = ['Flowrate', 'Pressure', 'Temperature']
+
+    def __init__(self):
+        self.count = 0
+        self.sums = {column: 0.0 for column in self.COLUMNS}
+
+    def update(self, chunk):
+        self.count += len(chunk)
+        for column in self.COLUMNS:
+            self.sums[column] += float(chunk[column].sum())
+
+    def mean(self, column):
+        if not self.count:
+            return 0.0
+        return self.sums[column] / self.count
+
+
+def _ingest_stream(reader, user, filename, file_path, content_hash='', chunk_rows=None, progress=None,
+                   before_commit=None):
+    """
+    Parse ``reader`` chunk by chunk into a new dataset. Only one chunk of
+    full rows is held in memory at a time, and per-type statistics are
+    merged chunk by chunk so memory does not grow with the file.
+    ``progress(phase, rows_processed)`` is called after every chunk, and
+    ``before_commit()`` once the dataset is complete, inside its transaction.
+    """
+    chunk_rows = chunk_rows or settings.CSV_CHUNK_ROWS
+    stats = RunningStats()
+    type_stats = TypeStatisticsCollector()
+    loader = get_loader(storage=settings.EQUIPMENT_STORAGE)
+
+    try:
+        with transaction.atomic():
+            dataset = EquipmentDataset.objects.create(
+                user=user,
+                filename=filename,
+                file_path=file_path,
+                content_hash=content_hash,
+                storage=settings.EQUIPMENT_STORAGE
+            )
+
+            with pd.read_csv(reader, chunksize=chunk_rows) as chunks:
+                for chunk in chunks:
+                    missing_columns = [col for col in REQUIRED_COLUMNS if col not in chunk.columns]
+                    if missing_columns:
+                        raise MissingColumnsError(missing_columns)
+
+                    # Clean data
+                    chunk = chunk.dropna()
+                    stats.update(chunk)
+                    type_stats.update(chunk)
+
+                    loader.load(dataset, chunk)
+                    if progress:
+                        progress('parsing', stats.count)
+
+            if progress:
+                progress('finalizing', stats.count)
+            loader.finish()
+            dataset.total_equipment = stats.count
+            dataset.avg_flowrate = stats.mean('Flowrate')
+            dataset.avg_pressure = stats.mean('Pressure')
+            dataset.avg_temperature = stats.mean('Temperature')
+            dataset.save(update_fields=['total_equipment', 'avg_flowrate', 'avg_pressure', 'avg_temperature',
+                                        'updated_at'])
+            UserStatistics.adjust(user.id, datasets=1, equipment=stats.count)
+            EquipmentTypeStatistics.objects.bulk_create([
+                EquipmentTypeStatistics(dataset=dataset, **row)
+                for row in type_stats.statistics()
+            ])
+            if before_commit:
+                before_commit()
+    except BaseException:
+        # Column files are not covered by the rollback
+        loader.discard()
+        raise
+
+    return dataset
+
+
+def ingest_csv(upload, user, file_path, chunk_rows=None):
+    """
+    Parse ``upload`` in fixed-size chunks while copying its raw bytes to
+    ``file_path`` in the same pass.
+    """
+    try:
+        with open(file_path, 'wb') as destination:
+            tee = TeeReader(upload, destination)
+            reader = io.BufferedReader(tee, settings.CSV_READ_BUFFER_BYTES)
+            content_hash = getattr(upload, 'content_hash', '')
+            dataset = _ingest_stream(reader, user, upload.name, file_path, content_hash, chunk_rows)
+            tee.drain()
+    except Exception:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
+
+    return dataset
+
+
+def store_upload(upload, file_path):
+    """Copy the upload to ``file_path`` so a background job can parse it later"""
+    with open(file_path, 'wb') as destination:
+        for chunk in upload.chunks(settings.CSV_READ_BUFFER_BYTES):
+            destination.write(chunk)
+
+
+def ingest_stored_csv(user, filename, file_path, content_hash='', chunk_rows=None, progress=None,
+                      before_commit=None):
+    """Parse a CSV that has already been written to ``file_path``"""
+    try:
+        with open(file_path, 'rb') as source:
+            return _ingest_stream(source, user, filename, file_path, content_hash, chunk_rows, progress,
+                                  before_commit)
+    except JobTakenOver:
+        # The process that took the job over is reading the same file
+        raise
+    except Exception:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
+
+
+def find_duplicate(user, content_hash):
+    """Return the user's dataset built from the bytes with this SHA-256, if any"""
+    if not content_hash:
+        return None
+    return EquipmentDataset.objects.select_related('user').filter(user=user, content_hash=content_hash).first()
+
+
+def find_pending_ingestion(user, content_hash):
+    """Return the user's queued or running ingestion job for the bytes with this SHA-256, if any"""
+    if not content_hash:
+        return None
+    return Job.objects.filter(user=user, kind=Job.KIND_INGEST, content_hash=content_hash,
+                              status__in=[Job.STATUS_QUEUED, Job.STATUS_RUNNING]).first()
+
+
+def prune_old_datasets(user, keep=5):
+    """Maintain only the last ``keep`` datasets per user"""
+    # Only what deletion and the statistics signal read
+    user_datasets = (EquipmentDataset.objects.filter(user=user).order_by('-upload_date')
+                     .only('id', 'user', 'file_path', 'total_equipment'))
+    for old_dataset in user_datasets[keep:]:
+        # Delete associated file
+        if os.path.exists(old_dataset.file_path):
+            os.remove(old_dataset.file_path)
+        discard_reports(old_dataset.id)
+        discard_columns(old_dataset.id)
+        old_dataset.delete()
+
+
+def run_ingestion_job(job, progress):
+    """Job handler: ingest the stored upload and prune old datasets"""
+    # The dataset is only committed while this process still holds the job
+    job.dataset = ingest_stored_csv(job.user, job.filename, job.file_path, job.content_hash, progress=progress,
+                                    before_commit=lambda: confirm_claim(job))
+    progress('pruning', job.dataset.total_equipment)
+    prune_old_datasets(job.user)
@@ -0,0 +1,255 @@
+"""
+Background job queue for Chemical Equipment Visualizer
+
+Jobs are stored in the database and executed by a thread pool inside the
+web process, so no external broker is required. Dispatchers claim queued
+jobs with a conditional UPDATE, so a job is
+run by exactly one process and survives the restart of the one that queued
+it. A running job holds a lease, ``Job.lease_expires``, that its process
+renews in the database; once the lease runs out the job is requeued, or
+failed after JOB_MAX_ATTEMPTS claims. A job confirms it still holds its
+claim in the same transaction that commits its result, so a job that was
+requeued behind a stalled process never commits twice. While a job runs
+inside its own database transaction, live progress is published through
+the ``jobs`` cache.
+"""
+import logging
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Dispatcher of this process; see start()
+_dispatcher_pid = None
+_wake = threading.Event()
+# Ids of the jobs this process is running
+_active = set()
+_active_lock = threading.Lock()
+
+
+def get_executor():
+    """Lazily create the process-wide worker pool"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.JOB_WORKERS,
+                thread_name_prefix='equipment-job'
+            )
+        return _executor
+
+
+def _handlers():
+    from .batch import run_report_batch_job
+    from .ingestion import run_ingestion_job
+    from .reports import run_report_job
+
+    return {
+        Job.KIND_INGEST: run_ingestion_job,
+        Job.KIND_REPORT: run_report_job,
+        Job.KIND_REPORT_BATCH: run_report_batch_job,
+    }
+
+
+def _progress_key(job_id):
+    return f'job-progress:{job_id}'
+
+
+class JobTakenOver(Exception):
+    """Raised when a job was requeued and claimed elsewhere while this process ran it"""
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _lease_deadline():
+    return timezone.now() + timedelta(seconds=settings.JOB_LEASE_TTL)
+
+
+def report_progress(job_id, phase, rows_processed):
+    caches['jobs'].set(_progress_key(job_id), {
+        'phase': phase,
+        'rows_processed': rows_processed,
+    }, timeout=settings.JOB_PROGRESS_TTL)
+
+
+def get_progress(job_id):
+    """Live progress for a running job, or None"""
+    return caches['jobs'].get(_progress_key(job_id))
+
+
+def enqueue(job):
+    """Have a dispatcher pick up ``job`` once the current transaction commits"""
+    if settings.JOB_WEB_DISPATCHER:
+        start()
+    transaction.on_commit(_wake.set)
+
+
+def start():
+    """
+    Start a dispatcher thread in this process, unless it is already
+    running. Web processes call it the first time they queue a job, which
+    is always after any fork of the server.
+    """
+    global _dispatcher_pid
+    with _executor_lock:
+        # A forked process does not inherit its parent's threads
+        if _dispatcher_pid == os.getpid():
+            return
+        _dispatcher_pid = os.getpid()
+    threading.Thread(target=_dispatch, name='equipment-job-dispatcher', daemon=True).start()
+
+
+def run_forever():
+    """Run a dispatcher in the calling thread; see the run_jobs command"""
+    _dispatch()
+
+
+def _dispatch():
+    while True:
+        _wake.wait(settings.JOB_POLL_INTERVAL)
+        _wake.clear()
+        try:
+            _renew_leases()
+            recover_stale_jobs()
+            _claim_queued()
+        except Exception:
+            # The database may be locked by a long ingestion on SQLite; try again next round
+            logger.exception('Job dispatcher round failed')
+            connections.close_all()
+
+
+def _renew_leases():
+    with _active_lock:
+        running = list(_active)
+    if running:
+        Job.objects.filter(pk__in=running, status=Job.STATUS_RUNNING, worker=worker_id()).update(
+            lease_expires=_lease_deadline())
+
+
+def _claim_queued():
+    with _active_lock:
+        free = settings.JOB_WORKERS - len(_active)
+    if free <= 0:
+        return
+    candidates = Job.objects.filter(status=Job.STATUS_QUEUED).order_by('created_at').values_list('pk', flat=True)
+    for job_id in list(candidates[:free]):
+        if claim(job_id):
+            try:
+                get_executor().submit(_run, job_id)
+            except RuntimeError:
+                # The interpreter is shutting down; hand the job back
+                release(job_id)
+                return
+
+
+def release(job_id):
+    """Put a job this process claimed but never started back in the queue"""
+    with _active_lock:
+        _active.discard(job_id)
+    Job.objects.filter(pk=job_id, status=Job.STATUS_RUNNING, worker=worker_id()).update(
+        status=Job.STATUS_QUEUED, phase=Job.STATUS_QUEUED, worker='', lease_expires=None,
+        attempts=F('attempts') - 1, updated_at=timezone.now())
+
+
+def claim(job_id):
+    """Mark a queued job as running in this process; False if another process got it first"""
+    claimed = Job.objects.filter(pk=job_id, status=Job.STATUS_QUEUED).update(
+        status=Job.STATUS_RUNNING, phase='starting', worker=worker_id(),
+        attempts=F('attempts') + 1, lease_expires=_lease_deadline(), updated_at=timezone.now())
+    if claimed:
+        with _active_lock:
+            _active.add(job_id)
+    return bool(claimed)
+
+
+def confirm_claim(job):
+    """
+    Renew ``job``'s lease, raising JobTakenOver if this process no longer
+    holds it. Called inside the transaction that commits a job's result:
+    the row stays locked until that commit, so the job cannot be requeued
+    in between.
+    """
+    renewed = Job.objects.filter(pk=job.pk, status=Job.STATUS_RUNNING, worker=worker_id()).update(
+        lease_expires=_lease_deadline())
+    if not renewed:
+        raise JobTakenOver(f'Job {job.pk} is no longer held by {worker_id()}')
+
+
+def recover_stale_jobs():
+    """
+    Requeue running jobs whose process stopped renewing their lease, or fail
+    them once they have been claimed JOB_MAX_ATTEMPTS times. Returns the
+    number of jobs recovered.
+    """
+    now = timezone.now()
+    expired = Q(lease_expires__lt=now) | Q(lease_expires__isnull=True)
+    running = Job.objects.filter(expired, status=Job.STATUS_RUNNING).values_list('pk', 'worker', 'attempts')
+    recovered = 0
+    for job_id, worker, attempts in running:
+        # Loses to a renewal that lands first
+        stale = Job.objects.filter(expired, pk=job_id, status=Job.STATUS_RUNNING, worker=worker)
+        if attempts >= settings.JOB_MAX_ATTEMPTS:
+            logger.warning('Job %s failed: its worker %s stopped on attempt %s', job_id, worker, attempts)
+            recovered += stale.update(status=Job.STATUS_FAILED, phase='failed', updated_at=timezone.now(),
+                                      error=f'The worker running this job stopped {attempts} times.')
+        else:
+            logger.warning('Requeueing job %s: its worker %s stopped', job_id, worker)
+            recovered += stale.update(status=Job.STATUS_QUEUED, phase=Job.STATUS_QUEUED, worker='',
+                                      lease_expires=None, rows_processed=0, updated_at=timezone.now())
+        caches['jobs'].delete(_progress_key(job_id))
+    return recovered
+
+
+def _run(job_id):
+    try:
+        job = Job.objects.select_related('user', 'dataset__user').get(pk=job_id)
+        handler = _handlers()[job.kind]
+
+        def progress(phase, rows_processed):
+            job.phase = phase
+            job.rows_processed = rows_processed
+            report_progress(job_id, phase, rows_processed)
+
+        try:
+            handler(job, progress)
+        except JobTakenOver:
+            raise
+        except Exception as e:
+            logger.exception('Job %s failed', job_id)
+            job.status = Job.STATUS_FAILED
+            job.phase = 'failed'
+            job.error = str(e)
+        else:
+            job.status = Job.STATUS_SUCCEEDED
+            job.phase = 'completed'
+        with transaction.atomic():
+            confirm_claim(job)
+            job.save()
+    except JobTakenOver:
+        logger.warning('Job %s was requeued while this process ran it; dropping its result', job_id)
+    except Exception:
+        logger.exception('Could not run job %s', job_id)
+    finally:
+        with _active_lock:
+            _active.discard(job_id)
+        caches['jobs'].delete(_progress_key(job_id))
+        _wake.set()
+        # Worker threads own their connections; release them between jobs
+        connections.close_all()
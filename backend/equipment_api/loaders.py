@@ -0,0 +1,159 @@
+"""
+Bulk loaders that write cleaned upload chunks into the Equipment table
+"""
+import csv
+import io
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.module_loading import import_string
+
+from .columnar import ColumnWriter
+from .models import Equipment, EquipmentDataset
+
+
+# Equipment table columns, in the order rows are produced below
+EQUIPMENT_COLUMNS = ['dataset_id', 'equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature']
+
+
+def equipment_rows(dataset, frame):
+    """Yield one tuple per frame row, in EQUIPMENT_COLUMNS order"""
+    return zip(
+        [dataset.id] * len(frame),
+        frame['Equipment Name'].tolist(),
+        frame['Type'].tolist(),
+        frame['Flowrate'].tolist(),
+        frame['Pressure'].tolist(),
+        frame['Temperature'].tolist(),
+    )
+
+
+def build_equipment_objects(dataset, frame):
+    """
+    Build Equipment instances straight from the frame's column arrays.
+    ``tolist()`` converts each column to native Python values in one call,
+    which avoids the per-row Series that ``iterrows`` allocates.
+    """
+    return [
+        Equipment(
+            dataset_id=dataset_id,
+            equipment_name=name,
+            equipment_type=equipment_type,
+            flowrate=flowrate,
+            pressure=pressure,
+            temperature=temperature
+        )
+        for dataset_id, name, equipment_type, flowrate, pressure, temperature in equipment_rows(dataset, frame)
+    ]
+
+
+class BulkLoader:
+    """Base class for loaders; ``load`` runs inside the caller's transaction"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def load(self, dataset, frame):
+        raise NotImplementedError
+
+    def finish(self):
+        """Called once every chunk is loaded, before the transaction commits"""
+
+    def discard(self):
+        """Called instead of ``finish`` when ingestion fails"""
+
+    def table_sql(self):
+        """Quoted ``table (col, ...)`` fragment for raw INSERT/COPY statements"""
+        quote = self.connection.ops.quote_name
+        columns = ', '.join(quote(column) for column in EQUIPMENT_COLUMNS)
+        return f'{quote(Equipment._meta.db_table)} ({columns})'
+
+
+class OrmLoader(BulkLoader):
+    """Portable fallback going through ``bulk_create``"""
+
+    def __init__(self, connection, batch_size=None):
+        super().__init__(connection)
+        self.batch_size = batch_size or settings.EQUIPMENT_BULK_BATCH_SIZE
+
+    def load(self, dataset, frame):
+        Equipment.objects.using(self.connection.alias).bulk_create(
+            build_equipment_objects(dataset, frame),
+            batch_size=self.batch_size
+        )
+
+
+class PostgresCopyLoader(BulkLoader):
+    """Streams rows to PostgreSQL with ``COPY ... FROM STDIN``"""
+
+    def load(self, dataset, frame):
+        buffer = io.StringIO()
+        # Quoting strings keeps empty names distinct from NULL in COPY's CSV format
+        csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC).writerows(equipment_rows(dataset, frame))
+        buffer.seek(0)
+
+        sql = f'COPY {self.table_sql()} FROM STDIN WITH (FORMAT csv)'
+        with self.connection.cursor() as cursor:
+            if hasattr(cursor, 'copy_expert'):
+                # psycopg2
+                cursor.copy_expert(sql, buffer)
+            else:
+                # psycopg 3
+                with cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+
+
+class SqliteExecutemanyLoader(BulkLoader):
+    """Inserts rows through one prepared statement with ``executemany``"""
+
+    def load(self, dataset, frame):
+        placeholders = ', '.join(['%s'] * len(EQUIPMENT_COLUMNS))
+        sql = f'INSERT INTO {self.table_sql()} VALUES ({placeholders})'
+        with self.connection.cursor() as cursor:
+            cursor.executemany(sql, equipment_rows(dataset, frame))
+
+
+class ParquetLoader(BulkLoader):
+    """Writes chunks to the dataset's Parquet column file; no rows reach the database"""
+
+    def __init__(self, connection):
+        super().__init__(connection)
+        self.writer = None
+
+    def load(self, dataset, frame):
+        if self.writer is None:
+            self.writer = ColumnWriter(dataset.id)
+        self.writer.write(frame)
+
+    def finish(self):
+        if self.writer is not None:
+            self.writer.close()
+
+    def discard(self):
+        if self.writer is not None:
+            self.writer.discard()
+
+
+LOADERS = {
+    'postgresql': PostgresCopyLoader,
+    'sqlite': SqliteExecutemanyLoader,
+}
+
+
+def get_loader(using=DEFAULT_DB_ALIAS, storage=EquipmentDataset.STORAGE_DATABASE):
+    """
+    Return the loader for datasets kept in ``storage``. Database storage
+    picks the loader from the active database vendor; set
+    ``EQUIPMENT_BULK_LOADER`` to a dotted class path to override the choice.
+    """
+    connection = connections[using]
+    if storage == EquipmentDataset.STORAGE_PARQUET:
+        loader_class = ParquetLoader
+    elif storage != EquipmentDataset.STORAGE_DATABASE:
+        raise ImproperlyConfigured(f'Unknown equipment storage: {storage}')
+    elif settings.EQUIPMENT_BULK_LOADER:
+        loader_class = import_string(settings.EQUIPMENT_BULK_LOADER)
+    else:
+        loader_class = LOADERS.get(connection.vendor, OrmLoader)
+    return loader_class(connection)
@@ -0,0 +1,89 @@
+"""
+Benchmark Equipment row construction and insertion for CSV ingestion
+"""
+import time
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from equipment_api.loaders import OrmLoader, build_equipment_objects, get_loader
+from equipment_api.models import EquipmentDataset, Equipment
+
+
+def synthetic_frame(rows, seed=0):
+    """Frame shaped like a cleaned upload chunk"""
+    rng = np.random.default_rng(seed)
+    types = np.array(['Reactor', 'Pump', 'Heat Exchanger', 'Valve', 'Compressor'])
+    return pd.DataFrame({
+        'Equipment Name': [f'EQ-{i}' for i in range(rows)],
+        'Type': types[rng.integers(0, len(types), rows)],
+        'Flowrate': rng.uniform(50, 250, rows),
+        'Pressure': rng.uniform(1, 50, rows),
+        'Temperature': rng.uniform(20, 300, rows),
+    })
+
+
+def build_with_iterrows(dataset, frame):
+    """The original row-at-a-time construction, kept for comparison"""
+    equipment_objects = []
+    for _, row in frame.iterrows():
+        equipment_objects.append(Equipment(
+            dataset=dataset,
+            equipment_name=row['Equipment Name'],
+            equipment_type=row['Type'],
+            flowrate=row['Flowrate'],
+            pressure=row['Pressure'],
+            temperature=row['Temperature']
+        ))
+    return equipment_objects
+
+
+class Command(BaseCommand):
+    help = 'Report rows/second for the iterrows, column-oriented ORM and native bulk loader paths'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+        parser.add_argument('--batch-size', type=int, default=settings.EQUIPMENT_BULK_BATCH_SIZE,
+                            help='bulk_create batch size of the iterrows and columns paths')
+        parser.add_argument('--no-insert', action='store_true',
+                            help='Time object construction only, without writing rows')
+
+    def handle(self, *args, **options):
+        native = get_loader()
+        batch_size = options['batch_size']
+        if options['no_insert']:
+            paths = [
+                ('iterrows', build_with_iterrows),
+                ('columns', build_equipment_objects),
+            ]
+        else:
+            paths = [
+                ('iterrows', lambda dataset, frame: Equipment.objects.bulk_create(
+                    build_with_iterrows(dataset, frame), batch_size=batch_size)),
+                ('columns', OrmLoader(connection, batch_size).load),
+                (type(native).__name__, native.load),
+            ]
+
+        self.stdout.write(f"{'rows':>10}  {'path':<24}  {'seconds':>9}  {'rows/s':>12}")
+        for rows in options['sizes']:
+            frame = synthetic_frame(rows)
+            for name, run in paths:
+                elapsed = self._time(frame, run)
+                self.stdout.write(f'{rows:>10}  {name:<24}  {elapsed:>9.3f}  {rows / elapsed:>12,.0f}')
+
+    def _time(self, frame, run):
+        # Everything is written inside a transaction that is rolled back
+        with transaction.atomic():
+            user, _ = User.objects.get_or_create(username='__bench_ingest__')
+            dataset = EquipmentDataset.objects.create(user=user, filename='bench.csv', file_path='')
+
+            start = time.perf_counter()
+            run(dataset, frame)
+            elapsed = time.perf_counter() - start
+
+            transaction.set_rollback(True)
+        return elapsed
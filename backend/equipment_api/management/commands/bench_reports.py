@@ -0,0 +1,90 @@
+"""
+Benchmark PDF report generation time and peak memory
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from equipment_api.aggregates import compute_type_statistics
+from equipment_api.loaders import get_loader
+from equipment_api.models import EquipmentDataset, EquipmentTypeStatistics
+from equipment_api.reports import DETAILS_FULL, DETAILS_MODES, build_report
+
+from .bench_ingest import synthetic_frame
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+class Command(BaseCommand):
+    help = 'Report PDF generation time and peak RSS per dataset size, each size in a fresh process'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+        parser.add_argument('--details', choices=DETAILS_MODES, default=DETAILS_FULL)
+        parser.add_argument('--chunk-rows', type=int, default=None,
+                            help='Rows per details table (default REPORT_DETAIL_CHUNK_ROWS, 0 = one table)')
+        parser.add_argument('--child', type=int, default=None, help='Internal: run one size in this process')
+
+    def handle(self, *args, **options):
+        if options['child'] is not None:
+            self._run_child(options['child'], options['details'], options['chunk_rows'])
+            return
+
+        self.stdout.write(f"{'rows':>8}  {'details':<8}  {'seconds':>8}  {'rows/s':>9}  {'peak RSS MB':>11}  {'+MB':>7}")
+        for rows in options['sizes']:
+            command = [sys.executable, os.path.join(settings.BASE_DIR, 'manage.py'), 'bench_reports',
+                       '--child', str(rows), '--details', options['details']]
+            if options['chunk_rows'] is not None:
+                command += ['--chunk-rows', str(options['chunk_rows'])]
+            completed = subprocess.run(command, capture_output=True, text=True)
+            if completed.returncode != 0:
+                raise CommandError(completed.stderr)
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            self.stdout.write(
+                f"{rows:>8}  {options['details']:<8}  {result['seconds']:>8.2f}  "
+                f"{rows / result['seconds']:>9,.0f}  {result['peak_rss_mb']:>11.1f}  {result['added_mb']:>7.1f}"
+            )
+
+    def _run_child(self, rows, details, chunk_rows):
+        # Everything is written inside a transaction that is rolled back
+        with transaction.atomic():
+            user, _ = User.objects.get_or_create(username='__bench_reports__')
+            frame = synthetic_frame(rows)
+            dataset = EquipmentDataset.objects.create(
+                user=user, filename='bench.csv', file_path='', total_equipment=rows,
+                avg_flowrate=frame['Flowrate'].mean(),
+                avg_pressure=frame['Pressure'].mean(),
+                avg_temperature=frame['Temperature'].mean(),
+            )
+            get_loader().load(dataset, frame)
+            EquipmentTypeStatistics.objects.bulk_create([
+                EquipmentTypeStatistics(dataset=dataset, **row) for row in compute_type_statistics(frame)
+            ])
+            del frame
+
+            baseline = peak_rss_mb()
+            start = time.perf_counter()
+            with open(os.devnull, 'wb') as output:
+                build_report(dataset, output, details, chunk_rows)
+            elapsed = time.perf_counter() - start
+            peak = peak_rss_mb()
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(json.dumps({
+            'seconds': elapsed,
+            'peak_rss_mb': peak,
+            'added_mb': peak - baseline,
+        }))
@@ -0,0 +1,67 @@
+"""
+Benchmark DRF serializers against the values_list() encoders
+"""
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from equipment_api.encoders import encode_dataset, encode_dataset_summaries
+from equipment_api.loaders import get_loader
+from equipment_api.models import EquipmentDataset
+from equipment_api.serializers import DatasetSummarySerializer, EquipmentDatasetSerializer
+
+from .bench_ingest import synthetic_frame
+
+
+class Command(BaseCommand):
+    help = 'Report serialization time of the dataset detail response for DRF serializers and encoders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Best of this many runs is reported')
+
+    def handle(self, *args, **options):
+        self.repeat = options['repeat']
+        self.stdout.write(f"{'rows':>8}  {'path':<12}  {'serialize s':>11}  {'render s':>9}  {'speedup':>8}")
+        # Everything is written inside a transaction that is rolled back
+        with transaction.atomic():
+            user, _ = User.objects.get_or_create(username='__bench_serializers__')
+            for rows in options['sizes']:
+                dataset = EquipmentDataset.objects.create(user=user, filename='bench.csv', file_path='',
+                                                          total_equipment=rows)
+                get_loader().load(dataset, synthetic_frame(rows))
+                datasets = EquipmentDataset.objects.filter(id=dataset.id)
+
+                paths = [
+                    ('serializer', lambda: EquipmentDatasetSerializer(datasets.get()).data),
+                    ('encoder', lambda: encode_dataset(datasets)),
+                ]
+                results = [(name, *self._time(build)) for name, build in paths]
+                if results[0][3] != results[1][3]:
+                    raise CommandError(f'Encoder output differs from serializer output at {rows} rows')
+
+                baseline = results[0][1] + results[0][2]
+                for name, serialize, render, _ in results:
+                    speedup = baseline / (serialize + render)
+                    self.stdout.write(f'{rows:>8}  {name:<12}  {serialize:>11.4f}  {render:>9.4f}  {speedup:>7.1f}x')
+
+            summaries = EquipmentDataset.objects.filter(user=user)
+            if DatasetSummarySerializer(summaries, many=True).data != encode_dataset_summaries(summaries):
+                raise CommandError('Dataset list encoder output differs from serializer output')
+
+            transaction.set_rollback(True)
+
+    def _time(self, build):
+        best_serialize = best_render = float('inf')
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            data = build()
+            serialized = time.perf_counter()
+            content = JSONRenderer().render(data)
+            best_serialize = min(best_serialize, serialized - start)
+            best_render = min(best_render, time.perf_counter() - serialized)
+        return best_serialize, best_render, content
@@ -0,0 +1,83 @@
+"""
+Benchmark database rows against Parquet column files for equipment storage
+"""
+import os
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from equipment_api import columnar
+from equipment_api.analytics import parameter_arrays
+from equipment_api.exporters import EXPORT_FIELDS, queryset_chunks
+from equipment_api.loaders import get_loader
+from equipment_api.models import EquipmentDataset, Equipment
+from equipment_api.reports import DETAIL_COLUMNS
+
+from .bench_ingest import synthetic_frame
+
+
+class Command(BaseCommand):
+    help = 'Compare ingest, chart, report, export and delete times of database and Parquet equipment storage'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+        parser.add_argument('--chunk-rows', type=int, default=50_000,
+                            help='Rows per loaded chunk, like CSV_CHUNK_ROWS')
+
+    def handle(self, *args, **options):
+        columnar.require_pyarrow()
+        storages = [EquipmentDataset.STORAGE_DATABASE, EquipmentDataset.STORAGE_PARQUET]
+        phases = ['ingest', 'chart arrays', 'report rows', 'export', 'delete']
+        self.stdout.write(f"{'rows':>9}  {'storage':<9}" + ''.join(f'  {phase + " s":>14}' for phase in phases)
+                          + f"  {'file MB':>8}")
+
+        # Everything is written inside a transaction that is rolled back
+        with transaction.atomic():
+            user, _ = User.objects.get_or_create(username='__bench_storage__')
+            for rows in options['sizes']:
+                frame = synthetic_frame(rows)
+                for storage in storages:
+                    dataset = EquipmentDataset.objects.create(user=user, filename='bench.csv', file_path='',
+                                                              storage=storage, total_equipment=rows)
+                    timings = [self._ingest(dataset, frame, options['chunk_rows'])]
+                    size = os.path.getsize(columnar.columns_path(dataset.id)) \
+                        if storage == EquipmentDataset.STORAGE_PARQUET else 0
+                    timings.append(self._time(lambda: parameter_arrays(dataset)))
+                    timings.append(self._time(lambda: sum(1 for _ in self._detail_rows(dataset))))
+                    timings.append(self._time(lambda: sum(len(chunk) for chunk in self._export_chunks(dataset))))
+                    timings.append(self._time(lambda: self._delete(dataset)))
+
+                    self.stdout.write(f'{rows:>9}  {storage:<9}' + ''.join(f'  {t:>14.3f}' for t in timings)
+                                      + (f'  {size / 1024 / 1024:>8.1f}' if size else f"  {'-':>8}"))
+
+            transaction.set_rollback(True)
+
+    def _ingest(self, dataset, frame, chunk_rows):
+        loader = get_loader(storage=dataset.storage)
+        start = time.perf_counter()
+        for offset in range(0, len(frame), chunk_rows):
+            loader.load(dataset, frame.iloc[offset:offset + chunk_rows])
+        loader.finish()
+        return time.perf_counter() - start
+
+    def _detail_rows(self, dataset):
+        # Same reads as build_report's Equipment Details section
+        if dataset.storage == EquipmentDataset.STORAGE_PARQUET:
+            return columnar.rows(dataset.id, DETAIL_COLUMNS)
+        return Equipment.objects.filter(dataset=dataset).order_by('id').values_list(*DETAIL_COLUMNS).iterator()
+
+    def _export_chunks(self, dataset):
+        if dataset.storage == EquipmentDataset.STORAGE_PARQUET:
+            return columnar.row_chunks(dataset.id, EXPORT_FIELDS)
+        return queryset_chunks(Equipment.objects.filter(dataset=dataset))
+
+    def _delete(self, dataset):
+        columnar.discard_columns(dataset.id)
+        dataset.delete()
+
+    def _time(self, run):
+        start = time.perf_counter()
+        run()
+        return time.perf_counter() - start
@@ -0,0 +1,53 @@
+"""
+Render PDF reports for many datasets in parallel
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from equipment_api.batch import render_batch
+from equipment_api.models import EquipmentDataset
+from equipment_api.reports import DETAILS_FULL, DETAILS_MODES
+
+
+class Command(BaseCommand):
+    help = 'Render the PDF report of every dataset (or of the given users) across a process pool'
+
+    def add_arguments(self, parser):
+        output = parser.add_mutually_exclusive_group(required=True)
+        output.add_argument('--output', help='Directory to write one PDF per dataset into')
+        output.add_argument('--zip', help='Zip archive to write all PDFs into')
+        parser.add_argument('--user', action='append', dest='users', metavar='USERNAME',
+                            help='Only render datasets of this user (repeatable)')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Worker processes (default REPORT_BATCH_WORKERS)')
+        parser.add_argument('--details', choices=DETAILS_MODES, default=DETAILS_FULL)
+        parser.add_argument('--no-cache', action='store_true',
+                            help='Render every report instead of reusing cached ones')
+
+    def handle(self, *args, **options):
+        output = options['zip'] or options['output']
+        if options['zip'] and not options['zip'].endswith('.zip'):
+            raise CommandError('--zip must name a .zip file')
+
+        datasets = EquipmentDataset.objects.order_by('id')
+        if options['users']:
+            datasets = datasets.filter(user__username__in=options['users'])
+        total = datasets.count()
+        workers = options['workers'] or settings.REPORT_BATCH_WORKERS
+        self.stdout.write(f'Rendering {total} reports with {workers} workers...')
+
+        def progress(done):
+            if options['verbosity'] > 1:
+                self.stdout.write(f'  {done}/{total}')
+
+        result = render_batch(datasets, output, options['details'], workers,
+                              use_cache=not options['no_cache'], progress=progress)
+
+        for dataset_id, error in result.failed.items():
+            self.stderr.write(f'Dataset {dataset_id}: {error}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Rendered {result.rendered} reports into {output} in {result.seconds:.2f}s '
+            f'({result.reports_per_second:.2f} reports/s)'
+        ))
+        if result.failed:
+            raise CommandError(f'{len(result.failed)} reports failed')
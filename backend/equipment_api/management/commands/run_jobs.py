@@ -0,0 +1,18 @@
+"""
+Run background jobs in a dedicated process
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from equipment_api import jobs
+
+
+class Command(BaseCommand):
+    help = 'Claim and run queued ingestion and report jobs until interrupted'
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Running jobs as {jobs.worker_id()} with {settings.JOB_WORKERS} workers')
+        try:
+            jobs.run_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,19 @@
+"""
+Middleware for Equipment API
+"""
+from django.middleware.gzip import GZipMiddleware
+
+
+class CompressedTextMiddleware(GZipMiddleware):
+    """
+    gzip JSON, NDJSON and CSV responses for clients that accept it. PDFs,
+    PNGs and zips are already compressed, and byte-range downloads must
+    keep addressing the uncompressed file, so everything else is left alone.
+    """
+
+    COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/csv')
+
+    def process_response(self, request, response):
+        if not response.get('Content-Type', '').startswith(self.COMPRESSIBLE_TYPES):
+            return response
+        return super().process_response(request, response)
@@ -0,0 +1,92 @@
+# Generated by Django 4.2.7 on 2026-10-17 07:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# CSV column -> EquipmentTypeStatistics.parameter
+PARAMETERS = {
+    'Flowrate': 'flowrate',
+    'Pressure': 'pressure',
+    'Temperature': 'temperature',
+}
+
+
+def type_statistics(frame):
+    """
+    Statistics per (equipment type, parameter) as they were defined when
+    this migration was written; frozen here so later changes to the
+    application's aggregates do not alter the migration.
+    """
+    statistics = []
+    for equipment_type, group in frame.groupby(frame['Type'].astype(str), sort=True):
+        for column, parameter in PARAMETERS.items():
+            values = group[column].astype(float)
+            p50, p95, p99 = values.quantile([0.5, 0.95, 0.99])
+            statistics.append({
+                'equipment_type': equipment_type,
+                'parameter': parameter,
+                'count': len(values),
+                'min': float(values.min()),
+                'max': float(values.max()),
+                'mean': float(values.mean()),
+                # std is undefined for a single reading
+                'std': float(values.std()) if len(values) > 1 else None,
+                'p50': float(p50),
+                'p95': float(p95),
+                'p99': float(p99),
+            })
+    return statistics
+
+
+def backfill_type_statistics(apps, schema_editor):
+    """Precompute statistics for datasets uploaded before this migration"""
+    import pandas as pd
+
+    EquipmentDataset = apps.get_model('equipment_api', 'EquipmentDataset')
+    Equipment = apps.get_model('equipment_api', 'Equipment')
+    EquipmentTypeStatistics = apps.get_model('equipment_api', 'EquipmentTypeStatistics')
+
+    for dataset in EquipmentDataset.objects.all():
+        rows = Equipment.objects.filter(dataset=dataset).values_list(
+            'equipment_type', 'flowrate', 'pressure', 'temperature')
+        frame = pd.DataFrame.from_records(rows.iterator(), columns=['Type', 'Flowrate', 'Pressure', 'Temperature'])
+        EquipmentTypeStatistics.objects.bulk_create([
+            EquipmentTypeStatistics(dataset=dataset, **row) for row in type_statistics(frame)
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment_api', '0003_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EquipmentTypeStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('equipment_type', models.CharField(max_length=100)),
+                ('parameter', models.CharField(choices=[('flowrate', 'Flowrate'), ('pressure', 'Pressure'), ('temperature', 'Temperature')], max_length=20)),
+                ('count', models.IntegerField()),
+                ('min', models.FloatField()),
+                ('max', models.FloatField()),
+                ('mean', models.FloatField()),
+                ('std', models.FloatField(blank=True, null=True)),
+                ('p50', models.FloatField()),
+                ('p95', models.FloatField()),
+                ('p99', models.FloatField()),
+                ('dataset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='type_statistics', to='equipment_api.equipmentdataset')),
+            ],
+            options={
+                'verbose_name_plural': 'Equipment type statistics',
+                'ordering': ['equipment_type', 'parameter'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='equipmenttypestatistics',
+            constraint=models.UniqueConstraint(fields=('dataset', 'equipment_type', 'parameter'), name='unique_type_statistic'),
+        ),
+        migrations.RunPython(backfill_type_statistics, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-17 07:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment_api', '0006_job_report'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='artifact_path',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+        migrations.AlterField(
+            model_name='job',
+            name='kind',
+            field=models.CharField(choices=[('ingest', 'CSV ingestion'), ('report', 'PDF report'), ('report_batch', 'PDF report batch')], max_length=20),
+        ),
+    ]
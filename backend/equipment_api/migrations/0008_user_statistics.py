@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-17 07:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_user_statistics(apps, schema_editor):
+    """Materialize totals for datasets uploaded before this migration"""
+    EquipmentDataset = apps.get_model('equipment_api', 'EquipmentDataset')
+    UserStatistics = apps.get_model('equipment_api', 'UserStatistics')
+
+    totals = EquipmentDataset.objects.values('user').annotate(
+        datasets=models.Count('id'), equipment=models.Sum('total_equipment'))
+    UserStatistics.objects.bulk_create([
+        UserStatistics(user_id=row['user'], total_datasets=row['datasets'], total_equipment=row['equipment'] or 0)
+        for row in totals
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('equipment_api', '0007_job_report_batch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStatistics',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistics', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_datasets', models.IntegerField(default=0)),
+                ('total_equipment', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'user statistics',
+            },
+        ),
+        migrations.RunPython(backfill_user_statistics, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-17 07:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment_api', '0008_user_statistics'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['dataset', 'id'], include=('flowrate', 'pressure', 'temperature'), name='equipment_dataset_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['dataset', 'equipment_type', 'id'], name='equipment_dataset_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipmentdataset',
+            index=models.Index(fields=['user', '-upload_date'], name='dataset_user_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipmentdataset',
+            index=models.Index(fields=['user', 'content_hash', '-upload_date'], name='dataset_user_hash_idx'),
+        ),
+        # Single-column indexes made redundant by the composites above
+        migrations.AlterField(
+            model_name='equipment',
+            name='dataset',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='equipment', to='equipment_api.equipmentdataset'),
+        ),
+        migrations.AlterField(
+            model_name='equipmentdataset',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 07:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment_api', '0009_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipmentdataset',
+            name='storage',
+            field=models.CharField(choices=[('database', 'Equipment rows'), ('parquet', 'Parquet column file')], default='database', max_length=20),
+        ),
+    ]
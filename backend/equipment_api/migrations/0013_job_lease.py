@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 08:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment_api', '0012_job_claims'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='lease_expires',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-17 08:47
+
+from django.db import migrations, models
+
+
+def fail_repeated_ingestions(apps, schema_editor):
+    """Keep only the oldest pending ingestion of each file, so the constraint can be added"""
+    Job = apps.get_model('equipment_api', 'Job')
+
+    seen = set()
+    repeated = []
+    pending = Job.objects.filter(kind='ingest', status__in=['queued', 'running']).exclude(content_hash='')
+    for job_id, user_id, content_hash in pending.order_by('created_at').values_list('id', 'user', 'content_hash'):
+        if (user_id, content_hash) in seen:
+            repeated.append(job_id)
+        seen.add((user_id, content_hash))
+    Job.objects.filter(id__in=repeated).update(status='failed', phase='failed',
+                                               error='Identical file was already being processed')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment_api', '0013_job_lease'),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_repeated_ingestions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='job',
+            constraint=models.UniqueConstraint(condition=models.Q(('kind', 'ingest'), ('status__in', ['queued', 'running']), models.Q(('content_hash', ''), _negated=True)), fields=('user', 'content_hash'), name='job_pending_ingest_uniq'),
+        ),
+    ]
@@ -1,6 +1,11 @@
 """
 Models for Chemical Equipment Visualizer
 """
+import math
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
@@ -9,10 +14,22 @@ from django.utils import timezone
 class EquipmentDataset(models.Model):
     """Model to store uploaded equipment datasets"""
     
+    STORAGE_DATABASE = 'database'
+    STORAGE_PARQUET = 'parquet'
+    STORAGE_CHOICES = [
+        (STORAGE_DATABASE, 'Equipment rows'),
+        (STORAGE_PARQUET, 'Parquet column file'),
+    ]
+    
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     filename = models.CharField(max_length=255)
     upload_date = models.DateTimeField(default=timezone.now)
     file_path = models.CharField(max_length=500)
+    content_hash = models.CharField(max_length=64, blank=True)
+    # Bumped on every save; part of the cache key of derived artifacts such as reports
+    updated_at = models.DateTimeField(auto_now=True)
+    # Where the equipment readings live; set from EQUIPMENT_STORAGE at upload
+    storage = models.CharField(max_length=20, choices=STORAGE_CHOICES, default=STORAGE_DATABASE)
     
     # Summary statistics
     total_equipment = models.IntegerField(default=0)
@@ -22,15 +39,49 @@ class EquipmentDataset(models.Model):
     
     class Meta:
         ordering = ['-upload_date']
+        indexes = [
+            # Dataset lists and pruning: a user's datasets, newest first
+            models.Index(fields=['user', '-upload_date'], name='dataset_user_recent_idx'),
+            # Duplicate upload lookup, which also takes the newest match
+            models.Index(fields=['user', 'content_hash', '-upload_date'], name='dataset_user_hash_idx'),
+        ]
         
     def __str__(self):
         return f"{self.filename} - {self.upload_date.strftime('%Y-%m-%d %H:%M')}"
 
 
+class UserStatistics(models.Model):
+    """Per-user totals, kept up to date on ingestion and dataset deletion"""
+    
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='statistics')
+    total_datasets = models.IntegerField(default=0)
+    total_equipment = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = 'user statistics'
+    
+    def __str__(self):
+        return f"{self.user.username}: {self.total_datasets} datasets, {self.total_equipment} equipment"
+    
+    @classmethod
+    def adjust(cls, user_id, datasets, equipment):
+        """Atomically add to a user's totals"""
+        # Decrements never create a row, e.g. while the user itself is being deleted
+        if datasets > 0 or equipment > 0:
+            cls.objects.get_or_create(user_id=user_id)
+        cls.objects.filter(user_id=user_id).update(
+            total_datasets=models.F('total_datasets') + datasets,
+            total_equipment=models.F('total_equipment') + equipment,
+            updated_at=timezone.now()
+        )
+
+
 class Equipment(models.Model):
     """Model to store individual equipment records"""
     
-    dataset = models.ForeignKey(EquipmentDataset, on_delete=models.CASCADE, related_name='equipment')
+    # Indexed by the composite indexes below, which all start with dataset
+    dataset = models.ForeignKey(EquipmentDataset, on_delete=models.CASCADE, related_name='equipment', db_index=False)
     equipment_name = models.CharField(max_length=255)
     equipment_type = models.CharField(max_length=100)
     flowrate = models.FloatField()
@@ -42,3 +93,163 @@ class Equipment(models.Model):
     
     class Meta:
         verbose_name_plural = "Equipment"
+        indexes = [
+            # Rows of a dataset in id order: pagination, exports, reports and
+            # chart data. Covering on PostgreSQL so those scans skip the table.
+            models.Index(fields=['dataset', 'id'], include=['flowrate', 'pressure', 'temperature'],
+                         name='equipment_dataset_id_idx'),
+            # ?type= filters in id order and per-type counts
+            models.Index(fields=['dataset', 'equipment_type', 'id'], name='equipment_dataset_type_idx'),
+        ]
+
+
+class EquipmentTypeStatistics(models.Model):
+    """Precomputed statistics for one parameter of one equipment type in a dataset"""
+    
+    PARAMETER_CHOICES = [
+        ('flowrate', 'Flowrate'),
+        ('pressure', 'Pressure'),
+        ('temperature', 'Temperature'),
+    ]
+    
+    dataset = models.ForeignKey(EquipmentDataset, on_delete=models.CASCADE, related_name='type_statistics')
+    equipment_type = models.CharField(max_length=100)
+    parameter = models.CharField(max_length=20, choices=PARAMETER_CHOICES)
+    
+    count = models.IntegerField()
+    min = models.FloatField()
+    max = models.FloatField()
+    mean = models.FloatField()
+    std = models.FloatField(null=True, blank=True)
+    p50 = models.FloatField()
+    p95 = models.FloatField()
+    p99 = models.FloatField()
+    
+    def __str__(self):
+        return f"{self.equipment_type} {self.parameter}"
+    
+    class Meta:
+        ordering = ['equipment_type', 'parameter']
+        verbose_name_plural = "Equipment type statistics"
+        constraints = [
+            models.UniqueConstraint(fields=['dataset', 'equipment_type', 'parameter'],
+                                    name='unique_type_statistic'),
+        ]
+
+
+class Job(models.Model):
+    """Background job processed by the local worker pool"""
+
+    KIND_INGEST = 'ingest'
+    KIND_REPORT = 'report'
+    KIND_REPORT_BATCH = 'report_batch'
+    KIND_CHOICES = [
+        (KIND_INGEST, 'CSV ingestion'),
+        (KIND_REPORT, 'PDF report'),
+        (KIND_REPORT_BATCH, 'PDF report batch'),
+    ]
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='jobs')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    phase = models.CharField(max_length=50, default=STATUS_QUEUED)
+    rows_processed = models.BigIntegerField(default=0)
+
+    # Process that claimed the job, and how many times it has been claimed
+    worker = models.CharField(max_length=100, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Renewed by the claiming process while the job runs; a running job past it is requeued
+    lease_expires = models.DateTimeField(null=True, blank=True)
+
+    # Input and result
+    filename = models.CharField(max_length=255, blank=True)
+    file_path = models.CharField(max_length=500, blank=True)
+    content_hash = models.CharField(max_length=64, blank=True)
+    dataset = models.ForeignKey(EquipmentDataset, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    params = models.JSONField(default=dict, blank=True)
+    artifact_path = models.CharField(max_length=500, blank=True)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Every worker process polls for the oldest queued jobs
+            models.Index(fields=['status', 'created_at'], name='job_status_created_idx'),
+        ]
+        constraints = [
+            # A file is parsed by one job at a time; identical uploads are pointed at that job
+            models.UniqueConstraint(
+                fields=['user', 'content_hash'],
+                condition=models.Q(kind='ingest', status__in=['queued', 'running']) & ~models.Q(content_hash=''),
+                name='job_pending_ingest_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.id} ({self.status})"
+
+
+class UploadSession(models.Model):
+    """Resumable upload whose chunks are received one request at a time"""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions')
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    chunk_size = models.IntegerField()
+    # SHA-256 of the whole file as announced by the client, checked on completion
+    expected_hash = models.CharField(max_length=64, blank=True)
+
+    created_at = models.DateTimeField(default=timezone.now)
+    # Bumped by every stored chunk; idle sessions expire UPLOAD_SESSION_TTL after it
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.filename} ({self.size} bytes, {self.id})"
+
+    @property
+    def total_chunks(self):
+        return math.ceil(self.size / self.chunk_size)
+
+    @property
+    def expires_at(self):
+        return self.updated_at + timedelta(seconds=settings.UPLOAD_SESSION_TTL)
+
+    def chunk_length(self, index):
+        """Byte length of chunk ``index``; only the last chunk may be shorter"""
+        return min(self.chunk_size, self.size - index * self.chunk_size)
+
+
+class UploadChunk(models.Model):
+    """A chunk of an upload session that was stored and verified"""
+
+    session = models.ForeignKey(UploadSession, on_delete=models.CASCADE, related_name='chunks')
+    index = models.IntegerField()
+    checksum = models.CharField(max_length=64)
+
+    class Meta:
+        ordering = ['index']
+        constraints = [
+            models.UniqueConstraint(fields=['session', 'index'], name='unique_upload_chunk'),
+        ]
+
+    def __str__(self):
+        return f"Chunk {self.index} of {self.session_id}"
@@ -0,0 +1,52 @@
+"""
+Pagination classes for Equipment API
+"""
+from rest_framework.pagination import Cursor, CursorPagination
+
+from . import columnar
+
+
+class EquipmentCursorPagination(CursorPagination):
+    """
+    Keyset pagination over a dataset's equipment in primary key order.
+    Each page is a ``WHERE id > <cursor> LIMIT n`` query, so deep pages
+    cost the same as the first one.
+    """
+    ordering = 'id'
+    page_size = 500
+    page_size_query_param = 'limit'
+    max_page_size = 5000
+
+
+class ColumnarCursorPagination(EquipmentCursorPagination):
+    """
+    The same cursors and response shape over a Parquet-stored dataset,
+    whose row positions stand in for ids
+    """
+
+    def paginate_columns(self, dataset_id, fields, request, equipment_type=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        position = int(cursor.position) if cursor and cursor.position is not None else None
+
+        if cursor and cursor.reverse:
+            self.page, has_before = columnar.page(dataset_id, fields, self.page_size, before=position,
+                                                  equipment_type=equipment_type)
+            self.has_previous, self.has_next = has_before, True
+        else:
+            self.page, self.has_next = columnar.page(dataset_id, fields, self.page_size, after=position,
+                                                     equipment_type=equipment_type)
+            self.has_previous = position is not None
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=self.page[-1]['id']))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=self.page[0]['id']))
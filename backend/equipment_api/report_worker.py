@@ -0,0 +1,36 @@
+"""
+Code run inside the worker processes of a report batch
+
+Spawned workers import this module before Django is set up, so models are
+only imported inside the functions.
+"""
+import shutil
+
+import django
+from django.db import connections
+
+
+def init_worker():
+    django.setup()
+
+
+def render_one(dataset_id, details, dest_path, use_cache):
+    """
+    Write the report of one dataset to ``dest_path``, through the report
+    cache unless ``use_cache`` is false
+    """
+    from .models import EquipmentDataset
+    from .reports import build_report, get_report
+
+    try:
+        dataset = EquipmentDataset.objects.select_related('user').get(id=dataset_id)
+        if use_cache:
+            try:
+                shutil.copyfile(get_report(dataset, details), dest_path)
+                return
+            except FileNotFoundError:
+                # Evicted by another worker between rendering and copying
+                pass
+        build_report(dataset, dest_path, details)
+    finally:
+        connections.close_all()
@@ -0,0 +1,370 @@
+"""
+PDF report generation and caching for Chemical Equipment Visualizer
+
+A report only depends on its dataset, so rendered files are cached in
+``REPORTS_DIR`` under a key derived from the dataset id, the dataset
+version (``updated_at``), ``TEMPLATE_VERSION`` and the details mode. Repeat downloads are
+served from disk, and the directory is kept under
+``REPORT_CACHE_MAX_BYTES`` by evicting the least recently used reports.
+"""
+import glob
+import hashlib
+import os
+import tempfile
+from datetime import datetime
+
+from django.conf import settings
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+from reportlab.lib.enums import TA_CENTER
+
+from . import columnar
+from .aggregates import type_distribution
+from .models import Equipment, EquipmentDataset
+
+
+# Bump whenever the layout below changes so cached reports are rebuilt
+TEMPLATE_VERSION = 2
+
+DETAIL_COLUMNS = ['equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature']
+
+# ?details= modes: every row, the first REPORT_DETAIL_ROW_CAP rows, or none
+DETAILS_FULL = 'full'
+DETAILS_CAPPED = 'capped'
+DETAILS_SUMMARY = 'summary'
+DETAILS_MODES = [DETAILS_FULL, DETAILS_CAPPED, DETAILS_SUMMARY]
+
+# Shared by every chunk of the Equipment Details table
+DETAIL_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4a5568')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 11),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('FONTSIZE', (0, 1), (-1, -1), 9),
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+    ('TOPPADDING', (0, 1), (-1, -1), 6),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+])
+DETAIL_HEADER = ['Name', 'Type', 'Flow', 'Press', 'Temp']
+DETAIL_COL_WIDTHS = [2.2*inch, 1.8*inch, 0.9*inch, 0.9*inch, 0.9*inch]
+
+
+def report_key(dataset, details=DETAILS_FULL):
+    """Content address of the report for the current version of ``dataset``"""
+    source = f'{dataset.id}:{dataset.updated_at.isoformat()}:{TEMPLATE_VERSION}:{details}'
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+def report_filename(dataset, key):
+    return f'report_{dataset.id}_{key[:16]}.pdf'
+
+
+class DetailTable(Table):
+    """
+    A part of the Equipment Details table. ``detail_rows`` counts its rows
+    below the repeated header; parts split off across pages count their own.
+    """
+
+    def __init__(self, data, *args, **kwargs):
+        super().__init__(data, *args, **kwargs)
+        self.detail_rows = len(data) - self.repeatRows
+
+
+def detail_tables(rows, chunk_rows):
+    """
+    Yield the Equipment Details table as tables of at most ``chunk_rows``
+    rows each. ReportLab lays out and splits a table as a whole, which is
+    superlinear in its length; small tables keep the cost per row constant.
+    """
+    chunk = [DETAIL_HEADER]
+    for name, equipment_type, flowrate, pressure, temperature in rows:
+        chunk.append([
+            name[:20],
+            equipment_type[:15],
+            f'{flowrate:.1f}',
+            f'{pressure:.1f}',
+            f'{temperature:.1f}'
+        ])
+        if chunk_rows and len(chunk) > chunk_rows:
+            yield DetailTable(chunk, colWidths=DETAIL_COL_WIDTHS, style=DETAIL_TABLE_STYLE, repeatRows=1)
+            chunk = [DETAIL_HEADER]
+    if len(chunk) > 1:
+        yield DetailTable(chunk, colWidths=DETAIL_COL_WIDTHS, style=DETAIL_TABLE_STYLE, repeatRows=1)
+
+
+def build_report(dataset, output, details=DETAILS_FULL, chunk_rows=None, progress=None):
+    """
+    Render the report for ``dataset`` into ``output``, a filename or a
+    binary file object. ``chunk_rows`` defaults to REPORT_DETAIL_CHUNK_ROWS;
+    0 renders the details as one table. ``progress(phase, rows)`` is called
+    as equipment rows are laid out.
+    """
+    if chunk_rows is None:
+        chunk_rows = settings.REPORT_DETAIL_CHUNK_ROWS
+
+    doc = SimpleDocTemplate(output, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch)
+
+    # Container for PDF elements
+    elements = []
+
+    # Styles
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        textColor=colors.HexColor('#1a365d'),
+        spaceAfter=30,
+        alignment=TA_CENTER
+    )
+
+    heading_style = ParagraphStyle(
+        'CustomHeading',
+        parent=styles['Heading2'],
+        fontSize=16,
+        textColor=colors.HexColor('#2d3748'),
+        spaceAfter=12,
+        spaceBefore=12
+    )
+
+    # Title
+    title = Paragraph("Chemical Equipment Analysis Report", title_style)
+    elements.append(title)
+    elements.append(Spacer(1, 0.2*inch))
+
+    # Report Info
+    report_info = [
+        ['Report Generated:', datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
+        ['Dataset:', dataset.filename],
+        ['Upload Date:', dataset.upload_date.strftime('%Y-%m-%d %H:%M:%S')],
+        ['Generated By:', dataset.user.username],
+    ]
+
+    info_table = Table(report_info, colWidths=[2*inch, 4*inch])
+    info_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#e2e8f0')),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ('TOPPADDING', (0, 0), (-1, -1), 8),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ]))
+
+    elements.append(info_table)
+    elements.append(Spacer(1, 0.3*inch))
+
+    # Summary Statistics
+    elements.append(Paragraph("Summary Statistics", heading_style))
+
+    summary_data = [
+        ['Metric', 'Value'],
+        ['Total Equipment', str(dataset.total_equipment)],
+        ['Average Flowrate', f'{dataset.avg_flowrate:.2f}'],
+        ['Average Pressure', f'{dataset.avg_pressure:.2f}'],
+        ['Average Temperature', f'{dataset.avg_temperature:.2f}'],
+    ]
+
+    summary_table = Table(summary_data, colWidths=[3*inch, 3*inch])
+    summary_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4a5568')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('FONTSIZE', (0, 1), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
+        ('TOPPADDING', (0, 1), (-1, -1), 8),
+    ]))
+
+    elements.append(summary_table)
+    elements.append(Spacer(1, 0.3*inch))
+
+    # Equipment Type Distribution
+    type_statistics = list(dataset.type_statistics.all())
+
+    elements.append(Paragraph("Equipment Type Distribution", heading_style))
+
+    type_data = [['Equipment Type', 'Count', 'Percentage']]
+    for equipment_type, count in type_distribution(type_statistics):
+        percentage = (count / dataset.total_equipment) * 100
+        type_data.append([
+            equipment_type,
+            str(count),
+            f'{percentage:.1f}%'
+        ])
+
+    type_table = Table(type_data, colWidths=[3*inch, 1.5*inch, 1.5*inch])
+    type_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4a5568')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('FONTSIZE', (0, 1), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
+        ('TOPPADDING', (0, 1), (-1, -1), 8),
+    ]))
+
+    elements.append(type_table)
+    elements.append(Spacer(1, 0.3*inch))
+
+    # Parameter Statistics by Type
+    elements.append(Paragraph("Parameter Statistics by Type", heading_style))
+
+    stats_data = [['Type', 'Parameter', 'Count', 'Mean', 'Std', 'Min', 'P50', 'P95', 'P99', 'Max']]
+    for stat in type_statistics:
+        stats_data.append([
+            stat.equipment_type[:15],
+            stat.get_parameter_display(),
+            str(stat.count),
+            f'{stat.mean:.1f}',
+            '-' if stat.std is None else f'{stat.std:.1f}',
+            f'{stat.min:.1f}',
+            f'{stat.p50:.1f}',
+            f'{stat.p95:.1f}',
+            f'{stat.p99:.1f}',
+            f'{stat.max:.1f}'
+        ])
+
+    stats_table = Table(stats_data, colWidths=[1.2*inch, 0.9*inch] + [0.55*inch] * 8)
+    stats_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4a5568')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 9),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('FONTSIZE', (0, 1), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
+        ('TOPPADDING', (0, 1), (-1, -1), 4),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+    ]))
+
+    elements.append(stats_table)
+    elements.append(PageBreak())
+
+    # Equipment Details
+    elements.append(Paragraph("Equipment Details", heading_style))
+    elements.append(Spacer(1, 0.1*inch))
+
+    if details == DETAILS_SUMMARY:
+        elements.append(Paragraph(
+            f'Individual rows are omitted from this report; the {dataset.total_equipment} items '
+            'are summarized in the Parameter Statistics by Type table.', styles['Normal']))
+    else:
+        limit = None
+        if details == DETAILS_CAPPED and dataset.total_equipment > settings.REPORT_DETAIL_ROW_CAP:
+            limit = settings.REPORT_DETAIL_ROW_CAP
+            elements.append(Paragraph(
+                f'Showing the first {settings.REPORT_DETAIL_ROW_CAP} of {dataset.total_equipment} items.',
+                styles['Normal']))
+            elements.append(Spacer(1, 0.1*inch))
+        if dataset.storage == EquipmentDataset.STORAGE_PARQUET:
+            equipment_rows = columnar.rows(dataset.id, DETAIL_COLUMNS, limit=limit)
+        else:
+            equipment_rows = Equipment.objects.filter(dataset=dataset).order_by('id').values_list(*DETAIL_COLUMNS)
+            equipment_rows = equipment_rows[:limit].iterator()
+        elements.extend(detail_tables(equipment_rows, chunk_rows))
+
+    if progress is not None:
+        rendered = 0
+
+        def after_flowable(flowable):
+            # Called for every drawn part of a details table, including parts split across pages
+            nonlocal rendered
+            if isinstance(flowable, DetailTable):
+                rendered += flowable.detail_rows
+                progress('rendering', rendered)
+
+        doc.afterFlowable = after_flowable
+
+    # Build PDF
+    doc.build(elements)
+
+
+def get_report(dataset, details=DETAILS_FULL, progress=None):
+    """
+    Path of the cached report for ``dataset``, rendering it first if needed
+    """
+    path = os.path.join(settings.REPORTS_DIR, report_filename(dataset, report_key(dataset, details)))
+    try:
+        # Cache hit: refresh the mtime that eviction uses as last access
+        os.utime(path)
+        return path
+    except FileNotFoundError:
+        pass
+
+    # Render next to the target and rename, so readers never see a partial file
+    fd, tmp_path = tempfile.mkstemp(suffix='.pdf.tmp', dir=settings.REPORTS_DIR)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            build_report(dataset, f, details, progress=progress)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+    evict_reports(keep=path)
+    return path
+
+
+def evict_reports(keep=None, max_bytes=None):
+    """
+    Remove least recently used reports until ``REPORTS_DIR`` fits in
+    ``max_bytes``; ``keep`` is never removed.
+    """
+    if max_bytes is None:
+        max_bytes = settings.REPORT_CACHE_MAX_BYTES
+
+    entries = []
+    for path in glob.glob(os.path.join(settings.REPORTS_DIR, '*.pdf')):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def discard_reports(dataset_id):
+    """Remove every cached report of a dataset"""
+    for path in glob.glob(os.path.join(settings.REPORTS_DIR, f'report_{dataset_id}_*.pdf')):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def run_report_job(job, progress):
+    """Job handler: render the report of ``job.dataset`` into the cache"""
+    if job.dataset is None:
+        raise ValueError('Dataset was deleted')
+    get_report(job.dataset, job.params.get('details', DETAILS_FULL), progress=progress)
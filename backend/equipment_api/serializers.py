@@ -2,8 +2,11 @@
 Serializers for Chemical Equipment Visualizer API
 """
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth.models import User
-from .models import EquipmentDataset, Equipment
+from django.urls import reverse
+from .models import EquipmentDataset, Equipment, EquipmentTypeStatistics, Job, UploadSession
+from .upload_sessions import received_chunks
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -53,7 +56,8 @@ class EquipmentDatasetSerializer(serializers.ModelSerializer):
         model = EquipmentDataset
         fields = ['id', 'filename', 'upload_date', 'total_equipment', 
                   'avg_flowrate', 'avg_pressure', 'avg_temperature', 
-                  'equipment', 'username']
+                  'storage', 'equipment', 'username']
+        read_only_fields = ['storage']
 
 
 class DatasetSummarySerializer(serializers.ModelSerializer):
@@ -64,4 +68,67 @@ class DatasetSummarySerializer(serializers.ModelSerializer):
     class Meta:
         model = EquipmentDataset
         fields = ['id', 'filename', 'upload_date', 'total_equipment', 
-                  'avg_flowrate', 'avg_pressure', 'avg_temperature', 'username']
+                  'avg_flowrate', 'avg_pressure', 'avg_temperature', 'storage', 'username']
+        read_only_fields = ['storage']
+
+
+class EquipmentTypeStatisticsSerializer(serializers.ModelSerializer):
+    """Serializer for precomputed per-type statistics"""
+    
+    class Meta:
+        model = EquipmentTypeStatistics
+        fields = ['equipment_type', 'parameter', 'count', 'min', 'max', 'mean', 'std', 'p50', 'p95', 'p99']
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """Serializer for background job status"""
+    
+    dataset = DatasetSummarySerializer(read_only=True)
+    download_url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Job
+        fields = ['id', 'kind', 'status', 'phase', 'rows_processed', 'filename',
+                  'dataset', 'params', 'download_url', 'error', 'created_at', 'updated_at']
+    
+    def get_download_url(self, job):
+        if job.kind in (Job.KIND_REPORT, Job.KIND_REPORT_BATCH) and job.status == Job.STATUS_SUCCEEDED:
+            return reverse('job-download', args=[job.id])
+        return None
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Serializer for resumable upload sessions"""
+    
+    chunk_size = serializers.IntegerField(required=False, min_value=1)
+    sha256 = serializers.RegexField(r'^[0-9a-fA-F]{64}$', source='expected_hash', required=False, allow_blank=True)
+    total_chunks = serializers.IntegerField(read_only=True)
+    received_chunks = serializers.SerializerMethodField()
+    expires_at = serializers.DateTimeField(read_only=True)
+    
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'filename', 'size', 'chunk_size', 'sha256', 'total_chunks', 'received_chunks',
+                  'expires_at', 'created_at']
+        read_only_fields = ['created_at']
+    
+    def validate_filename(self, filename):
+        if not filename.endswith('.csv'):
+            raise serializers.ValidationError('Only CSV files are allowed')
+        return filename
+    
+    def validate_size(self, size):
+        if not 0 < size <= settings.UPLOAD_MAX_BYTES:
+            raise serializers.ValidationError(f'Size must be between 1 and {settings.UPLOAD_MAX_BYTES} bytes')
+        return size
+    
+    def validate_chunk_size(self, chunk_size):
+        if chunk_size > settings.UPLOAD_CHUNK_MAX_BYTES:
+            raise serializers.ValidationError(f'Chunks may be at most {settings.UPLOAD_CHUNK_MAX_BYTES} bytes')
+        return chunk_size
+    
+    def validate_sha256(self, sha256):
+        return sha256.lower()
+    
+    def get_received_chunks(self, session):
+        return received_chunks(session)
@@ -0,0 +1,38 @@
+"""
+Signal handlers for Equipment API
+"""
+from django.db.backends.signals import connection_created
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import invalidate_user
+from .models import EquipmentDataset, UserStatistics
+
+
+@receiver(connection_created)
+def enable_sqlite_wal(sender, connection, **kwargs):
+    """
+    Use write-ahead logging on SQLite so job status polls can still read
+    while a background ingestion holds a long write transaction.
+    """
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode=WAL')
+
+
+@receiver(post_delete, sender=EquipmentDataset)
+def subtract_dataset_statistics(sender, instance, **kwargs):
+    """Keep UserStatistics in step with deleted datasets, however they are deleted"""
+    UserStatistics.adjust(instance.user_id, datasets=-1, equipment=-instance.total_equipment)
+
+
+@receiver(post_save, sender=EquipmentDataset)
+@receiver(post_delete, sender=EquipmentDataset)
+def invalidate_cached_responses(sender, instance, **kwargs):
+    """
+    Drop the owner's cached responses once the change is committed, so a
+    concurrent request cannot cache the state from before it
+    """
+    user_id = instance.user_id
+    transaction.on_commit(lambda: invalidate_user(user_id))
@@ -0,0 +1,323 @@
+"""
+Tests for Equipment API
+
+Query plans and query counts are checked against the test database; the
+response and job caches, and every directory the API writes to, are
+swapped for throwaway ones.
+"""
+import glob
+import hashlib
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from .aggregates import compute_type_statistics
+from .caching import get_stats as get_cache_stats
+from .ingestion import find_duplicate, find_pending_ingestion, prune_old_datasets
+from .loaders import get_loader
+from .management.commands.bench_ingest import synthetic_frame
+from .models import EquipmentDataset, Equipment, EquipmentTypeStatistics, Job
+from .reports import build_report
+
+
+class APITestCase(TestCase):
+    """TestCase with private caches and storage directories"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls._storage = tempfile.mkdtemp(prefix='equipment_api_tests_')
+        cls._settings = override_settings(
+            CACHES={
+                name: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'tests-{name}'}
+                for name in ('default', 'jobs', 'responses')
+            },
+            UPLOAD_DIR=cls._storage,
+            UPLOAD_SESSION_DIR=f'{cls._storage}/sessions',
+            REPORTS_DIR=cls._storage,
+            COLUMNAR_DIR=f'{cls._storage}/columns',
+            JOB_WEB_DISPATCHER=False,
+        )
+        cls._settings.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls._settings.disable()
+        shutil.rmtree(cls._storage, ignore_errors=True)
+
+    def setUp(self):
+        for name in ('default', 'jobs', 'responses'):
+            caches[name].clear()
+
+    @staticmethod
+    def create_dataset(user, rows, seed):
+        frame = synthetic_frame(rows, seed)
+        dataset = EquipmentDataset.objects.create(user=user, filename=f'test_{seed}.csv', file_path='',
+                                                  content_hash=f'{seed:064x}', total_equipment=rows)
+        get_loader().load(dataset, frame)
+        EquipmentTypeStatistics.objects.bulk_create([
+            EquipmentTypeStatistics(dataset=dataset, **row) for row in compute_type_statistics(frame)
+        ])
+        return dataset
+
+
+# (query, queryset factory, index its plan must use)
+PLANS = [
+    ('datasets of a user, newest first',
+     lambda dataset: EquipmentDataset.objects.filter(user=dataset.user_id).order_by('-upload_date'),
+     'dataset_user_recent_idx'),
+    ('duplicate upload lookup',
+     lambda dataset: EquipmentDataset.objects.filter(user=dataset.user_id, content_hash=dataset.content_hash),
+     'dataset_user_hash_idx'),
+    ('equipment page',
+     lambda dataset: Equipment.objects.filter(dataset=dataset, id__gt=0).order_by('id')[:500],
+     'equipment_dataset_id_idx'),
+    ('equipment parameters in row order',
+     lambda dataset: Equipment.objects.filter(dataset=dataset).order_by('id')
+     .values_list('flowrate', 'pressure', 'temperature'),
+     'equipment_dataset_id_idx'),
+    ('equipment page of one type',
+     lambda dataset: Equipment.objects.filter(dataset=dataset, equipment_type='Pump').order_by('id')[:500],
+     'equipment_dataset_type_idx'),
+    ('equipment count per type',
+     lambda dataset: Equipment.objects.filter(dataset=dataset).values('equipment_type')
+     .annotate(count=Count('id')).order_by(),
+     'equipment_dataset_type_idx'),
+]
+
+# (endpoint, method, path, queries on a cache miss); cached paths must run none on a hit
+ENDPOINTS = [
+    ('list_datasets', 'get', '/api/datasets/', 1),
+    ('get_dataset_summary', 'get', '/api/datasets/{id}/', 3),
+    ('get_dataset_summary', 'get', '/api/datasets/{id}/?include_equipment=false', 2),
+    ('get_statistics', 'get', '/api/statistics/', 1),
+    ('list_equipment', 'get', '/api/datasets/{id}/equipment/', 2),
+    ('list_equipment', 'get', '/api/datasets/{id}/equipment/?type=Pump', 2),
+    ('export_dataset', 'get', '/api/datasets/{id}/export/?output=csv', 2),
+    ('get_chart_data', 'get', '/api/datasets/{id}/chart-data/', 3),
+    ('get_chart', 'get', '/api/datasets/{id}/charts/parameters-by-type.svg', 2),
+    ('queue_report_job', 'post', '/api/datasets/{id}/report/jobs/', 2),
+]
+CACHED_PATHS = {'/api/datasets/', '/api/datasets/{id}/?include_equipment=false', '/api/statistics/'}
+
+
+class QueryPlanTests(APITestCase):
+    """Hot queries use their indexes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='planner', password='secret')
+        cls.datasets = [cls.create_dataset(cls.user, 2_000, seed) for seed in range(2)]
+
+    def test_hot_queries_use_their_indexes(self):
+        if connection.vendor == 'postgresql':
+            # A freshly filled table has no statistics; judge whether the index is usable
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        for description, build, index in PLANS:
+            with self.subTest(description):
+                plan = build(self.datasets[0]).explain()
+                self.assertIn(index, plan)
+
+
+class EndpointQueryTests(APITestCase):
+    """Endpoints run a fixed number of queries however many datasets and rows there are"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='counter', password='secret')
+        # A small dataset among few, and a large one among many
+        cls.small = cls.create_dataset(cls.user, 200, 0)
+        cls.large = [cls.create_dataset(cls.user, 4_000, seed) for seed in range(1, 4)][-1]
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def request(self, method, path):
+        response = getattr(self.client, method)(path)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        self.assertLess(response.status_code, 300, path)
+        return response
+
+    def test_query_budgets(self):
+        for dataset in (self.small, self.large):
+            caches['responses'].clear()
+            for name, method, template, expected in ENDPOINTS:
+                path = template.format(id=dataset.id)
+                with self.subTest(f'{method.upper()} {path} (miss)'), self.assertNumQueries(expected):
+                    self.request(method, path)
+                if template in CACHED_PATHS:
+                    with self.subTest(f'{method.upper()} {path} (hit)'), self.assertNumQueries(0):
+                        self.request(method, path)
+
+    def test_summary_with_equipment_is_not_cached(self):
+        path = f'/api/datasets/{self.large.id}/'
+        first = self.request('get', path)
+        second = self.request('get', path)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(get_cache_stats()['get_dataset_summary'], {'hits': 0, 'misses': 2, 'not_modified': 0})
+        # It can still be revalidated
+        with self.assertNumQueries(0):
+            response = self.client.get(path, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_job_status(self):
+        job = Job.objects.create(user=self.user, kind=Job.KIND_REPORT, dataset=self.large)
+        with self.assertNumQueries(1):
+            response = self.request('get', f'/api/jobs/{job.id}/')
+        self.assertEqual(response.data['status'], Job.STATUS_QUEUED)
+
+
+class IngestionQueryTests(APITestCase):
+    """Duplicate lookups and pruning run a fixed number of queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='pruner', password='secret')
+        cls.datasets = [cls.create_dataset(cls.user, 500 * (seed + 1), seed) for seed in range(8)]
+
+    def test_find_duplicate(self):
+        dataset = self.datasets[3]
+        with self.assertNumQueries(1):
+            duplicate = find_duplicate(self.user, dataset.content_hash)
+            # DatasetSummarySerializer reads the username
+            self.assertEqual(duplicate.user.username, 'pruner')
+        self.assertEqual(duplicate, dataset)
+
+    def test_prune_old_datasets(self):
+        # One select, then five per pruned dataset whatever its size: equipment, type statistics,
+        # jobs pointing at it, the dataset itself and the UserStatistics update
+        with self.assertNumQueries(1 + 5 * 3):
+            prune_old_datasets(self.user, keep=5)
+        self.assertQuerysetEqual(EquipmentDataset.objects.filter(user=self.user).order_by('id'),
+                                 self.datasets[3:])
+
+
+@override_settings(INGESTION_ASYNC=True)
+class UploadDeduplicationTests(APITestCase):
+    """A file that is still being parsed is not queued a second time"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='uploader', password='secret')
+        cls.csv = synthetic_frame(50, 0).to_csv(index=False).encode()
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upload(self):
+        return self.client.post('/api/upload/', {'file': SimpleUploadedFile('equipment.csv', self.csv)},
+                                format='multipart')
+
+    def test_upload_returns_pending_job(self):
+        queued = self.upload()
+        self.assertEqual(queued.status_code, 202)
+        self.assertNotIn('duplicate', queued.data)
+
+        repeated = self.upload()
+        self.assertEqual(repeated.status_code, 202)
+        self.assertTrue(repeated.data['duplicate'])
+        self.assertEqual(repeated.data['job']['id'], queued.data['job']['id'])
+        self.assertEqual(repeated['Location'], queued['Location'])
+        self.assertEqual(Job.objects.filter(user=self.user, kind=Job.KIND_INGEST).count(), 1)
+
+    def test_concurrent_upload_returns_pending_job(self):
+        queued = self.upload()
+        # The second request checks before the first one has queued its job
+        lookups = iter([lambda user, content_hash: None, find_pending_ingestion])
+        with mock.patch('equipment_api.views.find_pending_ingestion',
+                        side_effect=lambda *args: next(lookups)(*args)):
+            repeated = self.upload()
+        self.assertEqual(repeated.status_code, 202)
+        self.assertEqual(repeated.data['job']['id'], queued.data['job']['id'])
+        self.assertEqual(Job.objects.filter(user=self.user, kind=Job.KIND_INGEST).count(), 1)
+        # The second copy of the file is not kept
+        self.assertEqual(len(glob.glob(f'{self._storage}/*.csv')), 1)
+
+    def test_upload_session_returns_pending_job(self):
+        queued = self.upload()
+        response = self.client.post('/api/uploads/', {
+            'filename': 'equipment.csv',
+            'size': len(self.csv),
+            'sha256': hashlib.sha256(self.csv).hexdigest(),
+        }, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['job']['id'], queued.data['job']['id'])
+        self.assertFalse(self.user.upload_sessions.exists())
+
+    def test_finished_job_is_not_reused(self):
+        queued = self.upload()
+        Job.objects.filter(id=queued.data['job']['id']).update(status=Job.STATUS_FAILED)
+        repeated = self.upload()
+        self.assertEqual(repeated.status_code, 202)
+        self.assertNotEqual(repeated.data['job']['id'], queued.data['job']['id'])
+
+
+class ReportProgressTests(APITestCase):
+    """Report progress counts every equipment row exactly once"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reporter', password='secret')
+        cls.dataset = cls.create_dataset(cls.user, 300, 0)
+
+    def test_progress_counts_rows(self):
+        # One table split across pages, page-sized tables, and tables that still split
+        for chunk_rows in (0, 40, 90):
+            with self.subTest(chunk_rows=chunk_rows):
+                reported = []
+                build_report(self.dataset, io.BytesIO(), chunk_rows=chunk_rows,
+                             progress=lambda phase, rows: reported.append(rows))
+                self.assertEqual(reported[-1], self.dataset.total_equipment)
+                self.assertEqual(reported, sorted(reported))
+
+
+@override_settings(UPLOAD_SESSION_MAX_OPEN=2, UPLOAD_SESSION_MAX_OPEN_BYTES=1000)
+class UploadSessionLimitTests(APITestCase):
+    """Open upload sessions are capped per user"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='chunker', password='secret')
+        cls.other = User.objects.create_user(username='neighbour', password='secret')
+
+    def open_session(self, user, size):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.post('/api/uploads/', {'filename': 'equipment.csv', 'size': size}, format='json')
+
+    def test_session_count_is_capped(self):
+        self.assertEqual(self.open_session(self.user, 100).status_code, 201)
+        session = self.open_session(self.user, 100)
+        self.assertEqual(session.status_code, 201)
+        self.assertEqual(self.open_session(self.user, 100).status_code, 429)
+        # Other users are not affected
+        self.assertEqual(self.open_session(self.other, 100).status_code, 201)
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        client.delete(f'/api/uploads/{session.data["id"]}/')
+        self.assertEqual(self.open_session(self.user, 100).status_code, 201)
+
+    def test_declared_bytes_are_capped(self):
+        self.assertEqual(self.open_session(self.user, 600).status_code, 201)
+        response = self.open_session(self.user, 600)
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('error', response.data)
+        self.assertEqual(self.open_session(self.user, 400).status_code, 201)
@@ -0,0 +1,39 @@
+"""
+Upload handlers that fingerprint files while they are received
+"""
+import hashlib
+
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+
+
+class ContentHashMixin:
+    """
+    Computes a SHA-256 of the bytes this handler stores and exposes it as
+    ``content_hash`` on the resulting uploaded file.
+    """
+
+    def new_file(self, *args, **kwargs):
+        # Set up first: the parent may raise StopFutureHandlers
+        self.content_hash = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        remaining = super().receive_data_chunk(raw_data, start)
+        # Data passed on to the next handler was not stored by this one
+        if remaining is None:
+            self.content_hash.update(raw_data)
+        return remaining
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.content_hash = self.content_hash.hexdigest()
+        return file
+
+
+class HashingMemoryFileUploadHandler(ContentHashMixin, MemoryFileUploadHandler):
+    pass
+
+
+class HashingTemporaryFileUploadHandler(ContentHashMixin, TemporaryFileUploadHandler):
+    pass
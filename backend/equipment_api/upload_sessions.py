@@ -0,0 +1,136 @@
+"""
+Resumable chunked uploads for Chemical Equipment Visualizer
+
+A client opens an upload session with the file's name and size, then PUTs
+the file as numbered chunks of ``chunk_size`` bytes, each with its SHA-256.
+Chunks may arrive in any order and be sent again after a dropped
+connection; the session lists the chunks it already holds so an upload can
+resume where it stopped. Every chunk is written in place into one part file
+per session, so completing a session only has to hash the file once before
+it is ingested like a single-request upload.
+"""
+import hashlib
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from .models import UploadSession, UploadChunk
+
+
+class ChunkError(ValueError):
+    """Raised when a chunk does not fit its session or fails its checksum"""
+
+
+class SessionLimitError(ValueError):
+    """Raised when a user already holds as many open sessions, or bytes, as allowed"""
+
+
+def part_path(session_id):
+    return os.path.join(settings.UPLOAD_SESSION_DIR, f'{session_id}.part')
+
+
+def create_session(user, filename, size, chunk_size, expected_hash=''):
+    """
+    Open a session and allocate its part file, unless the user's open
+    sessions would exceed UPLOAD_SESSION_MAX_OPEN sessions or
+    UPLOAD_SESSION_MAX_OPEN_BYTES declared bytes
+    """
+    discard_expired_sessions()
+    with transaction.atomic():
+        # Serializes concurrent requests of one user between the check and the insert
+        User.objects.select_for_update().only('id').get(pk=user.pk)
+        open_sessions = UploadSession.objects.filter(user=user).aggregate(count=Count('id'), size=Sum('size'))
+        if open_sessions['count'] >= settings.UPLOAD_SESSION_MAX_OPEN:
+            raise SessionLimitError(f'{open_sessions["count"]} upload sessions are already open; '
+                                    'complete or discard one first')
+        if (open_sessions['size'] or 0) + size > settings.UPLOAD_SESSION_MAX_OPEN_BYTES:
+            raise SessionLimitError(f'Open upload sessions may declare at most '
+                                    f'{settings.UPLOAD_SESSION_MAX_OPEN_BYTES} bytes in total; '
+                                    'complete or discard one first')
+        session = UploadSession.objects.create(user=user, filename=filename, size=size, chunk_size=chunk_size,
+                                               expected_hash=expected_hash)
+    os.makedirs(settings.UPLOAD_SESSION_DIR, exist_ok=True)
+    with open(part_path(session.id), 'wb') as f:
+        # Sparse on most filesystems; chunks fill it in place
+        f.truncate(size)
+    return session
+
+
+def received_chunks(session):
+    """Indexes of the chunks stored so far, in order"""
+    return list(session.chunks.values_list('index', flat=True))
+
+
+def write_chunk(session, index, stream, length, checksum):
+    """
+    Verify chunk ``index`` read from ``stream`` against its SHA-256 and
+    store it. A chunk is only written once it has been read in full and
+    verified, so a corrupt retry never overwrites good bytes.
+    """
+    if not 0 <= index < session.total_chunks:
+        raise ChunkError(f'Chunk index must be between 0 and {session.total_chunks - 1}')
+    expected_length = session.chunk_length(index)
+    if length != expected_length:
+        raise ChunkError(f'Chunk {index} must be {expected_length} bytes, got {length}')
+    checksum = checksum.strip().lower()
+    if UploadChunk.objects.filter(session=session, index=index, checksum=checksum).exists():
+        # A retry of a chunk that already arrived
+        return False
+
+    data = bytearray()
+    while len(data) < length:
+        block = stream.read(min(settings.CSV_READ_BUFFER_BYTES, length - len(data)))
+        if not block:
+            break
+        data += block
+    if len(data) != length:
+        raise ChunkError(f'Chunk {index} ended after {len(data)} of {length} bytes')
+    if hashlib.sha256(data).hexdigest() != checksum:
+        raise ChunkError(f'Checksum mismatch for chunk {index}')
+
+    with open(part_path(session.id), 'r+b') as f:
+        f.seek(index * session.chunk_size)
+        f.write(data)
+    UploadChunk.objects.update_or_create(session=session, index=index, defaults={'checksum': checksum})
+    # Keeps an active session from expiring
+    session.save(update_fields=['updated_at'])
+    return True
+
+
+def complete_session(session):
+    """
+    Check that every chunk arrived and return the SHA-256 of the assembled
+    file, which must match the one announced when the session was opened.
+    """
+    missing = session.total_chunks - session.chunks.count()
+    if missing:
+        raise ChunkError(f'{missing} of {session.total_chunks} chunks have not been received')
+
+    content_hash = hashlib.sha256()
+    with open(part_path(session.id), 'rb') as f:
+        for block in iter(lambda: f.read(settings.CSV_READ_BUFFER_BYTES), b''):
+            content_hash.update(block)
+    content_hash = content_hash.hexdigest()
+    if session.expected_hash and content_hash != session.expected_hash:
+        raise ChunkError('Assembled file does not match its SHA-256')
+    return content_hash
+
+
+def discard_session(session):
+    """Delete a session and its part file"""
+    path = part_path(session.id)
+    if os.path.exists(path):
+        os.remove(path)
+    session.delete()
+
+
+def discard_expired_sessions():
+    """Remove every session that has been idle longer than UPLOAD_SESSION_TTL"""
+    cutoff = timezone.now() - timedelta(seconds=settings.UPLOAD_SESSION_TTL)
+    for session in UploadSession.objects.filter(updated_at__lt=cutoff).only('id'):
+        discard_session(session)
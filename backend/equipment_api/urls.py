@@ -15,9 +15,27 @@ urlpatterns = [
     path('upload/', views.upload_csv, name='upload-csv'),
     path('datasets/', views.list_datasets, name='list-datasets'),
     path('datasets/<int:dataset_id>/', views.get_dataset_summary, name='dataset-summary'),
+    path('datasets/<int:dataset_id>/equipment/', views.list_equipment, name='list-equipment'),
+    path('datasets/<int:dataset_id>/export/', views.export_dataset, name='export-dataset'),
     path('datasets/<int:dataset_id>/delete/', views.delete_dataset, name='delete-dataset'),
+    path('datasets/<int:dataset_id>/chart-data/', views.get_chart_data, name='dataset-chart-data'),
+    path('datasets/<int:dataset_id>/charts/<slug:chart>.<slug:extension>', views.get_chart, name='dataset-chart'),
     path('datasets/<int:dataset_id>/report/', views.generate_pdf_report, name='generate-report'),
+    path('datasets/<int:dataset_id>/report/jobs/', views.queue_report_job, name='queue-report'),
+    
+    path('reports/batch/', views.queue_report_batch, name='queue-report-batch'),
+    
+    # Resumable chunked uploads
+    path('uploads/', views.create_upload_session, name='upload-session-create'),
+    path('uploads/<uuid:session_id>/', views.upload_session, name='upload-session'),
+    path('uploads/<uuid:session_id>/chunks/<int:index>/', views.upload_chunk, name='upload-chunk'),
+    path('uploads/<uuid:session_id>/complete/', views.complete_upload_session, name='upload-session-complete'),
+    
+    # Background jobs
+    path('jobs/<uuid:job_id>/', views.get_job_status, name='job-status'),
+    path('jobs/<uuid:job_id>/download/', views.download_job_artifact, name='job-download'),
     
     # Statistics endpoint
     path('statistics/', views.get_statistics, name='statistics'),
+    path('cache/stats/', views.response_cache_stats, name='response-cache-stats'),
 ]
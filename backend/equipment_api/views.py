@@ -1,16 +1,19 @@
 """
 Views for Chemical Equipment Visualizer API
 """
+import io
 import os
-import pandas as pd
-from io import BytesIO
+import re
 from datetime import datetime
 
 from django.conf import settings
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
-from django.http import FileResponse, JsonResponse
-from django.db.models import Count
+from django.db import IntegrityError, transaction
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
 
 from rest_framework import status, viewsets
 from rest_framework.decorators import api_view, permission_classes, action
@@ -18,23 +21,154 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.authtoken.models import Token
 
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
-
-from .models import EquipmentDataset, Equipment
+from . import jobs
+from .models import EquipmentDataset, Equipment, EquipmentTypeStatistics, Job, UploadSession, UserStatistics
+from .aggregates import type_distribution
+from .caching import cached_response, get_stats as get_cache_stats, reset_stats as reset_cache_stats
+from .analytics import DOWNSAMPLE_METHODS, chart_data
+from .charts import CHARTS, CONTENT_TYPES as CHART_CONTENT_TYPES, chart_key, render_chart
+from .encoders import encode_dataset, encode_dataset_summary, encode_dataset_summaries
+from .columnar import discard_columns, row_chunks as column_chunks
+from .exporters import EXPORT_FIELDS, EXPORTERS, queryset_chunks
+from .pagination import ColumnarCursorPagination, EquipmentCursorPagination
+from .reports import DETAILS_FULL, DETAILS_MODES, report_key, report_filename, get_report, discard_reports
+from .ingestion import (
+    ingest_csv, ingest_stored_csv, store_upload, find_duplicate, find_pending_ingestion, prune_old_datasets,
+    validate_csv,
+    InvalidCSVError, MissingColumnsError
+)
+from .upload_sessions import (
+    ChunkError, SessionLimitError, create_session, write_chunk, complete_session, discard_session, part_path
+)
 from .serializers import (
     UserSerializer, 
     UserRegistrationSerializer,
-    EquipmentDatasetSerializer,
     DatasetSummarySerializer,
-    EquipmentSerializer
+    EquipmentSerializer,
+    EquipmentTypeStatisticsSerializer,
+    JobSerializer,
+    UploadSessionSerializer
 )
 
 
+# Bytes read from disk per write to the client when serving files
+DOWNLOAD_BLOCK_BYTES = 64 * 1024
+
+
+def _query_flag(request, name, default):
+    """Read a boolean query parameter such as ?name=false"""
+    value = request.query_params.get(name)
+    if value is None:
+        return default
+    return value.lower() not in ('0', 'false', 'no', 'off')
+
+
+def _report_details(request):
+    """The ?details= mode of a report request, or None if it is not supported"""
+    details = request.query_params.get('details', DETAILS_FULL)
+    return details if details in DETAILS_MODES else None
+
+
+def _file_response(request, path, content_type, filename):
+    """
+    Serve a file, honouring a single ``Range: bytes=start-end`` request so
+    interrupted downloads can resume. Other range forms get the whole file.
+    """
+    size = os.path.getsize(path)
+    match = re.fullmatch(r'bytes=(\d*)-(\d*)', request.headers.get('Range', '').strip())
+    if match and any(match.groups()) and not (all(match.groups()) and int(match[2]) < int(match[1])):
+        if match[1]:
+            start = int(match[1])
+            end = min(int(match[2]), size - 1) if match[2] else size - 1
+        else:
+            # bytes=-N is the last N bytes
+            start = max(size - int(match[2]), 0)
+            end = size - 1
+        if start > end:
+            response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        
+        f = open(path, 'rb')
+        f.seek(start)
+        response = StreamingHttpResponse(_read_range(f, end - start + 1), status=status.HTTP_206_PARTIAL_CONTENT,
+                                         content_type=content_type)
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    else:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+        # Django's default of 4 KB means a write per page of a large report
+        response.block_size = DOWNLOAD_BLOCK_BYTES
+    
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def _read_range(f, length, block_size=DOWNLOAD_BLOCK_BYTES):
+    with f:
+        while length > 0:
+            block = f.read(min(block_size, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+def _upload_path(request, filename):
+    """Where an upload is kept once received"""
+    stored_name = f"{request.user.username}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{filename}"
+    return os.path.join(settings.UPLOAD_DIR, stored_name)
+
+
+def _duplicate_response(dataset):
+    serializer = DatasetSummarySerializer(dataset)
+    return Response({
+        'message': 'Identical file already uploaded',
+        'duplicate': True,
+        'dataset': serializer.data
+    }, status=status.HTTP_200_OK)
+
+
+def _ingestion_response(job, message, **extra):
+    return Response({
+        'message': message,
+        **extra,
+        'job': JobSerializer(job).data
+    }, status=status.HTTP_202_ACCEPTED, headers={
+        'Location': reverse('job-status', args=[job.id])
+    })
+
+
+def _pending_response(job):
+    return _ingestion_response(job, 'Identical file is already being processed', duplicate=True)
+
+
+def _queue_ingestion(request, filename, file_path, content_hash):
+    """Let the worker pool parse an upload stored at ``file_path``"""
+    try:
+        with transaction.atomic():
+            job = Job.objects.create(
+                user=request.user,
+                kind=Job.KIND_INGEST,
+                filename=filename,
+                file_path=file_path,
+                content_hash=content_hash
+            )
+    except IntegrityError:
+        # An identical upload was queued since find_pending_ingestion looked
+        pending = find_pending_ingestion(request.user, content_hash)
+        if pending is None:
+            raise
+        # Uploads stored within the same second share a name
+        if pending.file_path != file_path:
+            os.remove(file_path)
+        return _pending_response(pending)
+    jobs.enqueue(job)
+    
+    return _ingestion_response(job, 'File accepted for processing')
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def register_user(request):
@@ -119,104 +253,243 @@ def upload_csv(request):
         }, status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        # Read CSV file
-        df = pd.read_csv(file)
-        
-        # Validate required columns
-        required_columns = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        
-        if missing_columns:
-            return Response({
-                'error': f'Missing required columns: {", ".join(missing_columns)}'
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Clean data
-        df = df.dropna()
-        
-        # Calculate statistics
-        total_equipment = len(df)
-        avg_flowrate = df['Flowrate'].mean()
-        avg_pressure = df['Pressure'].mean()
-        avg_temperature = df['Temperature'].mean()
-        
-        # Save file
-        upload_dir = settings.UPLOAD_DIR
-        filename = f"{request.user.username}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.name}"
-        file_path = os.path.join(upload_dir, filename)
-        
-        # Save uploaded file
-        with open(file_path, 'wb+') as destination:
-            for chunk in file.chunks():
-                destination.write(chunk)
-        
-        # Create dataset record
-        dataset = EquipmentDataset.objects.create(
-            user=request.user,
-            filename=file.name,
-            file_path=file_path,
-            total_equipment=total_equipment,
-            avg_flowrate=avg_flowrate,
-            avg_pressure=avg_pressure,
-            avg_temperature=avg_temperature
-        )
-        
-        # Create equipment records
-        equipment_objects = []
-        for _, row in df.iterrows():
-            equipment_objects.append(Equipment(
-                dataset=dataset,
-                equipment_name=row['Equipment Name'],
-                equipment_type=row['Type'],
-                flowrate=row['Flowrate'],
-                pressure=row['Pressure'],
-                temperature=row['Temperature']
-            ))
-        
-        Equipment.objects.bulk_create(equipment_objects)
-        
-        # Maintain only last 5 datasets per user
-        user_datasets = EquipmentDataset.objects.filter(user=request.user).order_by('-upload_date')
-        if user_datasets.count() > 5:
-            old_datasets = user_datasets[5:]
-            for old_dataset in old_datasets:
-                # Delete associated file
-                if os.path.exists(old_dataset.file_path):
-                    os.remove(old_dataset.file_path)
-                old_dataset.delete()
-        
-        # Return dataset with equipment
-        serializer = EquipmentDatasetSerializer(dataset)
+        # Identical re-uploads reuse the dataset that was already parsed
+        duplicate = find_duplicate(request.user, getattr(file, 'content_hash', ''))
+        if duplicate:
+            return _duplicate_response(duplicate)
+        # or wait for the job already parsing one
+        pending = find_pending_ingestion(request.user, getattr(file, 'content_hash', ''))
+        if pending:
+            return _pending_response(pending)
+        
+        file_path = _upload_path(request, file.name)
+        
+        if settings.INGESTION_ASYNC:
+            # Malformed files are rejected here rather than by the job
+            validate_csv(file)
+            # Store the upload and let the worker pool parse it
+            store_upload(file, file_path)
+            return _queue_ingestion(request, file.name, file_path, getattr(file, 'content_hash', ''))
+        
+        # Parse, store and summarize the upload in a single streaming pass
+        dataset = ingest_csv(file, request.user, file_path)
+        prune_old_datasets(request.user)
+        
+        # Return dataset summary; the equipment rows are fetched separately
+        serializer = DatasetSummarySerializer(dataset)
         return Response({
             'message': 'File uploaded successfully',
             'dataset': serializer.data
         }, status=status.HTTP_201_CREATED)
         
+    except (MissingColumnsError, InvalidCSVError) as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return Response({
+            'error': f'Error processing file: {str(e)}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def create_upload_session(request):
+    """Open a resumable upload session for a CSV sent in chunks"""
+    serializer = UploadSessionSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    data = serializer.validated_data
+    # Clients that announce the file's SHA-256 skip sending a file they already uploaded
+    duplicate = find_duplicate(request.user, data.get('expected_hash', ''))
+    if duplicate:
+        return _duplicate_response(duplicate)
+    pending = find_pending_ingestion(request.user, data.get('expected_hash', ''))
+    if pending:
+        return _pending_response(pending)
+    
+    try:
+        session = create_session(
+            request.user,
+            data['filename'],
+            data['size'],
+            data.get('chunk_size', settings.UPLOAD_CHUNK_BYTES),
+            data.get('expected_hash', '')
+        )
+    except SessionLimitError as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+    
+    return Response(UploadSessionSerializer(session).data, status=status.HTTP_201_CREATED, headers={
+        'Location': reverse('upload-session', args=[session.id])
+    })
+
+
+def _get_upload_session(request, session_id):
+    try:
+        return UploadSession.objects.get(id=session_id, user=request.user)
+    except UploadSession.DoesNotExist:
+        return None
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def upload_session(request, session_id):
+    """Chunks received so far by an upload session; DELETE abandons it"""
+    session = _get_upload_session(request, session_id)
+    if session is None:
+        return Response({
+            'error': 'Upload session not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    if request.method == 'DELETE':
+        discard_session(session)
+        return Response({
+            'message': 'Upload session discarded'
+        }, status=status.HTTP_200_OK)
+    
+    return Response(UploadSessionSerializer(session).data, status=status.HTTP_200_OK)
+
+
+@api_view(['PUT'])
+@permission_classes([IsAuthenticated])
+def upload_chunk(request, session_id, index):
+    """
+    Store chunk ``index`` of an upload session. The raw request body is the
+    chunk and the ``X-Chunk-SHA256`` header its hex SHA-256.
+    """
+    session = _get_upload_session(request, session_id)
+    if session is None:
+        return Response({
+            'error': 'Upload session not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    checksum = request.headers.get('X-Chunk-SHA256')
+    if not checksum:
+        return Response({
+            'error': 'X-Chunk-SHA256 header is required'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        length = int(request.headers.get('Content-Length') or 0)
+        # The body is read from the stream so chunks are not limited by DATA_UPLOAD_MAX_MEMORY_SIZE
+        stored = write_chunk(session, index, request.stream or io.BytesIO(), length, checksum)
+    except ChunkError as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({
+        'index': index,
+        'stored': stored
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def complete_upload_session(request, session_id):
+    """Assemble an upload session's chunks and process the file like a single upload"""
+    session = _get_upload_session(request, session_id)
+    if session is None:
+        return Response({
+            'error': 'Upload session not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    try:
+        content_hash = complete_session(session)
+    except ChunkError as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_409_CONFLICT)
+    
+    duplicate = find_duplicate(request.user, content_hash)
+    if duplicate:
+        discard_session(session)
+        return _duplicate_response(duplicate)
+    pending = find_pending_ingestion(request.user, content_hash)
+    if pending:
+        discard_session(session)
+        return _pending_response(pending)
+    
+    if settings.INGESTION_ASYNC:
+        try:
+            with open(part_path(session.id), 'rb') as f:
+                validate_csv(f)
+        except (MissingColumnsError, InvalidCSVError) as e:
+            discard_session(session)
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+    
+    file_path = _upload_path(request, session.filename)
+    os.replace(part_path(session.id), file_path)
+    session.delete()
+    
+    if settings.INGESTION_ASYNC:
+        return _queue_ingestion(request, session.filename, file_path, content_hash)
+    
+    try:
+        dataset = ingest_stored_csv(request.user, session.filename, file_path, content_hash)
+        prune_old_datasets(request.user)
+    except MissingColumnsError as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response({
             'error': f'Error processing file: {str(e)}'
         }, status=status.HTTP_400_BAD_REQUEST)
+    
+    serializer = DatasetSummarySerializer(dataset)
+    return Response({
+        'message': 'File uploaded successfully',
+        'dataset': serializer.data
+    }, status=status.HTTP_201_CREATED)
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+def get_job_status(request, job_id):
+    """Get status and progress of a background job"""
+    try:
+        job = Job.objects.select_related('dataset__user').get(id=job_id, user=request.user)
+    except Job.DoesNotExist:
+        return Response({
+            'error': 'Job not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    data = JobSerializer(job).data
+    if job.status == Job.STATUS_RUNNING:
+        # Progress inside the job's transaction is only published to the cache
+        data.update(jobs.get_progress(job.id) or {})
+    
+    return Response(data, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+# The nested equipment array grows with the dataset, so only the summary alone is stored
+@cached_response('get_dataset_summary', store=lambda request: not _query_flag(request, 'include_equipment', True))
 def get_dataset_summary(request, dataset_id):
     """Get summary statistics for a specific dataset"""
     try:
-        dataset = EquipmentDataset.objects.get(id=dataset_id, user=request.user)
-        
-        # Get equipment type distribution
-        equipment_types = Equipment.objects.filter(dataset=dataset).values('equipment_type').annotate(
-            count=Count('equipment_type')
-        )
+        datasets = EquipmentDataset.objects.filter(id=dataset_id, user=request.user)
         
-        type_distribution = {item['equipment_type']: item['count'] for item in equipment_types}
+        # ?include_equipment=false leaves out the nested equipment array
+        if _query_flag(request, 'include_equipment', default=True):
+            data = encode_dataset(datasets)
+        else:
+            data = encode_dataset_summary(datasets)
         
-        serializer = EquipmentDatasetSerializer(dataset)
+        # Equipment type distribution comes from the precomputed statistics
+        type_statistics = list(EquipmentTypeStatistics.objects.filter(dataset_id=dataset_id))
         
         return Response({
-            'dataset': serializer.data,
-            'type_distribution': type_distribution
+            'dataset': data,
+            'type_distribution': dict(type_distribution(type_statistics)),
+            'type_statistics': EquipmentTypeStatisticsSerializer(type_statistics, many=True).data
         }, status=status.HTTP_200_OK)
         
     except EquipmentDataset.DoesNotExist:
@@ -227,11 +500,80 @@ def get_dataset_summary(request, dataset_id):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+def list_equipment(request, dataset_id):
+    """List a dataset's equipment one page at a time"""
+    datasets = EquipmentDataset.objects.filter(id=dataset_id, user=request.user)
+    storage = datasets.values_list('storage', flat=True).first()
+    if storage is None:
+        return Response({
+            'error': 'Dataset not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    # ?fields=equipment_name,flowrate projects the columns; id is always kept for the cursor
+    fields = EquipmentSerializer.Meta.fields
+    if request.query_params.get('fields'):
+        requested = [field.strip() for field in request.query_params['fields'].split(',') if field.strip()]
+        unknown = [field for field in requested if field not in fields]
+        if unknown:
+            return Response({
+                'error': f'Unknown fields: {", ".join(unknown)}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        fields = ['id'] + [field for field in requested if field != 'id']
+    
+    if storage == EquipmentDataset.STORAGE_PARQUET:
+        paginator = ColumnarCursorPagination()
+        page = paginator.paginate_columns(dataset_id, fields, request,
+                                          equipment_type=request.query_params.get('type') or None)
+        return paginator.get_paginated_response(page)
+    
+    queryset = Equipment.objects.filter(dataset_id=dataset_id)
+    if request.query_params.get('type'):
+        queryset = queryset.filter(equipment_type=request.query_params['type'])
+    
+    paginator = EquipmentCursorPagination()
+    page = paginator.paginate_queryset(queryset.values(*fields), request)
+    return paginator.get_paginated_response(page)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_dataset(request, dataset_id):
+    """Stream every equipment row of a dataset as NDJSON, JSON or CSV"""
+    datasets = EquipmentDataset.objects.filter(id=dataset_id, user=request.user)
+    storage = datasets.values_list('storage', flat=True).first()
+    if storage is None:
+        return Response({
+            'error': 'Dataset not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    # ?format= is reserved by DRF for renderer selection, hence ?output=
+    output = request.query_params.get('output', 'ndjson')
+    if output not in EXPORTERS:
+        return Response({
+            'error': f'Unsupported output format: {output}. Use one of: {", ".join(EXPORTERS)}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    if storage == EquipmentDataset.STORAGE_PARQUET:
+        chunks = column_chunks(dataset_id, EXPORT_FIELDS, equipment_type=request.query_params.get('type') or None)
+    else:
+        queryset = Equipment.objects.filter(dataset_id=dataset_id)
+        if request.query_params.get('type'):
+            queryset = queryset.filter(equipment_type=request.query_params['type'])
+        chunks = queryset_chunks(queryset)
+    
+    exporter, content_type, extension = EXPORTERS[output]
+    response = StreamingHttpResponse(exporter(chunks), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="dataset_{dataset_id}.{extension}"'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@cached_response('list_datasets')
 def list_datasets(request):
     """List all datasets for current user"""
     datasets = EquipmentDataset.objects.filter(user=request.user)
-    serializer = DatasetSummarySerializer(datasets, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return Response(encode_dataset_summaries(datasets), status=status.HTTP_200_OK)
 
 
 @api_view(['DELETE'])
@@ -244,6 +586,8 @@ def delete_dataset(request, dataset_id):
         # Delete associated file
         if os.path.exists(dataset.file_path):
             os.remove(dataset.file_path)
+        discard_reports(dataset.id)
+        discard_columns(dataset.id)
         
         dataset.delete()
         
@@ -262,177 +606,27 @@ def delete_dataset(request, dataset_id):
 def generate_pdf_report(request, dataset_id):
     """Generate PDF report for a dataset"""
     try:
-        dataset = EquipmentDataset.objects.get(id=dataset_id, user=request.user)
-        equipment_list = Equipment.objects.filter(dataset=dataset)
-        
-        # Create PDF buffer
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch)
-        
-        # Container for PDF elements
-        elements = []
-        
-        # Styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#1a365d'),
-            spaceAfter=30,
-            alignment=TA_CENTER
-        )
-        
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=16,
-            textColor=colors.HexColor('#2d3748'),
-            spaceAfter=12,
-            spaceBefore=12
-        )
-        
-        # Title
-        title = Paragraph("Chemical Equipment Analysis Report", title_style)
-        elements.append(title)
-        elements.append(Spacer(1, 0.2*inch))
-        
-        # Report Info
-        report_info = [
-            ['Report Generated:', datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
-            ['Dataset:', dataset.filename],
-            ['Upload Date:', dataset.upload_date.strftime('%Y-%m-%d %H:%M:%S')],
-            ['Generated By:', request.user.username],
-        ]
-        
-        info_table = Table(report_info, colWidths=[2*inch, 4*inch])
-        info_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#e2e8f0')),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ]))
-        
-        elements.append(info_table)
-        elements.append(Spacer(1, 0.3*inch))
-        
-        # Summary Statistics
-        elements.append(Paragraph("Summary Statistics", heading_style))
-        
-        summary_data = [
-            ['Metric', 'Value'],
-            ['Total Equipment', str(dataset.total_equipment)],
-            ['Average Flowrate', f'{dataset.avg_flowrate:.2f}'],
-            ['Average Pressure', f'{dataset.avg_pressure:.2f}'],
-            ['Average Temperature', f'{dataset.avg_temperature:.2f}'],
-        ]
-        
-        summary_table = Table(summary_data, colWidths=[3*inch, 3*inch])
-        summary_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4a5568')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-            ('TOPPADDING', (0, 1), (-1, -1), 8),
-        ]))
-        
-        elements.append(summary_table)
-        elements.append(Spacer(1, 0.3*inch))
-        
-        # Equipment Type Distribution
-        equipment_types = Equipment.objects.filter(dataset=dataset).values('equipment_type').annotate(
-            count=Count('equipment_type')
-        ).order_by('-count')
+        dataset = EquipmentDataset.objects.select_related('user').get(id=dataset_id, user=request.user)
         
-        elements.append(Paragraph("Equipment Type Distribution", heading_style))
-        
-        type_data = [['Equipment Type', 'Count', 'Percentage']]
-        for item in equipment_types:
-            percentage = (item['count'] / dataset.total_equipment) * 100
-            type_data.append([
-                item['equipment_type'],
-                str(item['count']),
-                f'{percentage:.1f}%'
-            ])
-        
-        type_table = Table(type_data, colWidths=[3*inch, 1.5*inch, 1.5*inch])
-        type_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4a5568')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-            ('TOPPADDING', (0, 1), (-1, -1), 8),
-        ]))
-        
-        elements.append(type_table)
-        elements.append(PageBreak())
-        
-        # Equipment Details
-        elements.append(Paragraph("Equipment Details", heading_style))
-        elements.append(Spacer(1, 0.1*inch))
-        
-        equipment_data = [['Name', 'Type', 'Flow', 'Press', 'Temp']]
-        for eq in equipment_list:
-            equipment_data.append([
-                eq.equipment_name[:20],
-                eq.equipment_type[:15],
-                f'{eq.flowrate:.1f}',
-                f'{eq.pressure:.1f}',
-                f'{eq.temperature:.1f}'
-            ])
-        
-        equipment_table = Table(equipment_data, colWidths=[2.2*inch, 1.8*inch, 0.9*inch, 0.9*inch, 0.9*inch])
-        equipment_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4a5568')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 11),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-            ('TOPPADDING', (0, 1), (-1, -1), 6),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-        ]))
-        
-        elements.append(equipment_table)
-        
-        # Build PDF
-        doc.build(elements)
-        
-        # Get PDF value
-        pdf = buffer.getvalue()
-        buffer.close()
-        
-        # Save to reports directory
-        report_filename = f"report_{dataset.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        report_path = os.path.join(settings.REPORTS_DIR, report_filename)
-        
-        with open(report_path, 'wb') as f:
-            f.write(pdf)
-        
-        # Return as download
-        response = FileResponse(open(report_path, 'rb'), content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="{report_filename}"'
+        # ?details=capped|summary shortens the Equipment Details section of large reports
+        details = _report_details(request)
+        if details is None:
+            return Response({
+                'error': f'Unsupported details mode: {request.query_params["details"]}. '
+                         f'Use one of: {", ".join(DETAILS_MODES)}'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
+        # Reports are content addressed, so the cache key doubles as the ETag
+        key = report_key(dataset, details)
+        etag = quote_etag(key)
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        else:
+            report_path = get_report(dataset, details)
+            response = _file_response(request, report_path, 'application/pdf', report_filename(dataset, key))
+        
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
         return response
         
     except EquipmentDataset.DoesNotExist:
@@ -447,13 +641,202 @@ def generate_pdf_report(request, dataset_id):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+def get_chart(request, dataset_id, chart, extension):
+    """Render a dataset chart as PNG or SVG from its precomputed statistics"""
+    try:
+        dataset = EquipmentDataset.objects.get(id=dataset_id, user=request.user)
+    except EquipmentDataset.DoesNotExist:
+        return Response({
+            'error': 'Dataset not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    if chart not in CHARTS:
+        return Response({
+            'error': f'Unknown chart: {chart}. Use one of: {", ".join(CHARTS)}'
+        }, status=status.HTTP_404_NOT_FOUND)
+    if extension not in CHART_CONTENT_TYPES:
+        return Response({
+            'error': f'Unsupported image format: {extension}. Use one of: {", ".join(CHART_CONTENT_TYPES)}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    key = chart_key(dataset, chart, extension)
+    etag = quote_etag(key)
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(render_chart(dataset, chart, extension, key),
+                                content_type=CHART_CONTENT_TYPES[extension])
+    
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_chart_data(request, dataset_id):
+    """Chart-ready aggregates whose size depends on ?points= and ?bins=, not on the dataset"""
+    try:
+        dataset = EquipmentDataset.objects.get(id=dataset_id, user=request.user)
+    except EquipmentDataset.DoesNotExist:
+        return Response({
+            'error': 'Dataset not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    try:
+        points = int(request.query_params.get('points', 500))
+        bins = int(request.query_params.get('bins', 20))
+    except ValueError:
+        return Response({
+            'error': 'points and bins must be integers'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if not 3 <= points <= settings.CHART_MAX_POINTS or not 1 <= bins <= 200:
+        return Response({
+            'error': f'points must be between 3 and {settings.CHART_MAX_POINTS}, bins between 1 and 200'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    method = request.query_params.get('method', 'lttb')
+    if method not in DOWNSAMPLE_METHODS:
+        return Response({
+            'error': f'Unsupported method: {method}. Use one of: {", ".join(DOWNSAMPLE_METHODS)}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response(chart_data(dataset, points, bins, method), status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def queue_report_job(request, dataset_id):
+    """Queue PDF report generation as a background job"""
+    try:
+        dataset = EquipmentDataset.objects.select_related('user').get(id=dataset_id, user=request.user)
+    except EquipmentDataset.DoesNotExist:
+        return Response({
+            'error': 'Dataset not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    details = _report_details(request)
+    if details is None:
+        return Response({
+            'error': f'Unsupported details mode: {request.query_params["details"]}. '
+                     f'Use one of: {", ".join(DETAILS_MODES)}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    job = Job.objects.create(
+        user=request.user,
+        kind=Job.KIND_REPORT,
+        filename=dataset.filename,
+        dataset=dataset,
+        params={'details': details}
+    )
+    jobs.enqueue(job)
+    
+    response = Response({
+        'message': 'Report queued for generation',
+        'job': JobSerializer(job).data
+    }, status=status.HTTP_202_ACCEPTED)
+    response['Location'] = reverse('job-status', args=[job.id])
+    return response
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def queue_report_batch(request):
+    """Queue a zip of the reports of all of the user's datasets"""
+    details = _report_details(request)
+    if details is None:
+        return Response({
+            'error': f'Unsupported details mode: {request.query_params["details"]}. '
+                     f'Use one of: {", ".join(DETAILS_MODES)}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    # ?all_users=true lets staff export every user's datasets
+    all_users = _query_flag(request, 'all_users', default=False)
+    if all_users and not request.user.is_staff:
+        return Response({
+            'error': 'Only staff can export reports of all users'
+        }, status=status.HTTP_403_FORBIDDEN)
+    
+    job = Job.objects.create(
+        user=request.user,
+        kind=Job.KIND_REPORT_BATCH,
+        params={'details': details, 'all_users': all_users}
+    )
+    jobs.enqueue(job)
+    
+    response = Response({
+        'message': 'Report batch queued for generation',
+        'job': JobSerializer(job).data
+    }, status=status.HTTP_202_ACCEPTED)
+    response['Location'] = reverse('job-status', args=[job.id])
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def download_job_artifact(request, job_id):
+    """Download the report or archive produced by a finished report job"""
+    try:
+        job = Job.objects.select_related('dataset__user').get(id=job_id, user=request.user)
+    except Job.DoesNotExist:
+        return Response({
+            'error': 'Job not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    if job.kind not in (Job.KIND_REPORT, Job.KIND_REPORT_BATCH):
+        return Response({
+            'error': 'Job has no downloadable result'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if job.status != Job.STATUS_SUCCEEDED:
+        return Response({
+            'error': f'Report is not ready (status: {job.status})'
+        }, status=status.HTTP_409_CONFLICT)
+    
+    if job.kind == Job.KIND_REPORT_BATCH:
+        # Archives are replaced by the user's next batch
+        if not job.artifact_path or not os.path.exists(job.artifact_path):
+            return Response({
+                'error': 'Archive is no longer available'
+            }, status=status.HTTP_404_NOT_FOUND)
+        return _file_response(request, job.artifact_path, 'application/zip', os.path.basename(job.artifact_path))
+    
+    if job.dataset is None:
+        return Response({
+            'error': 'Dataset not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    # A report evicted from the cache since the job ran is rendered again
+    details = job.params.get('details', DETAILS_FULL)
+    report_path = get_report(job.dataset, details)
+    return _file_response(request, report_path, 'application/pdf',
+                          report_filename(job.dataset, report_key(job.dataset, details)))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@cached_response('get_statistics')
 def get_statistics(request):
     """Get overall statistics for current user"""
-    total_datasets = EquipmentDataset.objects.filter(user=request.user).count()
-    total_equipment = Equipment.objects.filter(dataset__user=request.user).count()
+    # Maintained on ingestion and deletion, so no rows are counted here
+    statistics = UserStatistics.objects.filter(user=request.user).first()
     
     return Response({
-        'total_datasets': total_datasets,
-        'total_equipment': total_equipment,
+        'total_datasets': statistics.total_datasets if statistics else 0,
+        'total_equipment': statistics.total_equipment if statistics else 0,
         'username': request.user.username
     }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def response_cache_stats(request):
+    """Hit and miss counters of the response cache; DELETE resets them"""
+    if not request.user.is_staff:
+        return Response({
+            'error': 'Only staff can view response cache statistics'
+        }, status=status.HTTP_403_FORBIDDEN)
+    
+    if request.method == 'DELETE':
+        reset_cache_stats()
+    
+    return Response(get_cache_stats(), status=status.HTTP_200_OK)
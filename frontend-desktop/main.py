@@ -6,11 +6,19 @@ PyQt5 + Matplotlib Frontend with Beautiful Charts - FIXED
 
 import sys
 import os
+import re
+import time
+import bisect
+import hashlib
+import threading
 import requests
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from functools import partial
+from collections import defaultdict
+from requests.adapters import HTTPAdapter
+from urllib.parse import parse_qs, urlparse
+from urllib3.util.retry import Retry
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 from matplotlib import patches
@@ -20,14 +28,35 @@ from PyQt5.QtWidgets import (
     QLabel, QLineEdit, QPushButton, QTableWidget, QTableWidgetItem,
     QFileDialog, QMessageBox, QTabWidget, QGroupBox, QFormLayout,
     QScrollArea, QTextEdit, QFrame, QSizePolicy, QGridLayout, QHeaderView,
-    QSpacerItem
+    QSpacerItem, QProgressBar, QTableView
+)
+from PyQt5.QtCore import (
+    Qt, QPropertyAnimation, QEasingCurve, QTimer, pyqtSignal, QSize,
+    QObject, QRunnable, QThreadPool, QAbstractTableModel, QModelIndex
 )
-from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve, QTimer, pyqtSignal, QSize
 from PyQt5.QtGui import QFont, QPalette, QColor, QLinearGradient, QPainter, QBrush, QPen, QIcon
 
 
 # API Configuration
 API_BASE_URL = "https://chemical-equipment-backend-bjfj.onrender.com/api"
+# (connect, read) timeouts in seconds
+API_TIMEOUT = (5, 60)
+# Retries of failed connections and 429/502/503/504 responses, with
+# exponential backoff starting at API_RETRY_BACKOFF seconds
+API_RETRIES = 3
+API_RETRY_BACKOFF = 0.5
+# Keep-alive connections held open to the server
+API_POOL_SIZE = 4
+# Upper bounds (ms) of the latency histogram buckets; slower calls share a last bucket
+LATENCY_BUCKETS_MS = [50, 100, 250, 500, 1000, 2500, 5000]
+# Dataset ids and job UUIDs are folded into one endpoint per route
+ENDPOINT_ID_PATTERN = re.compile(r'/(\d+|[0-9a-f]{8}-[0-9a-f-]{27})/')
+# Equipment rows fetched per page as the details table is scrolled (the server allows up to 5000)
+EQUIPMENT_PAGE_ROWS = 2000
+# Bytes written to disk per block of a streamed download
+DOWNLOAD_BLOCK_BYTES = 64 * 1024
+# Seconds between status checks of server-side upload and report jobs
+JOB_POLL_INTERVAL = 1.0
 
 # Professional Color Palette
 COLORS = {
@@ -62,7 +91,7 @@ INPUT_STYLE = """
 LABEL_STYLE = "color: #4a5568; font-weight: 600; font-size: 12px;"
 
 TABLE_STYLE = """
-    QTableWidget {
+    QTableView {
         background-color: white;
         border: 1px solid #e2e8f0;
         border-radius: 8px;
@@ -71,11 +100,11 @@ TABLE_STYLE = """
         selection-background-color: #ebf4ff;
         selection-color: #2d3748;
     }
-    QTableWidget::item {
+    QTableView::item {
         padding: 8px 12px;
         border-bottom: 1px solid #edf2f7;
     }
-    QTableWidget::item:alternate {
+    QTableView::item:alternate {
         background-color: #f7fafc;
     }
     QHeaderView::section {
@@ -107,69 +136,547 @@ def _release_window(win):
         pass
 
 
+class LatencyHistogram:
+    """Latencies of one endpoint's calls, bucketed by LATENCY_BUCKETS_MS"""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.errors = 0
+
+    @property
+    def calls(self):
+        return sum(self.counts)
+
+    def record(self, ms):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of calls"""
+        threshold = fraction * self.calls
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS + [self.max_ms], self.counts):
+            seen += count
+            if seen >= threshold:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+
 class APIClient:
     """Client for interacting with Django REST API"""
 
-    def __init__(self):
-        self.base_url = API_BASE_URL
+    def __init__(self, base_url=API_BASE_URL, timeout=API_TIMEOUT, retries=API_RETRIES):
+        self.base_url = base_url
         self.token = None
+        self.timeout = timeout
+        self.latency = defaultdict(LatencyHistogram)
+        # Upload session ids by (path, size, mtime), so a failed upload of the same file resumes
+        self.upload_sessions = {}
+        # Calls come from several worker threads at once
+        self.latency_lock = threading.Lock()
+
+        # One keep-alive session, so calls reuse pooled TCP/TLS connections
+        self.session = requests.Session()
+        retry = Retry(
+            total=retries, backoff_factor=API_RETRY_BACKOFF,
+            status_forcelist=(429, 502, 503, 504), respect_retry_after_header=True,
+            # POSTs are only retried when the connection failed before anything was sent;
+            # upload chunks are PUT and safe to send again
+            allowed_methods=frozenset(['GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS']),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=API_POOL_SIZE, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({'Accept': 'application/json', 'Accept-Encoding': 'gzip, deflate'})
 
     def set_token(self, token):
         self.token = token
+        if token:
+            self.session.headers['Authorization'] = f'Token {token}'
+        else:
+            self.session.headers.pop('Authorization', None)
 
-    def get_headers(self):
-        headers = {'Content-Type': 'application/json'}
-        if self.token:
-            headers['Authorization'] = f'Token {self.token}'
-        return headers
+    def _request(self, method, path, **kwargs):
+        """Send a request on the pooled session and record its latency under its endpoint"""
+        kwargs.setdefault('timeout', self.timeout)
+        endpoint = f'{method} {ENDPOINT_ID_PATTERN.sub("/{id}/", path)}'
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", **kwargs)
+        except requests.exceptions.RequestException:
+            with self.latency_lock:
+                self.latency[endpoint].errors += 1
+            raise
+        with self.latency_lock:
+            self.latency[endpoint].record((time.perf_counter() - start) * 1000)
+        return response
+
+    def latency_report(self):
+        """Plain-text table of per-endpoint call counts and latencies"""
+        with self.latency_lock:
+            return self._format_latency()
+
+    def _format_latency(self):
+        lines = [f"{'Endpoint':<36} {'Calls':>5} {'Errors':>6} {'Mean':>7} {'p50':>7} {'p95':>7} {'Max':>7}"]
+        for endpoint, histogram in sorted(self.latency.items()):
+            if histogram.calls:
+                mean = histogram.total_ms / histogram.calls
+                lines.append(f"{endpoint:<36} {histogram.calls:>5} {histogram.errors:>6} {mean:>5.0f}ms "
+                             f"{histogram.percentile(0.5):>5.0f}ms {histogram.percentile(0.95):>5.0f}ms "
+                             f"{histogram.max_ms:>5.0f}ms")
+            else:
+                lines.append(f"{endpoint:<36} {0:>5} {histogram.errors:>6}")
+        buckets = ', '.join(f'≤{bound}' for bound in LATENCY_BUCKETS_MS)
+        lines.append(f"\nHistogram buckets (ms): {buckets}, >{LATENCY_BUCKETS_MS[-1]}")
+        for endpoint, histogram in sorted(self.latency.items()):
+            lines.append(f"{endpoint:<36} {' '.join(f'{count:>4}' for count in histogram.counts)}")
+        return '\n'.join(lines)
 
     def login(self, username, password):
-        url = f"{self.base_url}/auth/login/"
         data = {'username': username, 'password': password}
-        response = requests.post(url, json=data)
+        response = self._request('POST', '/auth/login/', json=data)
         return response.status_code, response.json()
 
     def register(self, user_data):
-        url = f"{self.base_url}/auth/register/"
-        response = requests.post(url, json=user_data)
+        response = self._request('POST', '/auth/register/', json=user_data)
         return response.status_code, response.json()
 
-    def upload_csv(self, file_path):
-        url = f"{self.base_url}/upload/"
-        headers = {'Authorization': f'Token {self.token}'}
+    def upload_csv(self, file_path, on_progress=None):
+        """
+        Send a CSV through a resumable upload session, one checksummed chunk
+        per request, and return the response of completing it. Chunks the
+        server already holds from an earlier, interrupted attempt are skipped.
+        ``on_progress(sent, total, bytes_per_second)`` is called after every chunk.
+        """
+        stat = os.stat(file_path)
+        key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+        session = self._resume_upload(key)
+        if session is None:
+            # Announcing the SHA-256 lets the server recognise a file it already has before any chunk is sent
+            sha256 = hashlib.sha256()
+            with open(file_path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    sha256.update(block)
+            response = self._request('POST', '/uploads/', json={
+                'filename': os.path.basename(file_path), 'size': stat.st_size, 'sha256': sha256.hexdigest()})
+            if response.status_code != 201:
+                # 200: the server already has this file; 202: it is already parsing it
+                return response.status_code, response.json()
+            session = response.json()
+            self.upload_sessions[key] = session['id']
+
+        chunk_size, received = session['chunk_size'], set(session['received_chunks'])
+        sent = sum(min(chunk_size, stat.st_size - index * chunk_size) for index in received)
+        resumed, start = sent, time.perf_counter()
         with open(file_path, 'rb') as f:
-            files = {'file': f}
-            response = requests.post(url, headers=headers, files=files)
+            for index in range(session['total_chunks']):
+                if index in received:
+                    continue
+                f.seek(index * chunk_size)
+                chunk = f.read(chunk_size)
+                response = self._request('PUT', f"/uploads/{session['id']}/chunks/{index}/", data=chunk, headers={
+                    'Content-Type': 'application/octet-stream',
+                    'X-Chunk-SHA256': hashlib.sha256(chunk).hexdigest()})
+                if response.status_code != 200:
+                    return response.status_code, response.json()
+                sent += len(chunk)
+                if on_progress:
+                    on_progress(sent, stat.st_size, (sent - resumed) / max(time.perf_counter() - start, 1e-6))
+
+        response = self._request('POST', f"/uploads/{session['id']}/complete/")
+        if response.status_code != 409:
+            # 409 means chunks are missing; the session is kept for another attempt
+            self.upload_sessions.pop(key, None)
         return response.status_code, response.json()
 
+    def _resume_upload(self, key):
+        """The still open upload session of a file, or None"""
+        session_id = self.upload_sessions.get(key)
+        if session_id is None:
+            return None
+        response = self._request('GET', f'/uploads/{session_id}/')
+        if response.status_code != 200:
+            # Expired on the server
+            self.upload_sessions.pop(key, None)
+            return None
+        return response.json()
+
+    def get_job(self, job_id):
+        response = self._request('GET', f'/jobs/{job_id}/')
+        return response.json()
+
     def list_datasets(self):
-        url = f"{self.base_url}/datasets/"
-        response = requests.get(url, headers=self.get_headers())
+        response = self._request('GET', '/datasets/')
         return response.json()
 
-    def get_dataset(self, dataset_id):
-        url = f"{self.base_url}/datasets/{dataset_id}/"
-        response = requests.get(url, headers=self.get_headers())
+    def get_dataset(self, dataset_id, include_equipment=True):
+        params = None if include_equipment else {'include_equipment': 'false'}
+        response = self._request('GET', f'/datasets/{dataset_id}/', params=params)
         return response.json()
 
+    def get_equipment_page(self, dataset_id, cursor=None, limit=EQUIPMENT_PAGE_ROWS):
+        """One page of a dataset's equipment and the cursor of the next page, or None after the last"""
+        params = {'limit': limit}
+        if cursor:
+            params['cursor'] = cursor
+        response = self._request('GET', f'/datasets/{dataset_id}/equipment/', params=params)
+        response.raise_for_status()
+        page = response.json()
+        next_cursor = parse_qs(urlparse(page['next']).query).get('cursor', [None])[0] if page['next'] else None
+        return page['results'], next_cursor
+
     def delete_dataset(self, dataset_id):
-        url = f"{self.base_url}/datasets/{dataset_id}/delete/"
-        response = requests.delete(url, headers=self.get_headers())
+        response = self._request('DELETE', f'/datasets/{dataset_id}/delete/')
         return response.json()
 
-    def generate_report(self, dataset_id, save_path):
-        url = f"{self.base_url}/datasets/{dataset_id}/report/"
-        response = requests.get(url, headers=self.get_headers())
-        with open(save_path, 'wb') as f:
-            f.write(response.content)
+    def generate_report(self, dataset_id, save_path, on_progress=None):
+        return self._download(f'/datasets/{dataset_id}/report/', save_path, on_progress)
+
+    def queue_report(self, dataset_id):
+        response = self._request('POST', f'/datasets/{dataset_id}/report/jobs/')
+        return response.status_code, response.json()
+
+    def download_job(self, job_id, save_path, on_progress=None):
+        return self._download(f'/jobs/{job_id}/download/', save_path, on_progress)
+
+    def _download(self, path, save_path, on_progress=None):
+        """
+        Stream a file straight to ``save_path`` without holding it in memory.
+        It is written to a ``.part`` file that only replaces ``save_path``
+        once complete. ``on_progress(received, total)`` is called per block;
+        ``total`` is None if the server sent no Content-Length.
+        """
+        partial_path = f'{save_path}.part'
+        # The latency histogram times the response headers; the body is read below
+        with self._request('GET', path, stream=True) as response:
+            response.raise_for_status()
+            total = int(response.headers['Content-Length']) if 'Content-Length' in response.headers else None
+            received = 0
+            try:
+                with open(partial_path, 'wb') as f:
+                    for block in response.iter_content(chunk_size=DOWNLOAD_BLOCK_BYTES):
+                        f.write(block)
+                        received += len(block)
+                        if on_progress:
+                            on_progress(received, total)
+                os.replace(partial_path, save_path)
+            except BaseException:
+                if os.path.exists(partial_path):
+                    os.remove(partial_path)
+                raise
         return True
 
+    def get_chart_data(self, dataset_id, points=500):
+        response = self._request('GET', f'/datasets/{dataset_id}/chart-data/', params={'points': points})
+        return response.json()
+
     def get_statistics(self):
-        url = f"{self.base_url}/statistics/"
-        response = requests.get(url, headers=self.get_headers())
+        response = self._request('GET', '/statistics/')
         return response.json()
 
 
+# ─── Background tasks ────────────────────────────────────────────────────────
+# API calls run on a QThreadPool so the GUI thread never waits on the network.
+
+class TaskCancelled(Exception):
+    """Raised inside a task's function once the task has been cancelled."""
+
+
+class TaskSignals(QObject):
+    """Signals of a Task; created on the GUI thread, so slots run there."""
+    progress = pyqtSignal(object)
+    succeeded = pyqtSignal(object)
+    failed = pyqtSignal(object)
+    finished = pyqtSignal()
+
+
+class Task(QRunnable):
+    """
+    Runs fn(task, *args) on a pool thread and reports back through signals.
+    Cancelling is cooperative: fn stops at its next check() or wait(), and
+    whatever a cancelled task returns or raises is dropped.
+    """
+
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.signals = TaskSignals()
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def check(self):
+        if self.cancelled:
+            raise TaskCancelled()
+
+    def wait(self, seconds):
+        """Sleep that ends early, raising TaskCancelled, when the task is cancelled."""
+        if self._cancelled.wait(seconds):
+            raise TaskCancelled()
+
+    def report(self, value):
+        if not self.cancelled:
+            self.signals.progress.emit(value)
+
+    def run(self):
+        try:
+            result = self.fn(self, *self.args)
+        except TaskCancelled:
+            pass
+        except Exception as e:
+            if not self.cancelled:
+                self.signals.failed.emit(e)
+        else:
+            if not self.cancelled:
+                self.signals.succeeded.emit(result)
+        finally:
+            self.signals.finished.emit()
+
+
+class TaskRunner:
+    """Starts a window's tasks by name; starting a name again supersedes its running task."""
+
+    def __init__(self, pool=None):
+        self.pool = pool or QThreadPool.globalInstance()
+        self.tasks = {}
+
+    def start(self, name, fn, *args, on_success=None, on_error=None, on_progress=None):
+        self.cancel(name)
+        task = Task(fn, *args)
+        # Signals already queued when a task is cancelled must not reach the window either
+        for signal, slot in [(task.signals.succeeded, on_success), (task.signals.failed, on_error),
+                             (task.signals.progress, on_progress)]:
+            if slot is not None:
+                signal.connect(lambda value, slot=slot: None if task.cancelled else slot(value))
+        task.signals.finished.connect(lambda: self._forget(name, task))
+        self.tasks[name] = task
+        self.pool.start(task)
+        return task
+
+    def running(self, name):
+        return name in self.tasks
+
+    def cancel(self, name):
+        task = self.tasks.pop(name, None)
+        if task is not None:
+            task.cancel()
+
+    def cancel_all(self):
+        for name in list(self.tasks):
+            self.cancel(name)
+
+    def _forget(self, name, task):
+        if self.tasks.get(name) is task:
+            del self.tasks[name]
+
+
+def _describe_error(error):
+    if isinstance(error, requests.exceptions.ConnectionError):
+        return 'Cannot connect to server.'
+    return str(error)
+
+
+# ─── Equipment table model ───────────────────────────────────────────────────
+# The details table only materializes the cells on screen. Rows live in NumPy
+# column arrays and are fetched page by page as the table is scrolled.
+
+class EquipmentTableModel(QAbstractTableModel):
+    """
+    A dataset's equipment, loaded lazily from the cursor-paginated
+    equipment endpoint. Filtering and sorting happen in the model over the
+    loaded columns; sorting first loads the remaining pages so the order
+    covers the whole dataset.
+    """
+
+    COLUMNS = [('equipment_name', 'Equipment Name'), ('equipment_type', 'Type'),
+               ('flowrate', 'Flowrate'), ('pressure', 'Pressure'), ('temperature', 'Temperature')]
+    TEXT_COLUMNS = 2
+
+    # Emitted whenever the loaded, visible or total row counts change
+    changed = pyqtSignal()
+    failed = pyqtSignal(object)
+
+    def __init__(self, api_client, dataset_id, total_rows, parent=None):
+        super().__init__(parent)
+        self.api_client = api_client
+        self.dataset_id = dataset_id
+        self.total_rows = total_rows
+        self.tasks = TaskRunner()
+
+        capacity = max(total_rows, 1)
+        self.columns = {field: np.empty(capacity, dtype=object if i < self.TEXT_COLUMNS else np.float64)
+                        for i, (field, _) in enumerate(self.COLUMNS)}
+        self.loaded = 0
+        self.cursor = ''  # '' before the first page, None after the last
+        self.fetching = False
+        self.filter_text = ''
+        self.matches = np.empty(capacity, dtype=bool)
+        self.sort_column, self.sort_order = -1, Qt.AscendingOrder
+        # Loaded row positions in display order
+        self.rows = np.empty(0, dtype=np.int64)
+        self.fetch_page()
+
+    # Qt model interface
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.COLUMNS[section][1]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            value = self.columns[self.COLUMNS[index.column()][0]][self.rows[index.row()]]
+            return value if index.column() < self.TEXT_COLUMNS else f"{value:.1f}"
+        if role == Qt.TextAlignmentRole and index.column() >= self.TEXT_COLUMNS:
+            return Qt.AlignCenter
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.cursor is not None
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not parent.isValid():
+            self.fetch_page()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sort_column, self.sort_order = column, order
+        if column >= 0 and self.cursor is not None:
+            # Shown in upload order until every page is in; see _on_page
+            self.fetch_page()
+            self.changed.emit()
+            return
+        self.layoutAboutToBeChanged.emit()
+        self.rows = self._display_rows()
+        self.layoutChanged.emit()
+
+    # Loading, filtering and sorting
+
+    @property
+    def sorting(self):
+        return self.sort_column >= 0
+
+    def fetch_page(self):
+        if self.cursor is None or self.fetching:
+            return
+        self.fetching = True
+        self.tasks.start('page', self._fetch_page, self.cursor,
+                         on_success=self._on_page, on_error=self._on_page_failed)
+
+    def _fetch_page(self, task, cursor):
+        results, next_cursor = self.api_client.get_equipment_page(self.dataset_id, cursor)
+        # Converted to columns on the worker thread
+        columns = {}
+        for i, (field, _) in enumerate(self.COLUMNS):
+            if i < self.TEXT_COLUMNS:
+                columns[field] = np.array([row[field] for row in results], dtype=object)
+            else:
+                columns[field] = np.fromiter((row[field] for row in results), np.float64, len(results))
+        return columns, len(results), next_cursor
+
+    def _on_page_failed(self, error):
+        self.fetching = False
+        self.failed.emit(error)
+
+    def _on_page(self, page):
+        self.fetching = False
+        columns, count, self.cursor = page
+        start, end = self.loaded, self.loaded + count
+        if end > len(self.matches):
+            # The dataset grew past the row count it was opened with
+            self._grow(end)
+        for field, values in columns.items():
+            self.columns[field][start:end] = values
+        self.matches[start:end] = self._match(start, end)
+        self.loaded = end
+
+        if self.sorting:
+            if self.cursor is not None:
+                self.fetch_page()
+            else:
+                self.sort(self.sort_column, self.sort_order)
+        else:
+            # Pages arrive in row order, so new matches go after the rows shown
+            new_rows = start + np.flatnonzero(self.matches[start:end])
+            if len(new_rows):
+                self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(new_rows) - 1)
+                self.rows = np.concatenate([self.rows, new_rows])
+                self.endInsertRows()
+            elif self.cursor is not None:
+                # Nothing on this page passed the filter; the view will not ask for more
+                self.fetch_page()
+        self.changed.emit()
+
+    def _grow(self, size):
+        for field, values in self.columns.items():
+            self.columns[field] = np.concatenate([values, np.empty(size - len(values), dtype=values.dtype)])
+        self.matches = np.concatenate([self.matches, np.empty(size - len(self.matches), dtype=bool)])
+
+    def set_filter(self, text):
+        """Only show rows whose name or type contains ``text``, ignoring case"""
+        self.filter_text = text.strip()
+        self.matches[:self.loaded] = self._match(0, self.loaded)
+        self.beginResetModel()
+        self.rows = self._display_rows()
+        self.endResetModel()
+        if len(self.rows) < EQUIPMENT_PAGE_ROWS:
+            # The view only asks for more rows once it has been scrolled to the end
+            self.fetch_page()
+        self.changed.emit()
+
+    def _match(self, start, end):
+        if not self.filter_text:
+            return np.ones(end - start, dtype=bool)
+        matches = np.zeros(end - start, dtype=bool)
+        for field, _ in self.COLUMNS[:self.TEXT_COLUMNS]:
+            text = pd.Series(self.columns[field][start:end], dtype=object).astype(str)
+            matches |= text.str.contains(self.filter_text, case=False, regex=False).to_numpy(dtype=bool)
+        return matches
+
+    def _display_rows(self):
+        rows = np.flatnonzero(self.matches[:self.loaded])
+        if self.sorting and self.cursor is None:
+            field = self.COLUMNS[self.sort_column][0]
+            values = self.columns[field][rows]
+            if self.sort_column < self.TEXT_COLUMNS:
+                values = values.astype(str)
+            if self.sort_order == Qt.DescendingOrder:
+                # Reversing a stable sort of the reversed rows keeps ties in upload order
+                rows = rows[::-1][np.argsort(values[::-1], kind='stable')][::-1]
+            else:
+                rows = rows[np.argsort(values, kind='stable')]
+        return rows
+
+    def describe(self):
+        """One-line summary of what the table shows"""
+        text = f"{self.loaded:,} of {self.total_rows:,} rows loaded"
+        if self.filter_text:
+            text = f"{len(self.rows):,} matching  ·  " + text
+        if self.sorting and self.cursor is not None:
+            text += "  ·  loading all rows to sort..."
+        return text
+
+    def close(self):
+        self.tasks.cancel_all()
+
+
 class ProfessionalMatplotlibCanvas(FigureCanvas):
     def __init__(self, parent=None, width=5, height=3, dpi=100):
         plt.style.use('seaborn-v0_8-darkgrid')
@@ -214,14 +721,13 @@ class ProfessionalMatplotlibCanvas(FigureCanvas):
         ax.grid(True, alpha=0.3, linestyle='--'); ax.set_axisbelow(True)
         self.figure.tight_layout(); self.draw()
 
-    def create_grouped_bar_chart(self, equipment_list, title):
+    def create_grouped_bar_chart(self, type_means, title):
         self.figure.clear()
         ax = self.figure.add_subplot(111)
-        names = [eq['equipment_name'][:12] + '...' if len(eq['equipment_name']) > 12
-                 else eq['equipment_name'] for eq in equipment_list]
-        flowrates = [eq['flowrate'] for eq in equipment_list]
-        pressures = [eq['pressure'] for eq in equipment_list]
-        temperatures = [eq['temperature'] for eq in equipment_list]
+        names = sorted(type_means)
+        flowrates = [type_means[t].get('flowrate', 0) for t in names]
+        pressures = [type_means[t].get('pressure', 0) for t in names]
+        temperatures = [type_means[t].get('temperature', 0) for t in names]
         x = np.arange(len(names)); width = 0.25
         ax.bar(x - width, flowrates, width, label='Flowrate',
                color=COLORS['chart_colors'][0], alpha=0.8, edgecolor='white', linewidth=1.5)
@@ -229,8 +735,8 @@ class ProfessionalMatplotlibCanvas(FigureCanvas):
                color=COLORS['chart_colors'][1], alpha=0.8, edgecolor='white', linewidth=1.5)
         ax.bar(x + width, temperatures, width, label='Temperature',
                color=COLORS['chart_colors'][2], alpha=0.8, edgecolor='white', linewidth=1.5)
-        ax.set_xlabel('Equipment', fontsize=10, weight='bold')
-        ax.set_ylabel('Values', fontsize=10, weight='bold')
+        ax.set_xlabel('Equipment Type', fontsize=10, weight='bold')
+        ax.set_ylabel('Mean Value', fontsize=10, weight='bold')
         ax.set_title(title, fontsize=12, weight='bold', pad=15)
         ax.set_xticks(x); ax.set_xticklabels(names, rotation=45, ha='right', fontsize=8)
         ax.legend(loc='upper right', fontsize=9, framealpha=0.9, shadow=True)
@@ -355,7 +861,7 @@ class AppController:
             self.register_window.close()
             self.register_window = None
 
-        self.api_client.token = None
+        self.api_client.set_token(None)
         self.login_window = LoginWindow(self.api_client, self)
         _keep_window(self.login_window)
         self.login_window.show()
@@ -399,6 +905,7 @@ class LoginWindow(QWidget):
         super().__init__()
         self.api_client = api_client
         self.controller = controller
+        self.tasks = TaskRunner()
         self.init_ui()
 
     def init_ui(self):
@@ -472,20 +979,28 @@ class LoginWindow(QWidget):
         if not username or not password:
             self.show_message('Please enter both username and password.', 'error')
             return
-        try:
-            self.login_btn.setEnabled(False); self.login_btn.setText('Signing in...')
-            QApplication.processEvents()
-            status_code, result = self.api_client.login(username, password)
-            if status_code == 200 and 'token' in result:
-                self.controller.on_login_success(result['token'], result['user'])
-            else:
-                self.show_message(result.get('error', 'Invalid username or password.'), 'error')
-        except requests.exceptions.ConnectionError:
+        self.login_btn.setEnabled(False); self.login_btn.setText('Signing in...')
+        self.tasks.start('login', lambda task: self.api_client.login(username, password),
+                         on_success=self._on_login_result, on_error=self._on_login_error)
+
+    def _on_login_result(self, response):
+        self.login_btn.setEnabled(True); self.login_btn.setText('Sign In')
+        status_code, result = response
+        if status_code == 200 and 'token' in result:
+            self.controller.on_login_success(result['token'], result['user'])
+        else:
+            self.show_message(result.get('error', 'Invalid username or password.'), 'error')
+
+    def _on_login_error(self, error):
+        self.login_btn.setEnabled(True); self.login_btn.setText('Sign In')
+        if isinstance(error, requests.exceptions.ConnectionError):
             self.show_message('Cannot connect to server.\nCheck your internet connection.', 'error')
-        except Exception as e:
-            self.show_message(f'Error: {str(e)}', 'error')
-        finally:
-            self.login_btn.setEnabled(True); self.login_btn.setText('Sign In')
+        else:
+            self.show_message(f'Error: {str(error)}', 'error')
+
+    def closeEvent(self, event):
+        self.tasks.cancel_all()
+        super().closeEvent(event)
 
     def show_message(self, text, msg_type='error'):
         self.message_label.setText(text)
@@ -501,6 +1016,7 @@ class RegisterWindow(QWidget):
         super().__init__()
         self.api_client = api_client
         self.controller = controller
+        self.tasks = TaskRunner()
         self.init_ui()
 
     def init_ui(self):
@@ -608,22 +1124,30 @@ class RegisterWindow(QWidget):
             'last_name': self.reg_last_name.text().strip(),
         }
 
-        try:
-            self.register_btn.setEnabled(False); self.register_btn.setText('Creating account...')
-            QApplication.processEvents()
-            status_code, result = self.api_client.register(user_data)
-            if status_code == 201 and 'token' in result:
-                # Hand off to controller — it will close windows safely
-                self.controller.on_login_success(result['token'], result['user'])
-            else:
-                error_text = _parse_api_errors(result)
-                self.show_message(error_text, 'error')
-        except requests.exceptions.ConnectionError:
+        self.register_btn.setEnabled(False); self.register_btn.setText('Creating account...')
+        self.tasks.start('register', lambda task: self.api_client.register(user_data),
+                         on_success=self._on_register_result, on_error=self._on_register_error)
+
+    def _on_register_result(self, response):
+        self.register_btn.setEnabled(True); self.register_btn.setText('Create Account')
+        status_code, result = response
+        if status_code == 201 and 'token' in result:
+            # Hand off to controller — it will close windows safely
+            self.controller.on_login_success(result['token'], result['user'])
+        else:
+            error_text = _parse_api_errors(result)
+            self.show_message(error_text, 'error')
+
+    def _on_register_error(self, error):
+        self.register_btn.setEnabled(True); self.register_btn.setText('Create Account')
+        if isinstance(error, requests.exceptions.ConnectionError):
             self.show_message('Cannot connect to server.\nCheck your internet connection.', 'error')
-        except Exception as e:
-            self.show_message(f'Error: {str(e)}', 'error')
-        finally:
-            self.register_btn.setEnabled(True); self.register_btn.setText('Create Account')
+        else:
+            self.show_message(f'Error: {str(error)}', 'error')
+
+    def closeEvent(self, event):
+        self.tasks.cancel_all()
+        super().closeEvent(event)
 
     def show_message(self, text, msg_type='error'):
         self.message_label.setText(text)
@@ -641,7 +1165,9 @@ class MainWindow(QMainWindow):
         self.user = user
         self.controller = controller
         self.current_dataset = None
+        self.equipment_model = None
         self.datasets = []
+        self.tasks = TaskRunner()
         self.init_ui()
         self.load_data()
 
@@ -692,6 +1218,17 @@ class MainWindow(QMainWindow):
         body_layout.addWidget(self.tabs)
         root.addWidget(body)
 
+        self.report_progress = QProgressBar(); self.report_progress.setRange(0, 1000)
+        self.report_progress.setTextVisible(False); self.report_progress.setFixedSize(160, 10)
+        self.report_progress.setStyleSheet(self.upload_progress.styleSheet())
+        self.report_progress.hide()
+        self.statusBar().addPermanentWidget(self.report_progress)
+        self.cancel_report_btn = StyledButton('Cancel', 'danger')
+        self.cancel_report_btn.setCursor(Qt.PointingHandCursor)
+        self.cancel_report_btn.clicked.connect(self.cancel_report)
+        self.cancel_report_btn.hide()
+        self.statusBar().addPermanentWidget(self.cancel_report_btn)
+
     def _build_header(self):
         header = GradientWidget(); header.setFixedHeight(60)
         layout = QHBoxLayout(header); layout.setContentsMargins(24, 0, 24, 0)
@@ -708,6 +1245,11 @@ class MainWindow(QMainWindow):
                 padding:6px 20px; font-weight:bold; font-size:12px; }
             QPushButton:hover { background-color:rgba(255,255,255,0.25); }
         """)
+        nb = QPushButton('Network'); nb.setCursor(Qt.PointingHandCursor)
+        nb.setToolTip('Per-endpoint request latencies of this session')
+        nb.setStyleSheet(lb.styleSheet() + "QPushButton { margin-right:8px; }")
+        nb.clicked.connect(self.show_network_stats)
+        layout.addWidget(nb)
         lb.clicked.connect(self.handle_logout)
         layout.addWidget(lb)
         return header
@@ -743,6 +1285,15 @@ class MainWindow(QMainWindow):
         zl.addWidget(self.upload_btn, 0, Qt.AlignCenter)
         layout.addWidget(zone)
 
+        self.upload_progress = QProgressBar(); self.upload_progress.setRange(0, 1000)
+        self.upload_progress.setTextVisible(False); self.upload_progress.setFixedHeight(10)
+        self.upload_progress.setStyleSheet(f"""
+            QProgressBar {{ border:none; border-radius:5px; background-color:#edf2f7; }}
+            QProgressBar::chunk {{ border-radius:5px; background-color:{COLORS['success']}; }}
+        """)
+        self.upload_progress.hide()
+        layout.addWidget(self.upload_progress)
+
         self.upload_message = QTextEdit(); self.upload_message.setReadOnly(True)
         self.upload_message.setMaximumHeight(90)
         self.upload_message.setStyleSheet("QTextEdit { border:1px solid #e2e8f0; border-radius:8px; padding:10px; font-size:12px; background-color:#fafbfc; }")
@@ -804,92 +1355,168 @@ class MainWindow(QMainWindow):
         self.load_datasets(); self.load_statistics()
 
     def load_statistics(self):
-        try:
-            stats = self.api_client.get_statistics()
-            self.datasets_card.update_value(stats.get('total_datasets', 0))
-            self.equipment_card.update_value(stats.get('total_equipment', 0))
-        except Exception as e:
-            print(f"Error loading statistics: {e}")
+        self.tasks.start('statistics', lambda task: self.api_client.get_statistics(),
+                         on_success=self._show_statistics,
+                         on_error=lambda e: print(f"Error loading statistics: {e}"))
+
+    def _show_statistics(self, stats):
+        self.datasets_card.update_value(stats.get('total_datasets', 0))
+        self.equipment_card.update_value(stats.get('total_equipment', 0))
 
     def upload_file(self):
+        if self.tasks.running('upload'):
+            # The button doubles as Cancel while an upload is in flight
+            self.tasks.cancel('upload')
+            self._reset_upload_button()
+            self._show_upload_error('Upload cancelled. Choose the same file again to resume it.')
+            return
         file_path, _ = QFileDialog.getOpenFileName(self, 'Select CSV File', '', 'CSV Files (*.csv)')
         if not file_path:
             return
-        try:
-            self.upload_btn.setEnabled(False); self.upload_btn.setText('Uploading...')
-            self.upload_message.setText('📤 Uploading file...'); QApplication.processEvents()
-            status_code, result = self.api_client.upload_csv(file_path)
-            if status_code == 201:
-                ds = result.get('dataset', {})
-                self.upload_message.setHtml(f"""
-                <div style='color:#22543d; background-color:#c6f6d5; padding:14px; border-radius:8px;'>
-                    <b>✅ Upload Successful!</b><br>{result.get('message', 'File uploaded successfully')}<br>
-                    <b>Dataset:</b> {ds.get('filename', '')}<br>
-                    <b>Equipment Count:</b> {ds.get('total_equipment', 0)}</div>""")
-                self.load_datasets(); self.load_statistics()
-            else:
-                error = result.get('error', 'Upload failed.')
-                self.upload_message.setHtml(f"""
-                <div style='color:#c53030; background-color:#fed7d7; padding:14px; border-radius:8px;'>
-                    <b>❌ Error:</b> {error}</div>""")
-        except requests.exceptions.ConnectionError:
-            self.upload_message.setHtml("""
-            <div style='color:#c53030; background-color:#fed7d7; padding:14px; border-radius:8px;'>
-                <b>❌ Error:</b> Cannot connect to server.</div>""")
-        except Exception as e:
-            self.upload_message.setHtml(f"""
-            <div style='color:#c53030; background-color:#fed7d7; padding:14px; border-radius:8px;'>
-                <b>❌ Error:</b> {str(e)}</div>""")
-        finally:
-            self.upload_btn.setEnabled(True); self.upload_btn.setText('Choose CSV File')
+        self.upload_btn.setText('Cancel Upload')
+        self.upload_message.setText('📤 Uploading file...')
+        self.tasks.start('upload', self._upload, file_path,
+                         on_success=self._on_upload_done, on_error=self._on_upload_failed,
+                         on_progress=self._on_upload_progress)
+
+    def _upload(self, task, file_path):
+        task.report('🔍 Checking file...')
+
+        def on_chunk(sent, total, rate):
+            # Stops between chunks; the server keeps the session for a later resume
+            task.check()
+            task.report((sent, total, rate))
+
+        status_code, result = self.api_client.upload_csv(file_path, on_progress=on_chunk)
+        if status_code in (200, 201):
+            # 200 means an identical file was already uploaded
+            return result.get('message', 'File uploaded successfully'), result.get('dataset', {})
+        if status_code != 202:
+            raise Exception(result.get('error', 'Upload failed.'))
+        # The server parses large files in the background; poll until done
+        job = result.get('job', {})
+        task.report(f"⚙️ Processing {job.get('filename', 'file')}...")
+        job = self._wait_for_job(task, job['id'], lambda job: (
+            f"⚙️ Processing {job.get('filename', 'file')}...  "
+            f"{job.get('phase', '')}: {job.get('rows_processed', 0):,} rows"), 'Processing failed.')
+        return 'File processed successfully', job.get('dataset') or {}
+
+    def _wait_for_job(self, task, job_id, describe, failure):
+        """Poll a server job from a task until it succeeds, reporting describe(job) meanwhile."""
+        while True:
+            task.wait(JOB_POLL_INTERVAL)
+            job = self.api_client.get_job(job_id)
+            if job.get('status') == 'succeeded':
+                return job
+            if job.get('status') == 'failed':
+                raise Exception(job.get('error') or failure)
+            task.report(describe(job))
+
+    def _on_upload_progress(self, progress):
+        if isinstance(progress, str):
+            self.upload_progress.hide()
+            self.upload_message.setText(progress)
+            return
+        sent, total, rate = progress
+        self.upload_progress.show()
+        self.upload_progress.setValue(int(sent * 1000 / total))
+        mb = 1024 * 1024
+        remaining = f"  ·  {(total - sent) / rate:.0f} s left" if rate and sent < total else ''
+        self.upload_message.setText(
+            f"📤 Uploading...  {sent / mb:,.1f} of {total / mb:,.1f} MB  ·  {rate / mb:,.1f} MB/s{remaining}")
+
+    def _on_upload_done(self, result):
+        self._reset_upload_button()
+        self._show_upload_success(*result)
+
+    def _on_upload_failed(self, error):
+        self._reset_upload_button()
+        message = _describe_error(error)
+        if isinstance(error, requests.exceptions.RequestException):
+            message += ' Choose the same file again to resume the upload.'
+        self._show_upload_error(message)
+
+    def _reset_upload_button(self):
+        self.upload_progress.hide()
+        self.upload_btn.setText('Choose CSV File')
+
+    def _show_upload_success(self, message, ds):
+        self.upload_message.setHtml(f"""
+        <div style='color:#22543d; background-color:#c6f6d5; padding:14px; border-radius:8px;'>
+            <b>✅ Upload Successful!</b><br>{message}<br>
+            <b>Dataset:</b> {ds.get('filename', '')}<br>
+            <b>Equipment Count:</b> {ds.get('total_equipment', 0)}</div>""")
+        self.load_datasets(); self.load_statistics()
+
+    def _show_upload_error(self, error):
+        self.upload_message.setHtml(f"""
+        <div style='color:#c53030; background-color:#fed7d7; padding:14px; border-radius:8px;'>
+            <b>❌ Error:</b> {error}</div>""")
 
     def load_datasets(self):
-        try:
-            self.datasets = self.api_client.list_datasets()
-            self.datasets_table.setRowCount(len(self.datasets))
-            for row, dataset in enumerate(self.datasets):
-                self.datasets_table.setRowHeight(row, 44)
-                self.datasets_table.setItem(row, 0, QTableWidgetItem(dataset['filename']))
-                self.datasets_table.setItem(row, 1, QTableWidgetItem(dataset['upload_date'].split('T')[0]))
-                eq_item = QTableWidgetItem(str(dataset['total_equipment']))
-                eq_item.setTextAlignment(Qt.AlignCenter)
-                self.datasets_table.setItem(row, 2, eq_item)
-                for col, key in [(3, 'avg_flowrate'), (4, 'avg_pressure'), (5, 'avg_temperature')]:
-                    item = QTableWidgetItem(f"{dataset[key]:.1f}")
-                    item.setTextAlignment(Qt.AlignCenter)
-                    self.datasets_table.setItem(row, col, item)
-
-                action_widget = QWidget()
-                action_widget.setStyleSheet("background:transparent; border:none;")
-                al = QHBoxLayout(action_widget); al.setContentsMargins(4, 4, 4, 4); al.setSpacing(5)
-                vb = StyledButton("View", "primary"); vb.setCursor(Qt.PointingHandCursor)
-                vb.clicked.connect(lambda _, d=dataset['id']: self.view_dataset(d))
-                pb = StyledButton("PDF", "success"); pb.setCursor(Qt.PointingHandCursor)
-                pb.clicked.connect(lambda _, d=dataset['id']: self.generate_report(d))
-                db = StyledButton("Delete", "danger"); db.setCursor(Qt.PointingHandCursor)
-                db.clicked.connect(lambda _, d=dataset['id']: self.delete_dataset(d))
-                al.addWidget(vb); al.addWidget(pb); al.addWidget(db)
-                self.datasets_table.setCellWidget(row, 6, action_widget)
-        except Exception as e:
-            QMessageBox.warning(self, 'Error', f'Failed to load datasets:\n{str(e)}')
+        self.tasks.start('datasets', lambda task: self.api_client.list_datasets(),
+                         on_success=self._show_datasets,
+                         on_error=lambda e: QMessageBox.warning(self, 'Error', f'Failed to load datasets:\n{str(e)}'))
+
+    def _show_datasets(self, datasets):
+        self.datasets = datasets
+        self.datasets_table.setRowCount(len(self.datasets))
+        for row, dataset in enumerate(self.datasets):
+            self.datasets_table.setRowHeight(row, 44)
+            self.datasets_table.setItem(row, 0, QTableWidgetItem(dataset['filename']))
+            self.datasets_table.setItem(row, 1, QTableWidgetItem(dataset['upload_date'].split('T')[0]))
+            eq_item = QTableWidgetItem(str(dataset['total_equipment']))
+            eq_item.setTextAlignment(Qt.AlignCenter)
+            self.datasets_table.setItem(row, 2, eq_item)
+            for col, key in [(3, 'avg_flowrate'), (4, 'avg_pressure'), (5, 'avg_temperature')]:
+                item = QTableWidgetItem(f"{dataset[key]:.1f}")
+                item.setTextAlignment(Qt.AlignCenter)
+                self.datasets_table.setItem(row, col, item)
+
+            action_widget = QWidget()
+            action_widget.setStyleSheet("background:transparent; border:none;")
+            al = QHBoxLayout(action_widget); al.setContentsMargins(4, 4, 4, 4); al.setSpacing(5)
+            vb = StyledButton("View", "primary"); vb.setCursor(Qt.PointingHandCursor)
+            vb.clicked.connect(lambda _, d=dataset['id']: self.view_dataset(d))
+            pb = StyledButton("PDF", "success"); pb.setCursor(Qt.PointingHandCursor)
+            pb.clicked.connect(lambda _, d=dataset['id']: self.generate_report(d))
+            db = StyledButton("Delete", "danger"); db.setCursor(Qt.PointingHandCursor)
+            db.clicked.connect(lambda _, d=dataset['id']: self.delete_dataset(d))
+            al.addWidget(vb); al.addWidget(pb); al.addWidget(db)
+            self.datasets_table.setCellWidget(row, 6, action_widget)
 
     def view_dataset(self, dataset_id):
         self.tabs.setCurrentWidget(self.viz_tab)
-        while self.charts_layout.count():
-            item = self.charts_layout.takeAt(0)
-            if item.widget(): item.widget().deleteLater()
-        try:
-            data = self.api_client.get_dataset(dataset_id)
-            self.current_dataset = data
-            self.show_visualizations(data)
-        except Exception as e:
-            QMessageBox.warning(self, "Error", str(e))
-
-    def show_visualizations(self, data):
+        self._clear_visualizations()
+        self.viz_info.setText('⏳  Loading dataset...')
+        # Viewing another dataset supersedes a view still loading
+        self.tasks.start('view', self._fetch_dataset, dataset_id,
+                         on_success=self._on_dataset_fetched,
+                         on_error=lambda e: QMessageBox.warning(self, "Error", _describe_error(e)))
+
+    def _fetch_dataset(self, task, dataset_id):
+        # Equipment rows are paged in by the details table as it scrolls
+        data = self.api_client.get_dataset(dataset_id, include_equipment=False)
+        task.check()
+        chart_data = self.api_client.get_chart_data(dataset_id)
+        return data, chart_data
+
+    def _on_dataset_fetched(self, result):
+        data, chart_data = result
+        self.current_dataset = data
+        self.show_visualizations(data, chart_data)
+
+    def _clear_visualizations(self):
+        if self.equipment_model is not None:
+            self.equipment_model.close()
+            self.equipment_model = None
         for i in reversed(range(self.charts_layout.count())):
             w = self.charts_layout.itemAt(i).widget()
             if w: w.setParent(None)
 
+    def show_visualizations(self, data, chart_data=None):
+        self._clear_visualizations()
+
         di = data['dataset']
         self.viz_info.setText(
             f"📊  Dataset: {di['filename']}   |   Equipment: {di['total_equipment']}   |   "
@@ -914,12 +1541,13 @@ class MainWindow(QMainWindow):
         al.addWidget(ac); gl.addWidget(af, 0, 1)
         self.charts_layout.addWidget(charts_grid)
 
-        equipment_list = di['equipment'][:10]
-        if equipment_list:
+        # Per-type means come precomputed from the server instead of raw rows
+        type_means = (chart_data or {}).get('type_means')
+        if type_means:
             gf = self._chart_frame(); gf.setMinimumHeight(320)
             gfl = QVBoxLayout(gf)
             gc = ProfessionalMatplotlibCanvas(gf, width=10, height=3.5)
-            gc.create_grouped_bar_chart(equipment_list, 'Parameter Comparison (First 10 Equipment)')
+            gc.create_grouped_bar_chart(type_means, 'Mean Parameters by Equipment Type')
             gfl.addWidget(gc); self.charts_layout.addWidget(gf)
 
         tf = self._chart_frame(); tfl = QVBoxLayout(tf)
@@ -927,20 +1555,33 @@ class MainWindow(QMainWindow):
         tt.setStyleSheet("font-size:16px; font-weight:bold; color:#2d3748; margin-bottom:8px; background:transparent; border:none;")
         tfl.addWidget(tt)
 
-        et = QTableWidget(); et.setColumnCount(5)
-        et.setHorizontalHeaderLabels(['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature'])
-        et.setRowCount(len(di['equipment'])); et.setStyleSheet(TABLE_STYLE)
+        fl = QHBoxLayout()
+        table_filter = QLineEdit(); table_filter.setPlaceholderText('🔍  Filter by name or type...')
+        table_filter.setStyleSheet(INPUT_STYLE); table_filter.setClearButtonEnabled(True)
+        table_status = QLabel()
+        table_status.setStyleSheet("font-size:12px; color:#718096; background:transparent; border:none;")
+        fl.addWidget(table_filter, 1); fl.addWidget(table_status)
+        tfl.addLayout(fl)
+
+        # Only the rows on screen are drawn; the model pages the rest in on demand
+        et = QTableView()
+        model = EquipmentTableModel(self.api_client, di['id'], di['total_equipment'], et)
+        model.changed.connect(lambda: table_status.setText(model.describe()))
+        model.failed.connect(lambda e: table_status.setText(f'⚠️  {_describe_error(e)}'))
+        table_filter.textChanged.connect(model.set_filter)
+        self.equipment_model = model
+
+        et.setModel(model)
+        et.setStyleSheet(TABLE_STYLE); et.setMinimumHeight(420)
         et.setShowGrid(False); et.verticalHeader().setVisible(False)
-        for i, eq in enumerate(di['equipment']):
-            et.setItem(i, 0, QTableWidgetItem(eq['equipment_name']))
-            et.setItem(i, 1, QTableWidgetItem(eq['equipment_type']))
-            for c, k in [(2, 'flowrate'), (3, 'pressure'), (4, 'temperature')]:
-                item = QTableWidgetItem(f"{eq[k]:.1f}")
-                item.setTextAlignment(Qt.AlignCenter)
-                et.setItem(i, c, item)
+        et.verticalHeader().setDefaultSectionSize(36)
         et.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        et.setAlternatingRowColors(True); et.setEditTriggers(QTableWidget.NoEditTriggers)
+        et.setAlternatingRowColors(True); et.setEditTriggers(QTableView.NoEditTriggers)
+        # Upload order until a header is clicked
+        et.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        et.setSortingEnabled(True)
         tfl.addWidget(et); self.charts_layout.addWidget(tf)
+        table_status.setText(model.describe())
 
         self.charts_widget.adjustSize(); self.charts_widget.repaint()
         self.charts_widget.update()
@@ -953,30 +1594,92 @@ class MainWindow(QMainWindow):
         return frame
 
     def generate_report(self, dataset_id):
+        if self.tasks.running('report'):
+            QMessageBox.information(self, 'Report in progress',
+                                    'A report is already being generated.\n\nCancel it from the status bar to start another.')
+            return
         save_path, _ = QFileDialog.getSaveFileName(self, 'Save Report', f'equipment_report_{dataset_id}.pdf', 'PDF Files (*.pdf)')
         if save_path:
-            try:
-                self.api_client.generate_report(dataset_id, save_path)
-                QMessageBox.information(self, 'Success', f'✅ Report generated successfully!\n\nSaved to: {save_path}')
-            except Exception as e:
-                QMessageBox.warning(self, 'Error', f'Failed to generate report: {str(e)}')
+            self.statusBar().showMessage('📄 Generating report...')
+            self.cancel_report_btn.show()
+            self.tasks.start('report', self._build_report, dataset_id, save_path,
+                             on_success=self._on_report_saved, on_error=self._on_report_failed,
+                             on_progress=self._on_report_progress)
+
+    def _build_report(self, task, dataset_id, save_path):
+        # The server renders the report in the background; poll until it can be downloaded
+        status_code, result = self.api_client.queue_report(dataset_id)
+        if status_code != 202:
+            raise Exception(result.get('error', 'Could not queue report.'))
+        job_id = result['job']['id']
+        self._wait_for_job(task, job_id, lambda job: (
+            f"📄 Generating report...  {job.get('phase', '')}: {job.get('rows_processed', 0):,} rows"),
+            'Report generation failed.')
+        task.report('📥 Downloading report...')
+
+        def on_block(received, total):
+            # Stops mid-download; the partial file is removed
+            task.check()
+            task.report((received, total))
+
+        self.api_client.download_job(job_id, save_path, on_progress=on_block)
+        return save_path
+
+    def _on_report_progress(self, progress):
+        if isinstance(progress, str):
+            self.statusBar().showMessage(progress)
+            return
+        received, total = progress
+        mb = 1024 * 1024
+        if total:
+            self.report_progress.show()
+            self.report_progress.setValue(min(int(received * 1000 / total), 1000))
+            self.statusBar().showMessage(f"📥 Downloading report...  {received / mb:,.1f} of {total / mb:,.1f} MB")
+        else:
+            self.statusBar().showMessage(f"📥 Downloading report...  {received / mb:,.1f} MB")
+
+    def _on_report_saved(self, save_path):
+        self._end_report()
+        QMessageBox.information(self, 'Success', f'✅ Report generated successfully!\n\nSaved to: {save_path}')
+
+    def _on_report_failed(self, error):
+        self._end_report()
+        QMessageBox.warning(self, 'Error', f'Failed to generate report: {_describe_error(error)}')
+
+    def cancel_report(self):
+        self.tasks.cancel('report')
+        self._end_report()
+        self.statusBar().showMessage('Report cancelled.', 3000)
+
+    def _end_report(self):
+        self.report_progress.hide()
+        self.cancel_report_btn.hide()
+        self.statusBar().clearMessage()
 
     def delete_dataset(self, dataset_id):
         reply = QMessageBox.question(self, 'Confirm Delete',
                                      'Are you sure you want to delete this dataset?\n\nThis action cannot be undone.',
                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
         if reply == QMessageBox.Yes:
-            try:
-                self.api_client.delete_dataset(dataset_id)
-                QMessageBox.information(self, 'Success', '✅ Dataset deleted successfully!')
-                self.load_datasets(); self.load_statistics()
-                if self.current_dataset and self.current_dataset['dataset']['id'] == dataset_id:
-                    for i in reversed(range(self.charts_layout.count())):
-                        w = self.charts_layout.itemAt(i).widget()
-                        if w: w.setParent(None)
-                    self.current_dataset = None
-            except Exception as e:
-                QMessageBox.warning(self, 'Error', f'Failed to delete dataset: {str(e)}')
+            self.tasks.start(f'delete:{dataset_id}', lambda task: self.api_client.delete_dataset(dataset_id),
+                             on_success=lambda result: self._on_dataset_deleted(dataset_id),
+                             on_error=lambda e: QMessageBox.warning(
+                                 self, 'Error', f'Failed to delete dataset: {_describe_error(e)}'))
+
+    def _on_dataset_deleted(self, dataset_id):
+        QMessageBox.information(self, 'Success', '✅ Dataset deleted successfully!')
+        self.load_datasets(); self.load_statistics()
+        if self.current_dataset and self.current_dataset['dataset']['id'] == dataset_id:
+            self._clear_visualizations()
+            self.current_dataset = None
+
+    def show_network_stats(self):
+        box = QMessageBox(self)
+        box.setWindowTitle('Network Latency')
+        box.setTextFormat(Qt.PlainText)
+        box.setText(self.api_client.latency_report())
+        box.setStyleSheet("QLabel { font-family: Consolas, 'DejaVu Sans Mono', monospace; font-size: 11px; }")
+        box.exec_()
 
     def handle_logout(self):
         reply = QMessageBox.question(self, 'Confirm Logout', 'Are you sure you want to logout?',
@@ -984,6 +1687,11 @@ class MainWindow(QMainWindow):
         if reply == QMessageBox.Yes:
             self.controller.on_logout()
 
+    def closeEvent(self, event):
+        # Nothing a background task finishes may touch this window any more
+        self.tasks.cancel_all()
+        super().closeEvent(event)
+
 
 def main():
     app = QApplication(sys.argv)
@@ -992,6 +1700,8 @@ def main():
     font.setStyleStrategy(QFont.PreferAntialias)
     app.setFont(font)
 
+    # One worker per pooled connection; further API calls queue for a free thread
+    QThreadPool.globalInstance().setMaxThreadCount(API_POOL_SIZE)
     api_client = APIClient()
     controller = AppController(api_client)
     _keep_window(controller)  # prevent GC of the controller itself
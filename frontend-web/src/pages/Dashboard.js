@@ -2,7 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { Chart as ChartJS, CategoryScale, LinearScale, BarElement, ArcElement, Title, Tooltip, Legend, PointElement, LineElement } from 'chart.js';
 import { Bar, Pie, Line } from 'react-chartjs-2';
-import { authAPI, datasetAPI, statisticsAPI } from '../services/api';
+import { authAPI, datasetAPI, jobAPI, statisticsAPI } from '../services/api';
 
 ChartJS.register(CategoryScale, LinearScale, BarElement, ArcElement, Title, Tooltip, Legend, PointElement, LineElement);
 
@@ -10,6 +10,10 @@ function Dashboard({ setIsAuthenticated }) {
   const [user, setUser] = useState(null);
   const [datasets, setDatasets] = useState([]);
   const [selectedDataset, setSelectedDataset] = useState(null);
+  const [chartData, setChartData] = useState(null);
+  const [equipment, setEquipment] = useState([]);
+  const [equipmentCursor, setEquipmentCursor] = useState(null);
+  const [equipmentLoading, setEquipmentLoading] = useState(false);
   const [statistics, setStatistics] = useState(null);
   const [loading, setLoading] = useState(false);
   const [uploadLoading, setUploadLoading] = useState(false);
@@ -58,6 +62,18 @@ function Dashboard({ setIsAuthenticated }) {
     }
   };
 
+  const waitForJob = async (jobId, label) => {
+    for (;;) {
+      await new Promise((resolve) => setTimeout(resolve, 1000));
+      const { data: job } = await jobAPI.get(jobId);
+      if (job.status === 'succeeded' || job.status === 'failed') return job;
+      setMessage({
+        type: 'success',
+        text: `${label}... ${job.phase}: ${job.rows_processed.toLocaleString()} rows`
+      });
+    }
+  };
+
   const handleFileUpload = async (e) => {
     const file = e.target.files[0];
     if (!file) return;
@@ -69,8 +85,21 @@ function Dashboard({ setIsAuthenticated }) {
     setMessage({ type: '', text: '' });
 
     try {
-      await datasetAPI.upload(formData);
-      setMessage({ type: 'success', text: 'File uploaded successfully!' });
+      const response = await datasetAPI.upload(formData);
+      if (response.status === 202) {
+        // Large files are parsed in the background; wait for the job to finish
+        const job = await waitForJob(response.data.job.id, 'Processing file');
+        if (job.status === 'failed') {
+          setMessage({ type: 'error', text: job.error || 'Error processing file.' });
+          return;
+        }
+      }
+      setMessage({
+        type: 'success',
+        text: response.data.duplicate
+          ? 'This file was already uploaded; using the existing dataset.'
+          : 'File uploaded successfully!'
+      });
       await loadDatasets();
       await loadStatistics();
       e.target.value = '';
@@ -84,11 +113,21 @@ function Dashboard({ setIsAuthenticated }) {
     }
   };
 
+  const nextCursor = (page) => (page.next ? new URL(page.next).searchParams.get('cursor') : null);
+
   const handleViewDataset = async (datasetId) => {
     setLoading(true);
     try {
-      const response = await datasetAPI.get(datasetId);
+      // Equipment rows are paged in separately instead of arriving with the summary
+      const [response, charts, page] = await Promise.all([
+        datasetAPI.get(datasetId, { include_equipment: false }),
+        datasetAPI.chartData(datasetId),
+        datasetAPI.equipment(datasetId),
+      ]);
       setSelectedDataset(response.data);
+      setChartData(charts.data);
+      setEquipment(page.data.results);
+      setEquipmentCursor(nextCursor(page.data));
     } catch (error) {
       setMessage({ type: 'error', text: 'Error loading dataset details.' });
     } finally {
@@ -96,6 +135,20 @@ function Dashboard({ setIsAuthenticated }) {
     }
   };
 
+  const handleLoadMoreEquipment = async () => {
+    const datasetId = selectedDataset.dataset.id;
+    setEquipmentLoading(true);
+    try {
+      const page = await datasetAPI.equipment(datasetId, equipmentCursor);
+      setEquipment((rows) => rows.concat(page.data.results));
+      setEquipmentCursor(nextCursor(page.data));
+    } catch (error) {
+      setMessage({ type: 'error', text: 'Error loading equipment.' });
+    } finally {
+      setEquipmentLoading(false);
+    }
+  };
+
   const handleDeleteDataset = async (datasetId) => {
     if (!window.confirm('Are you sure you want to delete this dataset?')) return;
 
@@ -106,6 +159,9 @@ function Dashboard({ setIsAuthenticated }) {
       await loadStatistics();
       if (selectedDataset?.dataset?.id === datasetId) {
         setSelectedDataset(null);
+        setChartData(null);
+        setEquipment([]);
+        setEquipmentCursor(null);
       }
     } catch (error) {
       setMessage({ type: 'error', text: 'Error deleting dataset.' });
@@ -114,7 +170,15 @@ function Dashboard({ setIsAuthenticated }) {
 
   const handleGenerateReport = async (datasetId) => {
     try {
-      const response = await datasetAPI.generateReport(datasetId);
+      // Reports are rendered in the background; download once the job is done
+      const queued = await datasetAPI.queueReport(datasetId);
+      setMessage({ type: 'success', text: 'Generating report...' });
+      const job = await waitForJob(queued.data.job.id, 'Generating report');
+      if (job.status === 'failed') {
+        setMessage({ type: 'error', text: job.error || 'Error generating report.' });
+        return;
+      }
+      const response = await jobAPI.download(job.id);
       const url = window.URL.createObjectURL(new Blob([response.data]));
       const link = document.createElement('a');
       link.href = url;
@@ -150,33 +214,49 @@ function Dashboard({ setIsAuthenticated }) {
   };
 
   const getParameterComparisonChart = () => {
-    if (!selectedDataset?.dataset?.equipment) return null;
+    if (!chartData?.type_means) return null;
 
-    const equipment = selectedDataset.dataset.equipment.slice(0, 10);
-    const labels = equipment.map(e => e.equipment_name.substring(0, 15));
+    const labels = Object.keys(chartData.type_means).sort();
+    const means = (parameter) => labels.map(type => chartData.type_means[type][parameter]);
 
     return {
       labels,
       datasets: [
         {
           label: 'Flowrate',
-          data: equipment.map(e => e.flowrate),
+          data: means('flowrate'),
           backgroundColor: '#667eea',
         },
         {
           label: 'Pressure',
-          data: equipment.map(e => e.pressure),
+          data: means('pressure'),
           backgroundColor: '#764ba2',
         },
         {
           label: 'Temperature',
-          data: equipment.map(e => e.temperature),
+          data: means('temperature'),
           backgroundColor: '#f093fb',
         },
       ],
     };
   };
 
+  const getTrendChart = () => {
+    if (!chartData?.series) return null;
+
+    const points = (parameter) => chartData.series[parameter].x.map(
+      (x, i) => ({ x, y: chartData.series[parameter].y[i] })
+    );
+
+    return {
+      datasets: [
+        { label: 'Flowrate', data: points('flowrate'), borderColor: '#667eea', pointRadius: 0, borderWidth: 1 },
+        { label: 'Pressure', data: points('pressure'), borderColor: '#764ba2', pointRadius: 0, borderWidth: 1 },
+        { label: 'Temperature', data: points('temperature'), borderColor: '#f093fb', pointRadius: 0, borderWidth: 1 },
+      ],
+    };
+  };
+
   const getAveragesChart = () => {
     if (!selectedDataset?.dataset) return null;
 
@@ -324,7 +404,7 @@ function Dashboard({ setIsAuthenticated }) {
 
             {getParameterComparisonChart() && (
               <div className="chart-container" style={{ marginTop: '20px' }}>
-                <div className="chart-title">Parameter Comparison (First 10 Equipment)</div>
+                <div className="chart-title">Mean Parameters by Equipment Type</div>
                 <Bar
                   data={getParameterComparisonChart()}
                   options={{
@@ -339,6 +419,24 @@ function Dashboard({ setIsAuthenticated }) {
               </div>
             )}
 
+            {getTrendChart() && (
+              <div className="chart-container" style={{ marginTop: '20px' }}>
+                <div className="chart-title">Parameters by Row ({chartData.points} point overview)</div>
+                <Line
+                  data={getTrendChart()}
+                  options={{
+                    maintainAspectRatio: true,
+                    scales: {
+                      x: {
+                        type: 'linear',
+                        title: { display: true, text: 'Row' }
+                      }
+                    }
+                  }}
+                />
+              </div>
+            )}
+
             <div style={{ marginTop: '30px' }}>
               <h3 style={{ marginBottom: '15px', color: '#2d3748' }}>Equipment List</h3>
               <div style={{ overflowX: 'auto' }}>
@@ -353,8 +451,8 @@ function Dashboard({ setIsAuthenticated }) {
                     </tr>
                   </thead>
                   <tbody>
-                    {selectedDataset.dataset.equipment.map((eq, index) => (
-                      <tr key={index}>
+                    {equipment.map((eq) => (
+                      <tr key={eq.id}>
                         <td>{eq.equipment_name}</td>
                         <td>{eq.equipment_type}</td>
                         <td>{eq.flowrate.toFixed(1)}</td>
@@ -365,6 +463,19 @@ function Dashboard({ setIsAuthenticated }) {
                   </tbody>
                 </table>
               </div>
+              <div style={{ marginTop: '15px', color: '#718096' }}>
+                Showing {equipment.length} of {selectedDataset.dataset.total_equipment} rows
+                {equipmentCursor && (
+                  <button
+                    onClick={handleLoadMoreEquipment}
+                    className="btn-view"
+                    style={{ marginLeft: '15px' }}
+                    disabled={equipmentLoading}
+                  >
+                    {equipmentLoading ? 'Loading...' : 'Load more'}
+                  </button>
+                )}
+              </div>
             </div>
           </div>
         )}
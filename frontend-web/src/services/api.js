@@ -42,13 +42,27 @@ export const datasetAPI = {
     });
   },
   list: () => api.get('/datasets/'),
-  get: (id) => api.get(`/datasets/${id}/`),
+  get: (id, params) => api.get(`/datasets/${id}/`, { params }),
+  // One cursor-paginated page of a dataset's equipment; `next` links to the following page
+  equipment: (id, cursor, limit = 500) => api.get(`/datasets/${id}/equipment/`, { params: { cursor, limit } }),
   delete: (id) => api.delete(`/datasets/${id}/delete/`),
   generateReport: (id) => {
     return api.get(`/datasets/${id}/report/`, {
       responseType: 'blob',
     });
   },
+  queueReport: (id) => api.post(`/datasets/${id}/report/jobs/`),
+  chartData: (id, points = 500) => api.get(`/datasets/${id}/chart-data/`, { params: { points } }),
+};
+
+// Background job APIs
+export const jobAPI = {
+  get: (id) => api.get(`/jobs/${id}/`),
+  download: (id) => {
+    return api.get(`/jobs/${id}/download/`, {
+      responseType: 'blob',
+    });
+  },
 };
 
 // Statistics API
@@ -7,4 +7,6 @@ python3 -m pip install -r requirements.txt
 
 python3 manage.py migrate
 
-gunicorn config.wsgi:application --bind 0.0.0.0:$PORT
+# Jobs run in their own process, which also picks up jobs left behind by a restart
+python3 manage.py run_jobs &
+JOB_WEB_DISPATCHER=0 gunicorn config.wsgi:application --bind 0.0.0.0:$PORT